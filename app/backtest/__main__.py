@@ -0,0 +1,3 @@
+import runpy
+
+runpy.run_module("app.backtest.sweep", run_name="__main__")
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from app.backtest.signals import STRATEGIES
+
+# Crypto trades around the clock, so a year is 365 days of bars
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+def infer_periods_per_year(timestamps):
+    """Bars per year from the median spacing of `timestamps` (e.g. 8760 for hourly bars)."""
+    ns = pd.to_datetime(pd.Series(timestamps)).to_numpy(dtype="datetime64[ns]").view("<i8")
+    if len(ns) < 2:
+        raise ValueError("Need at least two timestamps to infer the bar frequency")
+    spacing = float(np.median(np.diff(ns))) / 1e9
+    if spacing <= 0:
+        raise ValueError("Timestamps must be increasing to infer the bar frequency")
+    return SECONDS_PER_YEAR / spacing
+
+
+def _periods_per_year(close, periods_per_year):
+    if periods_per_year is not None:
+        return periods_per_year
+    if isinstance(getattr(close, "index", None), pd.DatetimeIndex):
+        return infer_periods_per_year(close.index)
+    raise ValueError("periods_per_year is required unless `close` is a Series with a DatetimeIndex")
+
+
+def run_backtest(close, position, fee_bps=10.0, periods_per_year=None):
+    """
+    Vectorized long/flat backtest. `position` is the target exposure decided
+    at each bar's close; it is applied from the next bar, and every change
+    in exposure pays `fee_bps` basis points. Sharpe is annualized with
+    `periods_per_year`, inferred from the index when `close` is a
+    timestamp-indexed Series.
+    """
+    periods_per_year = _periods_per_year(close, periods_per_year)
+    close = np.asarray(close, dtype=float)
+    held = np.r_[0.0, np.asarray(position, dtype=float)[:-1]]
+    returns = np.r_[0.0, np.diff(close) / close[:-1]]
+    turnover = np.abs(np.diff(np.r_[0.0, held]))
+
+    strategy = held * returns - turnover * fee_bps / 10_000
+    equity = np.cumprod(1.0 + strategy)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+
+    std = strategy.std()
+    return {
+        "total_return": float(equity[-1] - 1.0),
+        "sharpe": float(strategy.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()),
+        "trades": int(np.count_nonzero(turnover)),
+        "exposure": float(held.mean()),
+        "fees": float((turnover * fee_bps / 10_000).sum()),
+    }
+
+
+def backtest_strategy(close, strategy, params, fee_bps=10.0, periods_per_year=None):
+    periods_per_year = _periods_per_year(close, periods_per_year)
+    close = np.asarray(close, dtype=float)
+    position = STRATEGIES[strategy](close, **params)
+    return run_backtest(close, position, fee_bps, periods_per_year)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# Whole-array indicator and signal functions for backtesting. They follow
+# the same definitions as IndicatorEngine (pandas ewm EMAs, pandas_ta RSI and
+# MACD) but work on full arrays so there is no per-bar Python loop.
+
+
+def ema(close, span):
+    return pd.Series(close).ewm(span=span).mean().to_numpy()
+
+
+def seeded_ema(values, length):
+    # pandas_ta.ema: SMA seed over the first `length` values, then adjust=False
+    s = pd.Series(values, dtype=float)
+    first = s.first_valid_index()
+    if first is None or len(s) - first < length:
+        return np.full(len(s), np.nan)
+    s = s.iloc[first:].copy()
+    seed = s.iloc[:length].mean()
+    s.iloc[:length - 1] = np.nan
+    s.iloc[length - 1] = seed
+    out = np.full(len(values), np.nan)
+    out[first:] = s.ewm(span=length, adjust=False).mean().to_numpy()
+    return out
+
+
+def rsi(close, length=14):
+    change = pd.Series(close).diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    loss = change.clip(upper=0).abs().ewm(alpha=1 / length, min_periods=length).mean()
+    return (100 * gain / (gain + loss)).to_numpy()
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = seeded_ema(close, fast) - seeded_ema(close, slow)
+    signal_line = seeded_ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def ema_crossover(close, fast=9, slow=21):
+    """Long while the fast EMA is above the slow EMA."""
+    return (ema(close, fast) > ema(close, slow)).astype(float)
+
+
+def rsi_reversion(close, length=14, lower=30, upper=70):
+    """Enter long when RSI drops below `lower`, exit when it rises above `upper`."""
+    values = rsi(close, length)
+    state = np.full(len(values), np.nan)
+    state[values < lower] = 1.0
+    state[values > upper] = 0.0
+    return pd.Series(state).ffill().fillna(0.0).to_numpy()
+
+
+def macd_trend(close, fast=12, slow=26, signal=9):
+    """Long while MACD is above its signal line."""
+    line, signal_line, _ = macd(close, fast, slow, signal)
+    return np.nan_to_num(line > signal_line).astype(float)
+
+
+STRATEGIES = {
+    "ema_crossover": ema_crossover,
+    "rsi_reversion": rsi_reversion,
+    "macd_trend": macd_trend,
+}
@@ -0,0 +1,161 @@
+import argparse
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app.backtest.engine import backtest_strategy, infer_periods_per_year
+from app.backtest.signals import STRATEGIES
+
+logger = logging.getLogger("TradeSenseAI")
+
+# Worker-process copy of the price data and bars per year, loaded once per process by _init_worker
+_closes = {}
+_periods = {}
+
+
+def parameter_grid(space):
+    """{"fast": [5, 9], "slow": [21, 50]} -> list of every parameter combination."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def load_closes(symbols, store=None, db=None):
+    """Close prices per symbol as timestamp-indexed Series, from the columnar store if present, otherwise the DB."""
+    closes = {}
+    for label in symbols:
+        if store is not None and store.exists(label):
+            data = store.read(label, columns=["price"])
+            prices = pd.Series(np.array(data["price"], dtype=float),
+                               index=pd.to_datetime(np.asarray(data["timestamp"]), unit="ns"))
+        elif db is not None:
+            df = db.load_ohlcv(label)
+            prices = pd.Series(df["price"].to_numpy(dtype=float), index=pd.DatetimeIndex(df["timestamp"]))
+        else:
+            continue
+        prices = prices.dropna()
+        if len(prices) > 1:
+            closes[label] = prices
+    return closes
+
+
+def _init_worker(closes, periods):
+    global _closes, _periods
+    _closes, _periods = closes, periods
+
+
+def _run_chunk(strategy, chunk, fee_bps):
+    rows = []
+    for label, params in chunk:
+        try:
+            result = backtest_strategy(_closes[label], strategy, params, fee_bps, _periods[label])
+        except Exception as e:
+            logger.exception(f"Backtest {strategy} {params} on {label} failed")
+            rows.append({"symbol": label, **params, "error": f"{type(e).__name__}: {e}"})
+            continue
+        rows.append({"symbol": label, **params, **result})
+    return rows
+
+
+def run_sweep(closes, strategy, grid, fee_bps=10.0, workers=None, chunk_size=64, periods_per_year=None):
+    """
+    Run every parameter set in `grid` against every series in `closes`.
+    Tasks are batched into chunks so the pool isn't dominated by pickling;
+    the price arrays are shipped to each worker once, not per task.
+
+    Sharpe is annualized per symbol with `periods_per_year` (a number, or
+    label -> number), inferred from each Series' timestamps when not given.
+    A run that raises gets a row with an `error` message instead of metrics.
+    Returns (results DataFrame, bars per second).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; choose from {sorted(STRATEGIES)}")
+
+    periods = {}
+    for label, close in closes.items():
+        if isinstance(periods_per_year, dict):
+            periods[label] = periods_per_year[label]
+        elif periods_per_year is not None:
+            periods[label] = periods_per_year
+        elif isinstance(getattr(close, "index", None), pd.DatetimeIndex):
+            periods[label] = infer_periods_per_year(close.index)
+        else:
+            raise ValueError(f"periods_per_year is required for {label}: its prices have no timestamps")
+    arrays = {label: np.asarray(close, dtype=float) for label, close in closes.items()}
+
+    tasks = [(label, params) for label in arrays for params in grid]
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    total_bars = sum(len(arrays[label]) for label, _ in tasks)
+
+    started = time.perf_counter()
+    rows = []
+    if workers == 1:
+        _init_worker(arrays, periods)
+        for chunk in chunks:
+            rows.extend(_run_chunk(strategy, chunk, fee_bps))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(arrays, periods)) as pool:
+            for chunk_rows in pool.map(_run_chunk, itertools.repeat(strategy), chunks, itertools.repeat(fee_bps)):
+                rows.extend(chunk_rows)
+    elapsed = time.perf_counter() - started
+
+    results = pd.DataFrame(rows)
+    failures = int(results["error"].notna().sum()) if "error" in results else 0
+    bars_per_second = total_bars / elapsed if elapsed > 0 else float("inf")
+    logger.info(f"Backtested {len(tasks)} runs ({total_bars:,} bars) in {elapsed:.2f}s "
+                f"- {bars_per_second:,.0f} bars/sec")
+    if failures:
+        logger.warning(f"{failures} of {len(tasks)} backtest runs failed; see the `error` column")
+    return results, bars_per_second
+
+
+def _parse_param(text):
+    # "fast=5,9,12" -> ("fast", [5, 9, 12]); values are ints when possible
+    name, values = text.split("=", 1)
+    parsed = []
+    for value in values.split(","):
+        number = float(value)
+        parsed.append(int(number) if number.is_integer() else number)
+    return name, parsed
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Vectorized strategy backtests over stored OHLCV")
+    parser.add_argument("strategy", choices=sorted(STRATEGIES))
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="parameter values to sweep, e.g. --param fast=5,9 --param slow=21,50")
+    parser.add_argument("--symbols", nargs="+", help="labels to test (default: all active supported_symbols)")
+    parser.add_argument("--fee-bps", type=float, default=10.0, help="fee per position change, in basis points")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=20, help="rows to print, best Sharpe first")
+    parser.add_argument("--out", help="write all results to this CSV file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.services.columnar_store import get_columnar_store
+    from app.services.db_service import DatabaseService
+
+    db = DatabaseService()
+    symbols = args.symbols or db.get_supported_symbols()["symbol"].tolist()
+    closes = load_closes(symbols, store=get_columnar_store(), db=db)
+    if not closes:
+        raise SystemExit("❌ No stored prices found for the requested symbols")
+
+    grid = parameter_grid(dict(_parse_param(p) for p in args.param)) or [{}]
+    results, _ = run_sweep(closes, args.strategy, grid, args.fee_bps, args.workers)
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"✅ Wrote {len(results)} results to {args.out}")
+    if "error" in results:
+        print(f"❌ {results['error'].notna().sum()} runs failed (see the log)")
+        results = results[results["error"].isna()].drop(columns="error")
+    if not results.empty:
+        print(results.sort_values("sharpe", ascending=False).head(args.top).to_string(index=False))
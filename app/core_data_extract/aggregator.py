@@ -1,62 +1,324 @@
-import pandas as pd
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy import text
 from datetime import date
 from datetime import timedelta
-from typing import Optional
-from app.services.db_service import DatabaseService  # ✅ class-based
+from typing import List, Optional
+from app.migrate import apply_migrations
+from app.services.data_access import get_engine, invalidate
+from app.utils.config import get_int
+from app.utils.metrics import get_metrics
 
-db = DatabaseService()  # ✅ instantiate
-ENGINE = db.engine      # ✅ use its engine
+# Daily rollup computed server-side: LAG() gives the snapshot-to-snapshot
+# pct change within each (symbol, day), aggregates collapse the day, and
+# the result is upserted so re-running a day is safe.
+AGGREGATE_SQL = text("""
+    INSERT INTO fundamentals_daily (
+        symbol, day, samples,
+        avg_market_cap, pct_change_mcap,
+        avg_total_volume, pct_change_vol,
+        stddev_mcap, stddev_volume,
+        avg_circ_supply, fundamentals_score_mean, commit_count_4w_mean
+    )
+    SELECT
+        symbol,
+        day,
+        COUNT(*)                          AS samples,
+        AVG(market_cap)                   AS avg_market_cap,
+        AVG(pct_mcap) * 100               AS pct_change_mcap,
+        AVG(total_volume)                 AS avg_total_volume,
+        AVG(pct_vol) * 100                AS pct_change_vol,
+        STDDEV_SAMP(market_cap)           AS stddev_mcap,
+        STDDEV_SAMP(total_volume)         AS stddev_volume,
+        AVG(circulating_supply)           AS avg_circ_supply,
+        AVG(fundamentals_score)           AS fundamentals_score_mean,
+        AVG(commit_count_4w)              AS commit_count_4w_mean
+    FROM (
+        SELECT
+            symbol,
+            DATE(timestamp) AS day,
+            market_cap,
+            total_volume,
+            circulating_supply,
+            fundamentals_score,
+            commit_count_4w,
+            -- Cast first: the columns are BIGINT when to_sql created the table
+            -- from integer values, and integer division truncates the ratio
+            CAST(market_cap AS DOUBLE PRECISION)
+                / NULLIF(LAG(CAST(market_cap AS DOUBLE PRECISION)) OVER w, 0) - 1     AS pct_mcap,
+            CAST(total_volume AS DOUBLE PRECISION)
+                / NULLIF(LAG(CAST(total_volume AS DOUBLE PRECISION)) OVER w, 0) - 1 AS pct_vol
+        FROM fundamentals_data
+        WHERE timestamp >= :start AND timestamp < :end
+        WINDOW w AS (PARTITION BY symbol, DATE(timestamp) ORDER BY timestamp)
+    ) raw
+    GROUP BY symbol, day
+    ON CONFLICT (symbol, day) DO UPDATE SET
+        samples                 = EXCLUDED.samples,
+        avg_market_cap          = EXCLUDED.avg_market_cap,
+        pct_change_mcap         = EXCLUDED.pct_change_mcap,
+        avg_total_volume        = EXCLUDED.avg_total_volume,
+        pct_change_vol          = EXCLUDED.pct_change_vol,
+        stddev_mcap             = EXCLUDED.stddev_mcap,
+        stddev_volume           = EXCLUDED.stddev_volume,
+        avg_circ_supply         = EXCLUDED.avg_circ_supply,
+        fundamentals_score_mean = EXCLUDED.fundamentals_score_mean,
+        commit_count_4w_mean    = EXCLUDED.commit_count_4w_mean
+""")
+
+# Days in range whose raw snapshot count differs from the stored rollup
+# (or that have no rollup yet) for at least one symbol
+INCOMPLETE_DAYS_SQL = text("""
+    SELECT DISTINCT r.day
+    FROM (
+        SELECT symbol, DATE(timestamp) AS day, COUNT(*) AS samples
+        FROM fundamentals_data
+        WHERE timestamp >= :start AND timestamp < :end
+        GROUP BY symbol, DATE(timestamp)
+    ) r
+    LEFT JOIN fundamentals_daily d
+           ON d.symbol = r.symbol AND d.day = r.day
+    WHERE d.samples IS DISTINCT FROM r.samples
+    ORDER BY r.day
+""")
+
+RAW_DAYS_SQL = text("""
+    SELECT DISTINCT DATE(timestamp) AS day
+    FROM fundamentals_data
+    WHERE timestamp >= :start AND timestamp < :end
+    ORDER BY day
+""")
+
+# Applied once per fundamentals_data snapshot, in timestamp order, in the
+# same transaction as the raw insert. Folds the snapshot into the
+# (symbol, day) accumulator (Welford for market cap / volume, last values
+# for the pct-change terms, running sums for the plain means) and rewrites
+# the day's fundamentals_daily row from it, so the live row matches what
+# AGGREGATE_SQL would compute from the raw snapshots.
+# ON CONFLICT SET expressions all see the pre-update row (a.*).
+ROLLUP_SQL = text("""
+    WITH acc AS (
+        INSERT INTO fundamentals_intraday AS a (
+            symbol, day, samples, last_ts, needs_rescan,
+            n_mcap, mean_mcap, m2_mcap, n_vol, mean_vol, m2_vol,
+            last_mcap, last_vol, n_pct_mcap, sum_pct_mcap, n_pct_vol, sum_pct_vol,
+            n_circ, sum_circ, n_score, sum_score, n_commit, sum_commit
+        )
+        VALUES (
+            :symbol, DATE(CAST(:ts AS TIMESTAMP)), 1, :ts,
+            EXISTS (SELECT 1 FROM fundamentals_daily d
+                    WHERE d.symbol = :symbol AND d.day = DATE(CAST(:ts AS TIMESTAMP))),
+            CAST(:market_cap IS NOT NULL AS INT), COALESCE(:market_cap, 0), 0,
+            CAST(:total_volume IS NOT NULL AS INT), COALESCE(:total_volume, 0), 0,
+            :market_cap, :total_volume, 0, 0, 0, 0,
+            CAST(:circulating_supply IS NOT NULL AS INT), COALESCE(:circulating_supply, 0),
+            CAST(:fundamentals_score IS NOT NULL AS INT), COALESCE(:fundamentals_score, 0),
+            CAST(:commit_count_4w IS NOT NULL AS INT), COALESCE(:commit_count_4w, 0)
+        )
+        ON CONFLICT (symbol, day) DO UPDATE SET
+            samples      = a.samples + 1,
+            last_ts      = GREATEST(a.last_ts, EXCLUDED.last_ts),
+            needs_rescan = a.needs_rescan OR EXCLUDED.last_ts < a.last_ts,
+
+            n_mcap    = a.n_mcap + EXCLUDED.n_mcap,
+            mean_mcap = CASE WHEN EXCLUDED.n_mcap = 0 THEN a.mean_mcap
+                             ELSE a.mean_mcap + (EXCLUDED.mean_mcap - a.mean_mcap) / (a.n_mcap + 1) END,
+            m2_mcap   = CASE WHEN EXCLUDED.n_mcap = 0 THEN a.m2_mcap
+                             ELSE a.m2_mcap + (EXCLUDED.mean_mcap - a.mean_mcap) ^ 2 * a.n_mcap / (a.n_mcap + 1) END,
+            n_vol     = a.n_vol + EXCLUDED.n_vol,
+            mean_vol  = CASE WHEN EXCLUDED.n_vol = 0 THEN a.mean_vol
+                             ELSE a.mean_vol + (EXCLUDED.mean_vol - a.mean_vol) / (a.n_vol + 1) END,
+            m2_vol    = CASE WHEN EXCLUDED.n_vol = 0 THEN a.m2_vol
+                             ELSE a.m2_vol + (EXCLUDED.mean_vol - a.mean_vol) ^ 2 * a.n_vol / (a.n_vol + 1) END,
+
+            -- LAG() semantics: the previous snapshot's value, even when NULL
+            last_mcap    = EXCLUDED.last_mcap,
+            last_vol     = EXCLUDED.last_vol,
+            n_pct_mcap   = a.n_pct_mcap + CAST(EXCLUDED.last_mcap / NULLIF(a.last_mcap, 0) IS NOT NULL AS INT),
+            sum_pct_mcap = a.sum_pct_mcap + COALESCE(EXCLUDED.last_mcap / NULLIF(a.last_mcap, 0) - 1, 0),
+            n_pct_vol    = a.n_pct_vol + CAST(EXCLUDED.last_vol / NULLIF(a.last_vol, 0) IS NOT NULL AS INT),
+            sum_pct_vol  = a.sum_pct_vol + COALESCE(EXCLUDED.last_vol / NULLIF(a.last_vol, 0) - 1, 0),
+
+            n_circ     = a.n_circ + EXCLUDED.n_circ,
+            sum_circ   = a.sum_circ + EXCLUDED.sum_circ,
+            n_score    = a.n_score + EXCLUDED.n_score,
+            sum_score  = a.sum_score + EXCLUDED.sum_score,
+            n_commit   = a.n_commit + EXCLUDED.n_commit,
+            sum_commit = a.sum_commit + EXCLUDED.sum_commit
+        RETURNING a.*
+    )
+    INSERT INTO fundamentals_daily (
+        symbol, day, samples,
+        avg_market_cap, pct_change_mcap,
+        avg_total_volume, pct_change_vol,
+        stddev_mcap, stddev_volume,
+        avg_circ_supply, fundamentals_score_mean, commit_count_4w_mean
+    )
+    SELECT
+        symbol, day, samples,
+        CASE WHEN n_mcap > 0 THEN mean_mcap END,
+        sum_pct_mcap / NULLIF(n_pct_mcap, 0) * 100,
+        CASE WHEN n_vol > 0 THEN mean_vol END,
+        sum_pct_vol / NULLIF(n_pct_vol, 0) * 100,
+        CASE WHEN n_mcap > 1 THEN SQRT(GREATEST(m2_mcap, 0) / (n_mcap - 1)) END,
+        CASE WHEN n_vol > 1 THEN SQRT(GREATEST(m2_vol, 0) / (n_vol - 1)) END,
+        sum_circ / NULLIF(n_circ, 0),
+        sum_score / NULLIF(n_score, 0),
+        sum_commit / NULLIF(n_commit, 0)
+    FROM acc
+    WHERE NOT needs_rescan
+    ON CONFLICT (symbol, day) DO UPDATE SET
+        samples                 = EXCLUDED.samples,
+        avg_market_cap          = EXCLUDED.avg_market_cap,
+        pct_change_mcap         = EXCLUDED.pct_change_mcap,
+        avg_total_volume        = EXCLUDED.avg_total_volume,
+        pct_change_vol          = EXCLUDED.pct_change_vol,
+        stddev_mcap             = EXCLUDED.stddev_mcap,
+        stddev_volume           = EXCLUDED.stddev_volume,
+        avg_circ_supply         = EXCLUDED.avg_circ_supply,
+        fundamentals_score_mean = EXCLUDED.fundamentals_score_mean,
+        commit_count_4w_mean    = EXCLUDED.commit_count_4w_mean
+""")
+
+ACCUMULATOR_STATE_SQL = text("""
+    SELECT COUNT(*), COUNT(*) FILTER (WHERE needs_rescan)
+    FROM fundamentals_intraday
+    WHERE day = :day
+""")
+
+FINALIZE_SQL = text("UPDATE fundamentals_daily SET is_final = true WHERE day = :day")
+PRUNE_ACCUMULATORS_SQL = text("DELETE FROM fundamentals_intraday WHERE day < :cutoff")
+
+
+def rollup_params(rows):
+    """fundamentals_data rows (dicts) -> ROLLUP_SQL parameter sets, in timestamp order."""
+    params = []
+    for row in sorted(rows, key=lambda r: r["timestamp"]):
+        values = {name: row.get(name) for name in (
+            "market_cap", "total_volume", "circulating_supply", "fundamentals_score", "commit_count_4w")}
+        params.append({
+            "symbol": row["symbol"],
+            "ts": row["timestamp"],
+            **{name: (None if value is None or value != value else float(value)) for name, value in values.items()},
+        })
+    return params
+
+
+def aggregate_days(start_day: date, end_day: date) -> int:
+    """
+    Roll up fundamentals_data for every day in [start_day, end_day]
+    into fundamentals_daily. Returns the number of (symbol, day) rows written.
+    """
+    with get_metrics().stage("aggregation", start=start_day, end=end_day) as info, get_engine().begin() as conn:
+        result = conn.execute(AGGREGATE_SQL, {
+            "start": start_day,
+            "end": end_day + timedelta(days=1),
+        })
+        info["rows"] = result.rowcount
+    get_metrics().incr("db_rows_written_total", result.rowcount, table="fundamentals_daily")
+    invalidate("fundamentals_daily")
+    return result.rowcount
 
 def run_daily_aggregation(target_day: Optional[date] = None):
     
     """
-    Aggregate all fundamentals_data rows into daily stats.
-    If target_day is None we aggregate 'yesterday'.
+    Finalize the daily stats for target_day (default: yesterday).
+    Rows kept live by save_fundamentals are only marked final; the day is
+    rebuilt from fundamentals_data when it has no accumulators, an
+    accumulator was flagged for a rescan, or any symbol's sample count
+    differs from its raw snapshots (rows written or deleted around the
+    rollup, e.g. by a backfill or a failed write).
     """
     print("Running aggregation for day:", target_day)
 
     #target_day = target_day or date.today()
     target_day = target_day or (date.today() - timedelta(days=1))
 
-    q = text("""
-        SELECT *
-        FROM fundamentals_data
-        WHERE DATE(timestamp) = :day
-    """)
-    df = pd.read_sql(q, ENGINE, params={"day": target_day})
+    engine = get_engine()
+    apply_migrations(engine)
+    with engine.connect() as conn:
+        live, rescans = conn.execute(ACCUMULATOR_STATE_SQL, {"day": target_day}).one()
+
+    trusted = bool(live) and not rescans and not find_days_to_aggregate(target_day, target_day)
+    if trusted:
+        rows = live
+    else:
+        rows = aggregate_days(target_day, target_day)
 
-    if df.empty:
+    cutoff = target_day - timedelta(days=get_int("INTRADAY_RETENTION_DAYS", 7))
+    with engine.begin() as conn:
+        conn.execute(FINALIZE_SQL, {"day": target_day})
+        conn.execute(PRUNE_ACCUMULATORS_SQL, {"cutoff": cutoff})
+    invalidate("fundamentals_daily")
+
+    if not rows:
         print(f"No raw data for {target_day}")
         return
 
-    groups = []
-    for symbol, sub in df.groupby("symbol"):
-        out = {
-            "symbol": symbol,
-            "day": target_day,
-            "samples": len(sub),
-            "avg_market_cap": sub["market_cap"].mean(),
-            "pct_change_mcap": sub["market_cap"].pct_change().mean() * 100,
-            "avg_total_volume": sub["total_volume"].mean(),
-            "pct_change_vol": sub["total_volume"].pct_change().mean() * 100,
-            "stddev_mcap": sub["market_cap"].std(),
-            "stddev_volume": sub["total_volume"].std(),
-            "avg_circ_supply": sub["circulating_supply"].mean(),
-            "fundamentals_score_mean": sub["fundamentals_score"].mean(),
-            "commit_count_4w_mean": sub["commit_count_4w"].mean()
+    print(f"✅ Finalized {rows} symbols for {target_day}" + ("" if trusted else " (rescanned)"))
+
+def find_days_to_aggregate(start_day: date, end_day: date, force: bool = False) -> List[date]:
+    params = {"start": start_day, "end": end_day + timedelta(days=1)}
+    with get_engine().connect() as conn:
+        rows = conn.execute(RAW_DAYS_SQL if force else INCOMPLETE_DAYS_SQL, params)
+        return [row[0] for row in rows]
+
+def _contiguous_runs(days: List[date]):
+    # [d1, d2, d3, d7] -> [(d1, d3), (d7, d7)]
+    runs = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+def _aggregate_chunk(days: List[date]) -> int:
+    return sum(aggregate_days(first, last) for first, last in _contiguous_runs(days))
+
+def run_backfill(start_day: date, end_day: date, workers: int = 4, chunk_days: int = 7, force: bool = False):
+    """
+    Rebuild fundamentals_daily for [start_day, end_day] in parallel.
+    Days already complete are skipped unless force=True; every write is an
+    upsert, so the backfill can be re-run after a partial failure.
+    """
+    days = find_days_to_aggregate(start_day, end_day, force)
+    if not days:
+        print(f"Nothing to backfill between {start_day} and {end_day}")
+        return 0
+
+    chunks = [days[i:i + chunk_days] for i in range(0, len(days), chunk_days)]
+    print(f"Backfilling {len(days)} days in {len(chunks)} chunks with {workers} workers")
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_aggregate_chunk, chunk): chunk
+            for chunk in chunks
         }
-        groups.append(out)
-
-    daily_df = pd.DataFrame(groups)
-    daily_df.to_sql(
-        "fundamentals_daily",
-        ENGINE,
-        if_exists="append",
-        index=False,
-        method="multi"
-    )
-    print(f"✅ Aggregated {len(daily_df)} symbols for {target_day}")
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                rows = future.result()
+                total += rows
+                print(f"✅ Aggregated {rows} rows for {chunk[0]} → {chunk[-1]}")
+            except Exception as e:
+                print(f"❌ Backfill failed for {chunk[0]} → {chunk[-1]}: {e}")
+
+    print(f"✅ Backfill wrote {total} rows for {start_day} → {end_day}")
+    return total
 
 if __name__ == "__main__":
-    run_daily_aggregation()
+    parser = argparse.ArgumentParser(description="Aggregate fundamentals_data into fundamentals_daily")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"), type=date.fromisoformat,
+                        help="rebuild every day from START to END (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-days", type=int, default=7)
+    parser.add_argument("--force", action="store_true", help="re-aggregate days that are already complete")
+    args = parser.parse_args()
+
+    if args.backfill:
+        run_backfill(*args.backfill, workers=args.workers, chunk_days=args.chunk_days, force=args.force)
+    else:
+        run_daily_aggregation()
+    get_metrics().write_prometheus()
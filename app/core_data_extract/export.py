@@ -0,0 +1,69 @@
+import argparse
+import gzip
+import logging
+from datetime import date, timedelta
+
+from app.services.data_access import get_data_access
+from app.utils.running_stats import GroupedStats
+
+logger = logging.getLogger("TradeSenseAI")
+
+SUMMARY_COLUMNS = ["market_cap", "total_volume", "circulating_supply", "fundamentals_score"]
+
+
+def fundamentals_query(start=None, end=None, symbols=None, columns="*"):
+    """SQL + params for fundamentals_data rows in [start, end], ordered for streaming."""
+    clauses, params = [], {}
+    if start is not None:
+        clauses.append("timestamp >= :start")
+        params["start"] = start
+    if end is not None:
+        clauses.append("timestamp < :end")
+        params["end"] = end + timedelta(days=1)
+    if symbols:
+        clauses.append("symbol = ANY(:symbols)")
+        params["symbols"] = [s.upper() for s in symbols]
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return f"SELECT {columns} FROM fundamentals_data {where} ORDER BY symbol, timestamp", params
+
+
+def export_fundamentals(path, start=None, end=None, symbols=None, chunk_rows=None, data=None):
+    """
+    Stream fundamentals_data to a CSV file (gzip-compressed when `path` ends
+    in .gz), one chunk at a time. Returns the number of rows written.
+    """
+    data = data or get_data_access()
+    query, params = fundamentals_query(start, end, symbols)
+    opener = gzip.open if path.endswith(".gz") else open
+    rows = 0
+    with opener(path, "wt", newline="") as f:
+        for i, frame in enumerate(data.stream_frames(query, params, chunk_rows)):
+            frame.to_csv(f, index=False, header=(i == 0))
+            rows += len(frame)
+    logger.info(f"Exported {rows} fundamentals_data rows to {path}")
+    return rows
+
+
+def summarize_fundamentals(start=None, end=None, symbols=None, columns=SUMMARY_COLUMNS, chunk_rows=None, data=None):
+    """Per-symbol count/mean/std/min/max over the range, computed chunk by chunk."""
+    data = data or get_data_access()
+    query, params = fundamentals_query(start, end, symbols, columns=", ".join(["symbol"] + list(columns)))
+    return data.reduce(query, GroupedStats("symbol", columns), params, chunk_rows).to_frame()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream fundamentals_data out in constant memory")
+    parser.add_argument("--start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day, inclusive")
+    parser.add_argument("--symbols", nargs="+")
+    parser.add_argument("--out", help="CSV file to write (.csv or .csv.gz)")
+    parser.add_argument("--summary", action="store_true", help="print per-symbol statistics")
+    parser.add_argument("--chunk-rows", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.out:
+        rows = export_fundamentals(args.out, args.start, args.end, args.symbols, args.chunk_rows)
+        print(f"✅ Exported {rows} rows to {args.out}")
+    if args.summary or not args.out:
+        print(summarize_fundamentals(args.start, args.end, args.symbols, chunk_rows=args.chunk_rows).to_string(index=False))
@@ -1,18 +1,43 @@
 # core-data-extract/fundamentals.py
-import requests
 import datetime
 import logging
+import json
+import os
+import random
+import threading
+
+from app.services.coingecko_service import COINGECKO_API_URL
+from app.services.http_cache import get_http_cache
+from app.utils.config import get_int
 
 logger = logging.getLogger("TradeSenseAI")
 
+# /coins/markets returns at most 250 rows per page
+MARKETS_PAGE_SIZE = 250
+DEV_DATA_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "developer_data.json")
+
 class FundamentalsFetcher:
-    def __init__(self):
-        self.base_url = "https://api.coingecko.com/api/v3"
+    def __init__(self, rate_limiter=None, cache=None, base_url=None, onchain=None):
+        self.base_url = base_url or os.getenv("COINGECKO_API_URL") or COINGECKO_API_URL
+        self.rate_limiter = rate_limiter
+        self.cache = cache or get_http_cache()
+        self.dev_refresh_hours = get_int("DEV_DATA_REFRESH_HOURS", 24 * 7)
+        self._dev_lock = threading.Lock()
+        # OnchainMetrics collector; created on first use unless passed in
+        self.onchain = onchain
+        self.onchain_coins = set(filter(None, os.getenv("ONCHAIN_COIN_IDS", "ethereum").split(",")))
+        self._onchain_lock = threading.Lock()
+        self._onchain_failed = False
+
+    def _get(self, path, params):
+        res = self.cache.get(f"{self.base_url}{path}", params=params, rate_limiter=self.rate_limiter)
+        res.raise_for_status()
+        return res.json()
 
     def get_tokenomics(self, coin_id):
         url = f"{self.base_url}/coins/{coin_id}"
         try:
-            res = requests.get(url, params={"localization": "false"})
+            res = self.cache.get(url, params={"localization": "false"}, rate_limiter=self.rate_limiter)
             data = res.json()
 
             market_data = data.get("market_data", {})
@@ -30,12 +55,140 @@ class FundamentalsFetcher:
             logger.warning(f"Failed to fetch tokenomics for {coin_id}: {e}")
             return {}
 
-    def get_onchain_stub(self, coin_id):
-        # Placeholder method for future integration with blockchain explorers
-        return {
-            "tx_count": None,
-            "avg_gas_fee": None,
-        }
+    def get_market_data(self, coin_ids, vs_currency="usd"):
+        """
+        Market cap, volume and supply for many coins at once, using one
+        /coins/markets call per 250 ids instead of one /coins/{id} per coin.
+        Returns (coin_id -> data, ids of pages that failed after the HTTP
+        layer's retries).
+        """
+        ids = sorted(set(coin_ids))
+        market, failed = {}, set()
+        for start in range(0, len(ids), MARKETS_PAGE_SIZE):
+            chunk = ids[start:start + MARKETS_PAGE_SIZE]
+            try:
+                rows = self._get("/coins/markets", {
+                    "vs_currency": vs_currency,
+                    "ids": ",".join(chunk),
+                    "per_page": MARKETS_PAGE_SIZE,
+                    "page": 1,
+                    "sparkline": "false",
+                })
+            except Exception as e:
+                logger.warning(f"Failed to fetch market data for {len(chunk)} coins: {e}")
+                failed.update(chunk)
+                continue
+
+            for row in rows:
+                market[row["id"]] = {
+                    "market_cap": row.get("market_cap"),
+                    "circulating_supply": row.get("circulating_supply"),
+                    "max_supply": row.get("max_supply"),
+                    "total_volume": row.get("total_volume"),
+                }
+        return market, failed
+
+    def get_developer_data(self, coin_id):
+        return self.get_developer_data_many([coin_id]).get(coin_id, {"commit_count_4w": None})
+
+    def get_developer_data_many(self, coin_ids):
+        """
+        commit_count_4w changes slowly, so it is served from a small on-disk
+        cache (read and written once per call) and refetched about every
+        DEV_DATA_REFRESH_HOURS. Each entry's expiry is jittered by +/-25% so
+        a universe cached in one run doesn't come due all at once, and at
+        most DEV_DATA_MAX_REFRESH coins are refetched per call (uncached
+        coins first, then the longest expired); the rest keep their cached
+        value until a later run. Returns coin_id -> {"commit_count_4w"}.
+        """
+        now = datetime.datetime.utcnow()
+        with self._dev_lock:
+            cache = self._load_dev_cache()
+
+        results, missing, expired = {}, [], []
+        for coin_id in dict.fromkeys(coin_ids):
+            entry = cache.get(coin_id)
+            if entry is None:
+                missing.append(coin_id)
+                continue
+            results[coin_id] = {"commit_count_4w": entry["commit_count_4w"]}
+            expires_at = self._dev_expiry(entry)
+            if now >= expires_at:
+                expired.append((expires_at, coin_id))
+        due = (missing + [coin_id for _, coin_id in sorted(expired)])[:get_int("DEV_DATA_MAX_REFRESH", 50)]
+
+        fetched = {}
+        for coin_id in due:
+            try:
+                data = self._get(f"/coins/{coin_id}", {
+                    "localization": "false",
+                    "tickers": "false",
+                    "market_data": "false",
+                    "community_data": "false",
+                    "developer_data": "true",
+                    "sparkline": "false",
+                })
+            except Exception as e:
+                logger.warning(f"Failed to fetch developer data for {coin_id}: {e}")
+                continue
+            commits = data.get("developer_data", {}).get("commit_count_4_weeks")
+            ttl = datetime.timedelta(hours=self.dev_refresh_hours * random.uniform(0.75, 1.25))
+            fetched[coin_id] = {"commit_count_4w": commits, "fetched_at": now.isoformat(),
+                                "expires_at": (now + ttl).isoformat()}
+            results[coin_id] = {"commit_count_4w": commits}
+
+        for coin_id in missing:
+            results.setdefault(coin_id, {"commit_count_4w": None})
+        if fetched:
+            with self._dev_lock:
+                cache = self._load_dev_cache()
+                cache.update(fetched)
+                self._save_dev_cache(cache)
+        return results
+
+    def _dev_expiry(self, entry):
+        # Entries written before expiries were jittered only have fetched_at
+        if "expires_at" in entry:
+            return datetime.datetime.fromisoformat(entry["expires_at"])
+        return datetime.datetime.fromisoformat(entry["fetched_at"]) + datetime.timedelta(hours=self.dev_refresh_hours)
+
+    def _load_dev_cache(self):
+        try:
+            with open(DEV_DATA_CACHE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_dev_cache(self, cache):
+        os.makedirs(os.path.dirname(DEV_DATA_CACHE), exist_ok=True)
+        tmp = f"{DEV_DATA_CACHE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp, DEV_DATA_CACHE)
+
+    def get_onchain_metrics(self, coin_id):
+        # Chain activity for the coins native to the configured RPC chain
+        # (ONCHAIN_COIN_IDS, default "ethereum"); None for everything else
+        # or when no INFURA_URL is set.
+        empty = {"tx_count": None, "avg_gas_fee": None}
+        if coin_id not in self.onchain_coins:
+            return empty
+        with self._onchain_lock:
+            if self.onchain is None and not self._onchain_failed and os.getenv("INFURA_URL"):
+                try:
+                    from app.services.onchain_service import OnchainMetrics
+                    self.onchain = OnchainMetrics()
+                except Exception as e:
+                    logger.warning(f"On-chain metrics disabled: {e}")
+                    self._onchain_failed = True
+            if self.onchain is None:
+                return empty
+            try:
+                metrics = self.onchain.collect()
+            except Exception as e:
+                logger.warning(f"Failed to collect on-chain metrics for {coin_id}: {e}")
+                return empty
+        return {"tx_count": metrics["tx_count"], "avg_gas_fee": metrics["avg_gas_fee"]}
 
     def calculate_score(self, tokenomics):
         # Example scoring algorithm (can be adjusted based on heuristics)
@@ -55,7 +208,7 @@ class FundamentalsFetcher:
 
     def get_fundamentals(self, coin_id, label):
         tokenomics = self.get_tokenomics(coin_id)
-        onchain = self.get_onchain_stub(coin_id)
+        onchain = self.get_onchain_metrics(coin_id)
         score = self.calculate_score(tokenomics)
 
         logger.info(f"Fundamentals score for {label}: {score}")
@@ -64,3 +217,40 @@ class FundamentalsFetcher:
             **onchain,
             "fundamentals_score": score
         }
+
+    def get_fundamentals_batch(self, coins):
+        """
+        Batch variant of get_fundamentals for the whole universe.
+        `coins` maps label -> coin_id; returns label -> fundamentals.
+        Coins missing from a /coins/markets page that succeeded (e.g.
+        delisted ids) fall back to get_tokenomics. Coins on a page that
+        failed (e.g. rate limited) are skipped this run rather than fetched
+        one by one from the API that just refused the batch.
+        """
+        market, failed = self.get_market_data(coins.values())
+        if failed:
+            logger.warning(f"Skipping {len(failed)} coins this run: their /coins/markets page failed")
+        listed = [coin_id for coin_id in coins.values() if coin_id in market]
+        developer = self.get_developer_data_many(listed)
+        timestamp = datetime.datetime.utcnow()
+
+        results = {}
+        for label, coin_id in coins.items():
+            if coin_id in failed:
+                continue
+            if coin_id in market:
+                tokenomics = {**market[coin_id], **developer[coin_id], "timestamp": timestamp}
+            else:
+                # Not in a /coins/markets page that succeeded: one /coins/{id} call instead
+                logger.warning(f"No market data returned for {label} ({coin_id}); fetching it individually")
+                tokenomics = self.get_tokenomics(coin_id)
+                if not tokenomics:
+                    continue
+            score = self.calculate_score(tokenomics)
+            logger.info(f"Fundamentals score for {label}: {score}")
+            results[label] = {
+                **tokenomics,
+                **self.get_onchain_metrics(coin_id),
+                "fundamentals_score": score
+            }
+        return results
@@ -1,15 +1,13 @@
-from app.services.coingecko_service import CoinGeckoService
-from app.services.db_service import DatabaseService
-from app.services.model_service import PredictionModel
+import argparse
+import os
+import sys
 import logging
-from sqlalchemy import create_engine, text
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from functools import partial
 
-engine = create_engine(os.getenv("POSTGRES_URL"))
+import pandas as pd
 from dotenv import load_dotenv
-import os
-import sys
-from app.core_data_extract.fundamentals import FundamentalsFetcher
-from app.core_data_extract.aggregator import run_daily_aggregation
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -17,20 +15,41 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 dotenv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env")
 load_dotenv(dotenv_path)
 
+from app.services.coingecko_service import CoinGeckoService
+from app.services.columnar_store import get_columnar_store
+from app.services.data_access import get_data_access
+from app.services.db_service import DatabaseService
+from app.services.model_service import PredictionModel
+from app.services.rate_limiter import TokenBucket
+from app.core_data_extract.fundamentals import FundamentalsFetcher
+from app.core_data_extract.aggregator import run_daily_aggregation
+from app.utils.config import get_int
+from app.utils.metrics import get_metrics
+
+# Rolling window the model is fitted on in incremental mode
+MODEL_WINDOW = pd.Timedelta(days=30)
 
 # Setup logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("TradeSenseAI")
 
-def main():
+def main(refit=False):
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger("TradeSenseAI")
 
     logger.info("Starting TradeSense AI")
 
-    cg = CoinGeckoService()
+    # INGEST_WORKERS > 1 switches on concurrent ingestion; all workers share
+    # one token bucket so CoinGecko's per-minute quota is respected.
+    workers = get_int("INGEST_WORKERS", 1)
+    # OHLCV_INCREMENTAL=1 fetches/appends only rows past each symbol's watermark
+    incremental = bool(get_int("OHLCV_INCREMENTAL", 0))
+    limiter = TokenBucket(get_int("COINGECKO_CALLS_PER_MINUTE", 30))
+
+    cg = CoinGeckoService(rate_limiter=limiter)
     db = DatabaseService()
     predictor = PredictionModel()
+    fundamentals = FundamentalsFetcher(rate_limiter=limiter)
 
     coins = fetch_active_coins() 
     '''{
@@ -40,41 +59,273 @@ def main():
         "SOL_USD": ("solana", "usd"),
     }'''
 
-    for label, (coin_id, currency) in coins.items():
-        logger.info(f"Fetching {label} OHLCV from CoinGecko")
+    # Batch mode pulls fundamentals for the whole universe in a few
+    # /coins/markets calls up front; FUNDAMENTALS_BATCH=0 keeps per-coin calls.
+    metrics = get_metrics()
+    if get_int("FUNDAMENTALS_BATCH", 1):
+        with metrics.stage("fundamentals", symbols=len(coins)):
+            batch_fundamentals = fundamentals.get_fundamentals_batch(
+                {label: coin_id for label, (coin_id, _) in coins.items()}
+            )
+        with metrics.stage("db_write", table="fundamentals_data"):
+            rows = db.save_fundamentals_batch(batch_fundamentals)
+        logger.info(f"Saved fundamentals for {rows} symbols to database")
+        fundamentals = None
+
+    if workers > 1:
+        results = run_concurrent(coins, cg, fundamentals, db, workers, incremental)
+    else:
+        results = []
+        for label, (coin_id, currency) in coins.items():
+            result = fetch_symbol(label, coin_id, currency, cg, fundamentals, db, incremental)
+            store_symbol(db, result)
+            results.append(result)
+
+    store_predictions(db, predictor, results, refit)
+
+    metrics.log_summary()
+    metrics.write_prometheus()
+
+def run_concurrent(coins, cg, fundamentals, db, workers, incremental=False):
+    """
+    Fetch symbols on a thread pool while the calling thread writes finished
+    symbols to the database as soon as they arrive.
+    """
+    logger.info(f"Concurrent ingestion of {len(coins)} symbols with {workers} workers")
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as pool:
+        futures = {
+            pool.submit(fetch_symbol, label, coin_id, currency, cg, fundamentals, db, incremental): label
+            for label, (coin_id, currency) in coins.items()
+        }
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                result = future.result()
+                store_symbol(db, result)
+                results.append(result)
+            except Exception as e:
+                logger.error(f"Ingestion failed for {label}: {e}")
+    return results
+
+def fetch_symbol(label, coin_id, currency, cg, fundamentals, db=None, incremental=False):
+    # Stages recorded on this thread (HTTP fetch, parse, ...) are tagged with the symbol
+    with get_metrics().symbol(label):
+        return _fetch_symbol(label, coin_id, currency, cg, fundamentals, db, incremental)
+
+def _fetch_symbol(label, coin_id, currency, cg, fundamentals, db, incremental):
+    # Network work only (plus watermark reads); safe on a worker thread
+    logger.info(f"Fetching {label} OHLCV from CoinGecko")
+    if incremental:
+        watermark = db.get_ohlcv_watermark(label)
+        df = cg.fetch_ohlcv_since(coin_id, currency, since=watermark)
+    else:
         df = cg.fetch_ohlcv(coin_id, currency)
 
-        if df.empty:
-            logger.warning(f"No data received for {label}")
+    if df.empty:
+        logger.warning(f"No data received for {label}")
+        return {"label": label, "ohlcv": df, "incremental": incremental}
+
+    window = df
+    if incremental and not get_int("MODEL_STATEFUL", 0):
+        # Fit on the stored history plus the new rows, not just the delta.
+        # Stateful models only need the delta and load history on a refit.
+        window = load_window(db, label, df)
+
+    # Now fetch fundamentals data (skipped when fetched in batch)
+    fundamentals_data = None
+    if fundamentals:
+        with get_metrics().stage("fundamentals"):
+            fundamentals_data = fundamentals.get_fundamentals(coin_id, label)
+    return {
+        "label": label,
+        "ohlcv": df,
+        "window": window,
+        "fundamentals": fundamentals_data,
+        "incremental": incremental,
+    }
+
+def store_symbol(db, result):
+    label = result["label"]
+    if result["ohlcv"].empty:
+        return
+
+    metrics = get_metrics()
+    with metrics.stage("db_write", symbol=label, table="prices") as info:
+        rows = db.save_ohlcv(label, result["ohlcv"], incremental=result["incremental"])
+        info["rows"] = rows
+    logger.info(f"Saved {rows} {label} OHLCV rows to database")
+
+    # Mirror into the local columnar store the UI reads from (append-only)
+    get_columnar_store().append(label, result["ohlcv"], ["price"])
+
+    fundamentals_data = result["fundamentals"]
+    if fundamentals_data:
+        with metrics.stage("db_write", symbol=label, table="fundamentals_data"):
+            db.save_fundamentals(label, fundamentals_data)
+        logger.info(f"Saved {label} fundamentals to database")
+
+def load_window(db, label, df):
+    # The stored history within MODEL_WINDOW of the newest row, plus `df`
+    start = df["timestamp"].max() - MODEL_WINDOW
+    history = db.load_ohlcv(label, since=start)
+    window = pd.concat([history, df], ignore_index=True)
+    return window.drop_duplicates("timestamp").sort_values("timestamp").reset_index(drop=True)
+
+def update_online_models(db, predictor, results, refit=False):
+    """
+    MODEL_STATEFUL=1: fold only the new rows into each symbol's persisted
+    model state; refit on the full window when asked (--refit), when there
+    is no state yet, or on drift. Returns label -> (prediction, state, refit reason).
+    """
+    metrics = get_metrics()
+    stored = db.load_model_states([r["label"] for r in results])
+    updates = {}
+    for result in results:
+        label = result["label"]
+        with metrics.stage("model_fit", symbol=label) as info:
+            prediction, state, reason = predictor.predict_online(
+                result["ohlcv"], stored.get(label.upper()),
+                load_window=lambda: load_window(db, label, result["ohlcv"]), refit=refit,
+            )
+            info["refit"] = reason
+        metrics.incr("model_updates_total", mode="refit" if reason else "update", reason=reason)
+        if reason:
+            logger.info(f"Refitted {label} model ({reason})")
+        updates[label] = (prediction, state, reason)
+    return updates
+
+def store_predictions(db, predictor, results, refit=False):
+    # Fit every symbol's regression (one vectorized call, or online updates), then write
+    results = [r for r in results if not r["ohlcv"].empty]
+    metrics = get_metrics()
+    states = {}
+    if get_int("MODEL_STATEFUL", 0):
+        states = update_online_models(db, predictor, results, refit)
+        predictions = {label: prediction for label, (prediction, _, _) in states.items()}
+    else:
+        with metrics.stage("model_fit", symbols=len(results)):
+            predictions = predictor.train_and_predict_many({r["label"]: r["window"] for r in results})
+
+    for result in results:
+        label = result["label"]
+        prediction = predictions[label]
+        try:
+            with metrics.stage("db_write", symbol=label, table="predictions") as info:
+                rows = db.save_predictions(label, prediction, incremental=result["incremental"])
+                info["rows"] = rows
+        except Exception as e:
+            logger.error(f"Saving predictions failed for {label}: {e}")
             continue
+        logger.info(f"Saved {rows} {label} prediction rows to database")
 
-        db.save_ohlcv(label, df)
-        logger.info(f"Saved {label} OHLCV to database")
+        if label in states:
+            # Only advance the model once its predictions are stored
+            _, state, reason = states[label]
+            db.save_model_state(label, state.MODEL, state.to_dict(),
+                                prediction["timestamp"].max(), refit=bool(reason))
 
-        prediction = predictor.train_and_predict(df)
-        db.save_predictions(label, prediction)
-        logger.info(f"Saved {label} predictions to database")
+        store = get_columnar_store()
+        if result["incremental"]:
+            store.append(f"{label}_predictions", prediction, ["price", "predicted"])
+        else:
+            store.replace(f"{label}_predictions", prediction, ["price", "predicted"])
         print(f"Predicted next price for {label}:\n", prediction.tail(5))
-        
-        # Now fetch fundamentals data
-        print(f"\n\nNow extracting data for fundamental analysis")
-        fundamentals = FundamentalsFetcher()
-        fundamentals_data = fundamentals.get_fundamentals(coin_id, label)
-        db.save_fundamentals(label, fundamentals_data)
-        logger.info(f"Saved {label} fundamentals to database")
 
-def fetch_active_coins():
-    query = """
-        SELECT symbol, coingecko_id, quote
-        FROM supported_symbols
-        WHERE active = true AND symbol_type = 'spot'
+def run_daemon():
+    """
+    Long-running mode (python -m app.main --daemon): OHLCV per symbol,
+    fundamentals, aggregation and export each run on their own interval in
+    this one process, reusing its DB pool, HTTP sessions and caches.
     """
-    df = pd.read_sql(text(query), engine)
+    from app.core_data_extract.export import export_fundamentals
+    from app.scheduler import Daily, Scheduler
+    from app.streaming.ingest import ingest_from_env
+
+    logger.info("Starting TradeSense AI scheduler")
+    limiter = TokenBucket(get_int("COINGECKO_CALLS_PER_MINUTE", 30))
+    cg = CoinGeckoService(rate_limiter=limiter)
+    db = DatabaseService()
+    predictor = PredictionModel()
+    fundamentals = FundamentalsFetcher(rate_limiter=limiter)
+    # Frequent refreshes only make sense as appends past the watermark
+    incremental = bool(get_int("OHLCV_INCREMENTAL", 1))
+    scheduler = Scheduler()
+
+    def refresh_symbol(label, coin_id, currency):
+        result = fetch_symbol(label, coin_id, currency, cg, None, db, incremental)
+        store_symbol(db, result)
+        store_predictions(db, predictor, [result])
+
+    def refresh_fundamentals():
+        coins = fetch_active_coins()
+        batch = fundamentals.get_fundamentals_batch({label: coin_id for label, (coin_id, _) in coins.items()})
+        rows = db.save_fundamentals_batch(batch)
+        logger.info(f"Saved fundamentals for {rows} symbols to database")
+
+    def sync_symbols():
+        # Follow supported_symbols: one OHLCV job per active pair.
+        # OHLCV_INTERVAL_<PAIR> (e.g. OHLCV_INTERVAL_BTC_USD=300) overrides the default cadence.
+        coins = fetch_active_coins()
+        jobs = scheduler.jobs_snapshot()
+        for name in jobs:
+            if name.startswith("ohlcv:") and name[len("ohlcv:"):] not in coins:
+                scheduler.remove(name)
+        for label, (coin_id, currency) in coins.items():
+            interval = get_int(f"OHLCV_INTERVAL_{label.upper()}", get_int("OHLCV_INTERVAL_SECONDS", 3600))
+            job = jobs.get(f"ohlcv:{label}")
+            if job is None or job.interval != interval:
+                scheduler.add(f"ohlcv:{label}", interval, partial(refresh_symbol, label, coin_id, currency))
+
+    # Checked every AGGREGATION_/EXPORT_INTERVAL_SECONDS, but yesterday is
+    # finalized and exported once per calendar day (retried if a run fails)
+    finalize_yesterday = Daily(run_daily_aggregation)
+
+    def write_export():
+        day = date.today() - timedelta(days=1)
+        path = os.path.join(os.getenv("EXPORT_DIR"), f"fundamentals_{day.isoformat()}.csv.gz")
+        export_fundamentals(path, start=day, end=day)
+
+    write_export_once = Daily(write_export)
+
+    def export_yesterday():
+        # Only once yesterday's rows are final
+        if finalize_yesterday.done_today:
+            write_export_once()
+
+    sync_symbols()
+    scheduler.add("symbols", get_int("SYMBOLS_INTERVAL_SECONDS", 900), sync_symbols)
+    scheduler.add("fundamentals", get_int("FUNDAMENTALS_INTERVAL_SECONDS", 3600), refresh_fundamentals)
+    scheduler.add("aggregation", get_int("AGGREGATION_INTERVAL_SECONDS", 3600), finalize_yesterday)
+    if os.getenv("EXPORT_DIR"):
+        scheduler.add("export", get_int("EXPORT_INTERVAL_SECONDS", 3600), export_yesterday)
+    # Live bars into stream_bars alongside the scheduled jobs when STREAM_SYMBOLS is set
+    stream = ingest_from_env(db)
+    try:
+        scheduler.run_forever()
+    finally:
+        if stream is not None:
+            stream.stop()
+    get_metrics().log_summary()
+
+def fetch_active_coins():
+    df = get_data_access().supported_symbols("spot")
     return {
         row["symbol"]: (row["coingecko_id"], row["quote"].lower())
         for _, row in df.iterrows()
     }
     
 if __name__ == "__main__":
-    main()
-    run_daily_aggregation()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="TradeSense AI data pipeline")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and schedule each job on its own interval")
+    parser.add_argument("--refit", action="store_true",
+                        help="with MODEL_STATEFUL=1, refit every model on its full window this run")
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon()
+    else:
+        main(refit=args.refit)
+        run_daily_aggregation()
+        get_metrics().write_prometheus()
@@ -0,0 +1,115 @@
+import argparse
+import logging
+import os
+import re
+
+import pandas as pd
+from sqlalchemy import inspect
+from sqlalchemy.sql import text
+
+logger = logging.getLogger("TradeSenseAI")
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "migrations")
+
+# Legacy per-pair tables -> consolidated table and the columns carried over
+LEGACY_TABLES = {
+    "_ohlcv": ("prices", ["timestamp", "price"]),
+    "_predictions": ("predictions", ["timestamp", "price", "predicted"]),
+}
+
+
+def apply_migrations(engine):
+    """Run every db/migrations/*.sql file not yet recorded in schema_migrations, in name order."""
+    applied = []
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name TEXT PRIMARY KEY, applied_at TIMESTAMP DEFAULT now())"
+        ))
+        done = {row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+    for name in sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql")):
+        if name in done:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+            sql = f.read()
+        with engine.begin() as conn:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(sql)
+            finally:
+                cursor.close()
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+        logger.info(f"Applied migration {name}")
+        applied.append(name)
+    return applied
+
+
+def ensure_partitions(conn, table, timestamps):
+    """Create the monthly partitions of `table` covering `timestamps`."""
+    months = pd.to_datetime(pd.Series(timestamps)).dropna().dt.to_period("M").unique()
+    for month in sorted(months):
+        conn.execute(text("SELECT ensure_monthly_partition(:parent, :day)"),
+                     {"parent": table, "day": month.to_timestamp().to_pydatetime()})
+
+
+def migrate_pair_tables(engine, drop=False):
+    """
+    Copy every legacy {pair}_ohlcv / {pair}_predictions table into the
+    consolidated prices / predictions tables. Safe to re-run: rows already
+    present are skipped. With drop=True the legacy tables are dropped once
+    copied.
+    """
+    apply_migrations(engine)
+    with engine.connect() as conn:
+        known = {row[0].lower(): row[0] for row in conn.execute(text("SELECT symbol FROM supported_symbols"))}
+
+    copied = {}
+    for table in inspect(engine).get_table_names():
+        match = re.fullmatch(r"(.+)(_ohlcv|_predictions)", table)
+        if not match:
+            continue
+        pair, suffix = match.groups()
+        target, columns = LEGACY_TABLES[suffix]
+        symbol = known.get(pair, pair.upper())
+
+        present = {c["name"] for c in inspect(engine).get_columns(table)}
+        missing = [c for c in columns if c not in present]
+        if missing:
+            logger.warning(f"Skipping {table}: missing columns {missing}")
+            continue
+
+        cols = ", ".join(f'"{c}"' for c in columns)
+        with engine.begin() as conn:
+            months = conn.execute(text(
+                f'SELECT DISTINCT date_trunc(\'month\', "timestamp") FROM "{table}" WHERE "timestamp" IS NOT NULL'
+            )).scalars().all()
+            ensure_partitions(conn, target, months)
+            rows = conn.execute(text(
+                f'INSERT INTO {target} (symbol, {cols}) '
+                f'SELECT :symbol, {cols} FROM "{table}" WHERE "timestamp" IS NOT NULL '
+                f'ON CONFLICT (symbol, "timestamp") DO NOTHING'
+            ), {"symbol": symbol}).rowcount
+            if drop:
+                conn.execute(text(f'DROP TABLE "{table}"'))
+        logger.info(f"Migrated {rows} rows from {table} into {target} as {symbol}")
+        copied[table] = rows
+    return copied
+
+
+if __name__ == "__main__":
+    from app.services.data_access import get_engine
+
+    parser = argparse.ArgumentParser(description="Apply schema migrations and move per-pair tables over")
+    parser.add_argument("--legacy", action="store_true",
+                        help="copy {pair}_ohlcv / {pair}_predictions tables into prices / predictions")
+    parser.add_argument("--drop", action="store_true", help="drop legacy tables after copying them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    engine = get_engine()
+    applied = apply_migrations(engine)
+    print(f"✅ Applied {len(applied)} migration(s)")
+    if args.legacy:
+        copied = migrate_pair_tables(engine, drop=args.drop)
+        print(f"✅ Migrated {sum(copied.values())} rows from {len(copied)} legacy table(s)")
@@ -0,0 +1,179 @@
+import heapq
+import logging
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from app.utils.config import get_int
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger("TradeSenseAI")
+
+
+class Job:
+    def __init__(self, name, interval, func, jitter=0.1):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.jitter = jitter
+        self.next_run = None
+        self.running = False
+        self.removed = False
+
+    def delay(self, base=None):
+        # +/- jitter around the interval, so jobs with equal cadences drift apart
+        base = self.interval if base is None else base
+        return max(base * (1 + random.uniform(-self.jitter, self.jitter)), 0)
+
+
+class Daily:
+    """
+    Wraps `func` so it runs at most once per calendar day. Schedule it on a
+    short interval: the first call on a new day runs it, later calls that
+    day return without running, and a run that raised is retried on the
+    next call. Calls return True when `func` ran.
+    """
+
+    def __init__(self, func, today=date.today):
+        self.func = func
+        self.today = today
+        self.last_success = None
+
+    @property
+    def done_today(self):
+        return self.last_success == self.today()
+
+    def __call__(self):
+        today = self.today()
+        if self.last_success == today:
+            return False
+        self.func()
+        self.last_success = today
+        return True
+
+
+class Scheduler:
+    """
+    Runs jobs on their own intervals inside one long-lived process, so
+    connection pools, HTTP sessions and query caches stay warm between runs.
+
+    At most `max_concurrency` jobs run at once (SCHEDULER_WORKERS, default 4).
+    A job that is still running when it comes due again is skipped for that
+    tick rather than queued behind itself. First runs are spread over
+    `jitter` of each interval, so a restart doesn't fire everything at once.
+    """
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or get_int("SCHEDULER_WORKERS", 4)
+        self.jobs = {}
+        self._queue = []  # (next_run, seq, job)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = threading.Event()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    def add(self, name, interval, func, jitter=0.1):
+        """Schedule `func()` every `interval` seconds; replaces a job of the same name."""
+        job = Job(name, interval, func, jitter)
+        with self._lock:
+            if name in self.jobs:
+                self.jobs[name].removed = True
+            self.jobs[name] = job
+            self._push(job, time.monotonic() + random.uniform(0, job.interval * job.jitter))
+        return job
+
+    def remove(self, name):
+        with self._lock:
+            job = self.jobs.pop(name, None)
+            if job:
+                job.removed = True
+
+    def jobs_snapshot(self):
+        """Copy of name -> Job, taken under the scheduler lock."""
+        with self._lock:
+            return dict(self.jobs)
+
+    def has_job(self, name):
+        with self._lock:
+            return name in self.jobs
+
+    def _push(self, job, when):
+        job.next_run = when
+        self._seq += 1
+        heapq.heappush(self._queue, (when, self._seq, job))
+        self._wakeup.notify()
+
+    def _next_due(self):
+        # Block until a job is due (or we are stopping); returns the job or None
+        with self._lock:
+            while not self._stopping.is_set():
+                while self._queue and self._queue[0][2].removed:
+                    heapq.heappop(self._queue)
+                if not self._queue:
+                    self._wakeup.wait(1)
+                    continue
+                wait = self._queue[0][0] - time.monotonic()
+                if wait > 0:
+                    self._wakeup.wait(min(wait, 1))
+                    continue
+                _, _, job = heapq.heappop(self._queue)
+                now = time.monotonic()
+                following = job.next_run + job.delay()
+                if following < now:
+                    # Fell behind (e.g. the machine slept); don't replay missed ticks
+                    following = now + job.delay()
+                self._push(job, following)
+                if job.running:
+                    logger.warning(f"⏭️ Skipping {job.name}: previous run still in progress")
+                    get_metrics().incr("scheduler_skipped_total", job=job.name)
+                    continue
+                job.running = True
+                return job
+        return None
+
+    def _run(self, job):
+        metrics = get_metrics()
+        try:
+            with metrics.stage("job", job=job.name):
+                job.func()
+            metrics.incr("scheduler_runs_total", job=job.name, status="ok")
+        except Exception as e:
+            logger.error(f"❌ Job {job.name} failed: {e}")
+            metrics.incr("scheduler_runs_total", job=job.name, status="error")
+        finally:
+            job.running = False
+            self._slots.release()
+            metrics.write_prometheus()
+
+    def run_forever(self):
+        """Dispatch jobs until stop() (or SIGINT/SIGTERM); waits for running jobs to finish."""
+        self._install_signal_handlers()
+        logger.info(f"Scheduler started with {len(self.jobs)} jobs, {self.max_concurrency} workers")
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="job") as pool:
+            while not self._stopping.is_set():
+                job = self._next_due()
+                if job is None:
+                    break
+                # Wait for a free slot; due jobs queue up here, in due order
+                while not self._slots.acquire(timeout=1):
+                    if self._stopping.is_set():
+                        job.running = False
+                        break
+                else:
+                    pool.submit(self._run, job)
+        logger.info("Scheduler stopped")
+
+    def stop(self):
+        self._stopping.set()
+        with self._lock:
+            self._wakeup.notify_all()
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop())
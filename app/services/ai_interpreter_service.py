@@ -2,12 +2,15 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from app.services.insight_cache import InsightCache
+
 load_dotenv()
 
 class AIInterpreterService:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.endpoint = "https://api.openai.com/v1/chat/completions"
+        self.cache = cache or InsightCache()
 
     def interpret_chart(self, coin_name, df):
         if df.empty:
@@ -15,6 +18,13 @@ class AIInterpreterService:
 
         try:
             sample = df.tail(10)[["timestamp", "price"]].to_string(index=False)
+
+            # Same coin + same recent prices -> same insight, no API call
+            key = self.cache.key("interpret_chart", "gpt-4", coin_name, sample)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
             prompt = (
                 f"You are a financial analyst. Here are recent prices for {coin_name}:\n\n"
                 f"{sample}\n\n"
@@ -39,9 +49,40 @@ class AIInterpreterService:
             response = requests.post(self.endpoint, json=payload, headers=headers, timeout=15)
 
             if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"].strip()
+                insight = response.json()["choices"][0]["message"]["content"].strip()
+                self.cache.set(key, insight)
+                return insight
             else:
                 return f"OpenAI API error: {response.status_code} – {response.text}"
 
         except Exception as e:
             return f"Error interpreting chart: {e}"
+
+    def advise(self, pair, timeframe, prompt):
+        """
+        Trade advice for the TradeSense view. The prompt embeds the latest
+        indicator values, so it is part of the cache key. Raises on API errors.
+        """
+        key = self.cache.key("advise", "gpt-3.5-turbo", pair, timeframe, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        body = {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 500
+        }
+
+        res = requests.post(self.endpoint, headers=headers, json=body, timeout=30)
+        res.raise_for_status()
+        advice = res.json()["choices"][0]["message"]["content"].strip()
+        self.cache.set(key, advice)
+        return advice
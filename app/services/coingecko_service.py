@@ -1,15 +1,49 @@
-
-import requests
+import math
+import os
 import pandas as pd
 from datetime import datetime
 
+from app.services.http_cache import get_http_cache
+from app.utils.metrics import get_metrics
+
+# market_chart returns hourly points for 2-90 days, 5-minute points below that
+MIN_INCREMENTAL_DAYS = 2
+MAX_HOURLY_DAYS = 90
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+
 class CoinGeckoService:
+    def __init__(self, rate_limiter=None, cache=None, base_url=None):
+        # COINGECKO_API_URL points the service at a mirror or a local stand-in
+        self.base_url = base_url or os.getenv("COINGECKO_API_URL") or COINGECKO_API_URL
+        self.rate_limiter = rate_limiter
+        self.cache = cache or get_http_cache()
+
     def fetch_ohlcv(self, coin_id, vs_currency="usd", days="30"):
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
+        url = f"{self.base_url}/coins/{coin_id}/market_chart"
         params = {"vs_currency": vs_currency, "days": days}
-        res = requests.get(url, params=params).json()
+        res = self.cache.get(url, params=params, rate_limiter=self.rate_limiter).json()
 
-        prices = res.get("prices", [])
-        df = pd.DataFrame(prices, columns=["timestamp", "price"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        with get_metrics().stage("parse") as info:
+            prices = res.get("prices", [])
+            df = pd.DataFrame(prices, columns=["timestamp", "price"])
+            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+            info["rows"] = len(df)
         return df
+
+    def fetch_ohlcv_since(self, coin_id, vs_currency="usd", since=None, default_days="30"):
+        """
+        Fetch only the points newer than `since` (the stored high-watermark).
+        The window is rounded up to whole days and kept within the range that
+        market_chart serves hourly. Its last point is the live price at
+        request time, not an hourly one, so it is left out: the watermark
+        stays on the hourly grid instead of running ahead of the next hourly
+        point. (Were it a real hourly point, the next run would pick it up.)
+        """
+        if since is None:
+            return self.fetch_ohlcv(coin_id, vs_currency, default_days).iloc[:-1]
+
+        missing = (datetime.utcnow() - pd.Timestamp(since).to_pydatetime()).total_seconds() / 86400
+        days = min(max(math.ceil(missing), MIN_INCREMENTAL_DAYS), MAX_HOURLY_DAYS)
+        df = self.fetch_ohlcv(coin_id, vs_currency, str(days)).iloc[:-1]
+        return df[df["timestamp"] > pd.Timestamp(since)].reset_index(drop=True)
+
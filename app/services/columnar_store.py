@@ -0,0 +1,194 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.disk_cache import DATA_DIR
+
+TIMESTAMP_FILE = "timestamp.i8"
+MANIFEST_FILE = "manifest.json"
+
+
+class ColumnarStore:
+    """
+    Local append-only columnar store for price series, read through np.memmap.
+
+    Each dataset (e.g. "btc_usd" or "btc_usd_predictions") is a directory
+    holding generations (g000001/, g000002/, ...) of one raw file per column:
+    timestamp.i8 (int64 ns since epoch, strictly increasing) plus
+    <column>.f8 (float64). manifest.json names the current generation and its
+    committed row count. It is switched with os.replace after the data is
+    written, so readers never see a partial row.
+
+    Files a reader may have mapped are never truncated, renamed or deleted
+    in place, which Windows refuses for mapped files. append() writes past
+    the committed rows, and replace() writes a new generation. Old
+    generations are removed on later writes once nothing maps them any more.
+    One writer (the batch job) at a time; any number of readers.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("OHLCV_STORE_PATH") or os.path.join(DATA_DIR, "ohlcv_store")
+        self._lock = threading.Lock()
+
+    def _folder(self, name):
+        return os.path.join(self.root, name.lower())
+
+    def _manifest(self, name):
+        """{"generation", "rows"} of the current generation, or None for a missing dataset."""
+        folder = self._folder(name)
+        try:
+            with open(os.path.join(folder, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        # Datasets written before generations: column files directly in the folder
+        legacy = os.path.join(folder, TIMESTAMP_FILE)
+        if os.path.exists(legacy):
+            return {"generation": ".", "rows": os.path.getsize(legacy) // 8}
+        return None
+
+    def _write_manifest(self, name, generation, rows):
+        folder = self._folder(name)
+        staging = os.path.join(folder, MANIFEST_FILE + ".tmp")
+        with open(staging, "w") as f:
+            json.dump({"generation": generation, "rows": rows}, f)
+        for attempt in range(50):
+            try:
+                os.replace(staging, os.path.join(folder, MANIFEST_FILE))
+                return
+            except PermissionError:
+                # Windows: a reader has the manifest open for a moment
+                if attempt == 49:
+                    raise
+                time.sleep(0.01)
+
+    def _path(self, name, column, generation):
+        return os.path.join(self._folder(name), generation, column)
+
+    def _map(self, name, column, dtype, manifest):
+        length = manifest["rows"] if manifest else 0
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._path(name, column, manifest["generation"]), dtype=dtype, mode="r", shape=(length,))
+
+    def exists(self, name):
+        return self._manifest(name) is not None
+
+    def columns(self, name):
+        manifest = self._manifest(name)
+        if manifest is None:
+            return []
+        folder = os.path.join(self._folder(name), manifest["generation"])
+        return [f[:-3] for f in sorted(os.listdir(folder)) if f.endswith(".f8")]
+
+    def last_timestamp(self, name):
+        ts = self._map(name, TIMESTAMP_FILE, "<i8", self._manifest(name))
+        return pd.Timestamp(int(ts[-1])) if len(ts) else None
+
+    def append(self, name, df, columns):
+        """Append rows of `df` newer than the last stored timestamp. Returns rows written."""
+        with self._lock:
+            manifest = self._manifest(name)
+            if manifest is None:
+                return self._write_generation(name, df, columns, None)
+
+            last = self.last_timestamp(name)
+            if last is not None:
+                df = df[df["timestamp"] > last]
+            if df.empty:
+                return 0
+
+            rows = manifest["rows"]
+            values = [(f"{col}.f8", df[col].to_numpy(dtype="<f8")) for col in columns]
+            for column, data in values + [(TIMESTAMP_FILE, _to_ns(df["timestamp"]))]:
+                # Write after the committed rows; whatever an interrupted write
+                # left there is overwritten, never truncated under a reader's map
+                path = self._path(name, column, manifest["generation"])
+                with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                    f.seek(rows * 8)
+                    f.write(data.tobytes())
+            self._write_manifest(name, manifest["generation"], rows + len(df))
+            return len(df)
+
+    def replace(self, name, df, columns):
+        """Rewrite a dataset as a new generation; readers keep the old one until they re-read."""
+        with self._lock:
+            return self._write_generation(name, df, columns, self._manifest(name))
+
+    def _write_generation(self, name, df, columns, manifest):
+        previous = manifest["generation"] if manifest else None
+        number = int(previous[1:]) + 1 if previous and previous != "." else 1
+        generation = f"g{number:06d}"
+        folder = os.path.join(self._folder(name), generation)
+        shutil.rmtree(folder, ignore_errors=True)  # left by an interrupted write
+        os.makedirs(folder)
+        for col in columns:
+            df[col].to_numpy(dtype="<f8").tofile(os.path.join(folder, f"{col}.f8"))
+        _to_ns(df["timestamp"]).tofile(os.path.join(folder, TIMESTAMP_FILE))
+
+        self._write_manifest(name, generation, len(df))
+        self._collect(name, generation)
+        return len(df)
+
+    def _collect(self, name, current):
+        # Remove superseded generations. A file still mapped by a reader can't
+        # be deleted on Windows; it is retried on the next write.
+        folder = self._folder(name)
+        for entry in os.listdir(folder):
+            path = os.path.join(folder, entry)
+            if entry == current or entry == MANIFEST_FILE:
+                continue
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                elif entry.endswith((".f8", ".i8")):
+                    os.remove(path)  # pre-generation layout
+            except OSError:
+                pass
+
+    def read(self, name, start=None, end=None, columns=None):
+        """
+        Zero-copy slice of [start, end): returns {"timestamp": int64 ns, col: float64}
+        as read-only memmap views of the current generation. Only the pages in
+        the range are read from disk.
+        """
+        try:
+            return self._read(name, self._manifest(name), start, end, columns)
+        except FileNotFoundError:
+            # The generation was replaced and collected while we were opening it
+            return self._read(name, self._manifest(name), start, end, columns)
+
+    def _read(self, name, manifest, start, end, columns):
+        ts = self._map(name, TIMESTAMP_FILE, "<i8", manifest)
+        lo = int(np.searchsorted(ts, pd.Timestamp(start).value, side="left")) if start is not None else 0
+        hi = int(np.searchsorted(ts, pd.Timestamp(end).value, side="left")) if end is not None else len(ts)
+
+        out = {"timestamp": ts[lo:hi]}
+        for col in columns or self.columns(name):
+            out[col] = self._map(name, f"{col}.f8", "<f8", manifest)[lo:hi]
+        return out
+
+    def read_frame(self, name, start=None, end=None, columns=None):
+        data = self.read(name, start, end, columns)
+        df = pd.DataFrame({col: values for col, values in data.items() if col != "timestamp"})
+        df.insert(0, "timestamp", pd.to_datetime(np.asarray(data["timestamp"]), unit="ns"))
+        return df
+
+
+def _to_ns(timestamps):
+    return pd.to_datetime(timestamps).to_numpy(dtype="datetime64[ns]").view("<i8")
+
+
+_shared_store = None
+
+
+def get_columnar_store():
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = ColumnarStore()
+    return _shared_store
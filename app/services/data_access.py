@@ -0,0 +1,223 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import text
+
+from app.migrate import apply_migrations
+from app.utils.config import get_int
+
+logger = logging.getLogger("TradeSenseAI")
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    The process-wide SQLAlchemy engine (one connection pool for everything).
+    Pool size is set with DB_POOL_SIZE / DB_MAX_OVERFLOW.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            load_dotenv()
+            _engine = create_engine(
+                os.getenv("POSTGRES_URL"),
+                pool_size=get_int("DB_POOL_SIZE", 5),
+                max_overflow=get_int("DB_MAX_OVERFLOW", 10),
+                pool_pre_ping=True,   # drop connections the server closed while idle
+                pool_recycle=1800,
+            )
+        return _engine
+
+
+class DataAccess:
+    """
+    Typed read queries over the shared engine, with an in-process result
+    cache. Entries expire after QUERY_CACHE_SECONDS and are dropped as soon
+    as a writer in this process commits to a table they read
+    (see invalidate()). Writes from other processes are only seen after
+    the TTL.
+
+    Results are copies, so callers may modify them freely.
+    """
+
+    def __init__(self, engine: Optional[Engine] = None, ttl_seconds: Optional[int] = None):
+        self.engine = engine or get_engine()
+        self.ttl = get_int("QUERY_CACHE_SECONDS", 300) if ttl_seconds is None else ttl_seconds
+        self._cache = {}  # key -> (expires_at, tables, value)
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def ensure_schema(self) -> None:
+        # Tables from db/migrations (predictions, fundamentals_daily, ...) may
+        # not exist yet; readers run on several dashboard threads at once
+        with self._schema_lock:
+            if not self._schema_ready:
+                apply_migrations(self.engine)
+                self._schema_ready = True
+
+    def _cached(self, key, tables, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                return _copy(entry[2])
+        value = loader()
+        with self._lock:
+            self._cache[key] = (now + self.ttl, frozenset(tables), value)
+        return _copy(value)
+
+    def invalidate(self, *tables: str) -> None:
+        """Drop cached results that read any of `tables` (all results if none given)."""
+        with self._lock:
+            if not tables:
+                self._cache.clear()
+                return
+            stale = [key for key, (_, read, _) in self._cache.items() if read.intersection(tables)]
+            for key in stale:
+                del self._cache[key]
+
+    def _read(self, query, params=None) -> pd.DataFrame:
+        return pd.read_sql(text(query), self.engine, params=params)
+
+    def stream_frames(self, query: str, params: Optional[dict] = None,
+                      chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Run `query` on a server-side cursor and yield the result as DataFrames
+        of at most `chunk_rows` rows (STREAM_CHUNK_ROWS, default 50,000).
+        Memory stays bounded by one chunk however large the result is; the
+        connection is held until the generator is exhausted or closed.
+        Results are not cached.
+        """
+        chunk_rows = chunk_rows or get_int("STREAM_CHUNK_ROWS", 50_000)
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_rows)
+            result = conn.execute(text(query), params or {})
+            columns = list(result.keys())
+            for rows in result.partitions(chunk_rows):
+                yield pd.DataFrame.from_records(rows, columns=columns)
+
+    def stream_batches(self, query: str, params: Optional[dict] = None,
+                       chunk_rows: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Like stream_frames(), but each chunk is a {column: numpy array} batch."""
+        for frame in self.stream_frames(query, params, chunk_rows):
+            yield {column: frame[column].to_numpy() for column in frame.columns}
+
+    def reduce(self, query: str, reducer, params: Optional[dict] = None, chunk_rows: Optional[int] = None):
+        """
+        Feed every chunk of `query` to `reducer.update(frame)` and return the
+        reducer (e.g. GroupedStats), so aggregates over months of raw
+        snapshots run in constant memory.
+        """
+        for frame in self.stream_frames(query, params, chunk_rows):
+            reducer.update(frame)
+        return reducer
+
+    def supported_symbols(self, symbol_type: Optional[str] = "spot", with_predictions: bool = False) -> pd.DataFrame:
+        """Active symbols (symbol, coingecko_id, quote, symbol_type); optionally only those with predictions."""
+        query = """
+            SELECT s.symbol, s.coingecko_id, s.quote, s.symbol_type
+            FROM supported_symbols s
+            WHERE s.active = true
+        """
+        params = {}
+        if symbol_type:
+            query += " AND s.symbol_type = :symbol_type"
+            params["symbol_type"] = symbol_type
+        tables = ["supported_symbols"]
+        if with_predictions:
+            self.ensure_schema()
+            # One index probe per symbol on predictions' (symbol, timestamp) key
+            query += " AND EXISTS (SELECT 1 FROM predictions p WHERE p.symbol = s.symbol)"
+            tables.append("predictions")
+        key = ("supported_symbols", symbol_type, with_predictions)
+        return self._cached(key, tables, lambda: self._read(query, params))
+
+    def latest_fundamentals(self, symbol: str) -> Optional[dict]:
+        """Most recent fundamentals_data row for `symbol`, or None."""
+        query = """
+            SELECT *
+            FROM fundamentals_data
+            WHERE symbol = :symbol
+            ORDER BY timestamp DESC
+            LIMIT 1
+        """
+
+        def load():
+            df = self._read(query, {"symbol": symbol})
+            return df.iloc[0].to_dict() if not df.empty else None
+        return self._cached(("latest_fundamentals", symbol), ["fundamentals_data"], load)
+
+    def fundamentals_trend(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Daily rollups for `symbol` from fundamentals_daily, oldest first, or None."""
+        query = """
+            SELECT
+                day, avg_market_cap, pct_change_mcap,
+                avg_total_volume, pct_change_vol,
+                stddev_mcap, stddev_volume
+            FROM fundamentals_daily
+            WHERE symbol = :symbol
+            ORDER BY day ASC
+        """
+        self.ensure_schema()
+
+        def load():
+            df = self._read(query, {"symbol": symbol})
+            return df if not df.empty else None
+        return self._cached(("fundamentals_trend", symbol), ["fundamentals_daily"], load)
+
+    def predictions(self, symbols: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """symbol -> DataFrame(timestamp, price, predicted), in one query for all symbols."""
+        symbols = sorted({s.upper() for s in symbols})
+        query = """
+            SELECT symbol, "timestamp", price, predicted
+            FROM predictions
+            WHERE symbol = ANY(:symbols)
+            ORDER BY symbol, "timestamp"
+        """
+        self.ensure_schema()
+
+        def load():
+            df = self._read(query, {"symbols": symbols})
+            df["timestamp"] = pd.to_datetime(df["timestamp"])
+            return {
+                symbol: group.drop(columns="symbol").reset_index(drop=True)
+                for symbol, group in df.groupby("symbol")
+            }
+        return self._cached(("predictions", tuple(symbols)), ["predictions"], load)
+
+
+def _copy(value):
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    return value
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_data_access() -> DataAccess:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DataAccess()
+        return _shared
+
+
+def invalidate(*tables: str) -> None:
+    """Called by writer paths after a commit; a no-op until the shared cache exists."""
+    if _shared is not None:
+        _shared.invalidate(*tables)
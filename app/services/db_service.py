@@ -2,47 +2,240 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import io
+import json
 import os
 import pandas as pd
-from sqlalchemy import create_engine
 from sqlalchemy.sql import text  
 
+from app.core_data_extract.aggregator import ROLLUP_SQL, rollup_params
+from app.migrate import apply_migrations, ensure_partitions
+from app.services.data_access import get_engine, invalidate
+from app.utils.metrics import get_metrics
+
 def get_supported_symbols(self):
     q = text("SELECT symbol, coingecko_id, symbol_type FROM supported_symbols WHERE active = true")
     return pd.read_sql(q, self.engine)
 
 from datetime import datetime
 
+PRICES_TABLE = "prices"
+PREDICTIONS_TABLE = "predictions"
+SERIES_COLUMNS = {
+    PRICES_TABLE: ["timestamp", "price"],
+    PREDICTIONS_TABLE: ["timestamp", "price", "predicted"],
+}
+
 class DatabaseService:
     def __init__(self):
-        self.engine = create_engine(os.getenv("POSTGRES_URL"))
+        self.engine = get_engine()
+        self._schema_ready = False
         print("DB URL Loaded:", os.getenv("POSTGRES_URL"))
 
-    def save_ohlcv(self, pair, df):
-        df.to_sql(f"{pair.lower()}_ohlcv", self.engine, if_exists="replace", index=False)
+    def save_ohlcv(self, pair, df, incremental=False):
+        return self._save_series(PRICES_TABLE, pair, df, incremental)
+
+    def save_predictions(self, pair, df, incremental=False):
+        return self._save_series(PREDICTIONS_TABLE, pair, df, incremental)
+
+    def ensure_schema(self):
+        # Consolidated time-series tables are created by db/migrations on first use
+        if not self._schema_ready:
+            apply_migrations(self.engine)
+            self._schema_ready = True
+
+    def _save_series(self, table, pair, df, incremental):
+        # One row per (symbol, timestamp) in the shared table. Incremental mode
+        # appends only rows past the symbol's high-watermark; otherwise the
+        # symbol's rows are replaced in a single transaction.
+        self.ensure_schema()
+        symbol = pair.upper()
+        df = df[SERIES_COLUMNS[table]]
+        if incremental:
+            watermark = self._get_watermark(table, symbol)
+            if watermark is not None:
+                df = df[df["timestamp"] > pd.Timestamp(watermark)]
+            if df.empty:
+                return 0
+        df = df.assign(symbol=symbol)[["symbol"] + SERIES_COLUMNS[table]]
+
+        with self.engine.begin() as conn:
+            ensure_partitions(conn, table, df["timestamp"])
+            if not incremental:
+                conn.execute(text(f"DELETE FROM {table} WHERE symbol = :symbol"), {"symbol": symbol})
+            self._copy(conn, table, df)
+        invalidate(table)
+        return len(df)
+
+    def copy_frame(self, table, df, conflict_cols=None, replace=False):
+        """
+        Bulk-write a DataFrame with COPY FROM STDIN from an in-memory CSV buffer.
+
+        Missing tables are created from the frame's dtypes (as to_sql would);
+        replace=True recreates the table in the same transaction. With
+        `conflict_cols`, rows are COPYed into a temp staging table and merged
+        with INSERT ... ON CONFLICT DO UPDATE.
+        """
+        if df.empty and not replace:
+            return 0
+
+        with self.engine.begin() as conn:
+            df.head(0).to_sql(table, conn, if_exists="replace" if replace else "append", index=False)
+            self._copy(conn, table, df, conflict_cols)
+        invalidate(table)
+        return len(df)
+
+    def _copy(self, conn, table, df, conflict_cols=None):
+        columns = ", ".join(f'"{c}"' for c in df.columns)
+        buf = io.StringIO()
+        _copy_ready(df).to_csv(buf, index=False, header=False)
+        buf.seek(0)
+
+        get_metrics().incr("db_rows_written_total", len(df), table=table)
+        get_metrics().incr("db_bytes_copied_total", len(buf.getvalue()), table=table)
+        cursor = conn.connection.cursor()
+        try:
+            if not conflict_cols:
+                cursor.copy_expert(f'COPY "{table}" ({columns}) FROM STDIN WITH (FORMAT csv)', buf)
+            else:
+                updates = ", ".join(
+                    f'"{c}" = EXCLUDED."{c}"' for c in df.columns if c not in conflict_cols
+                )
+                keys = ", ".join(f'"{c}"' for c in conflict_cols)
+                cursor.execute(
+                    f'CREATE TEMP TABLE "_stage_{table}" (LIKE "{table}" INCLUDING DEFAULTS) ON COMMIT DROP'
+                )
+                cursor.copy_expert(f'COPY "_stage_{table}" ({columns}) FROM STDIN WITH (FORMAT csv)', buf)
+                cursor.execute(
+                    f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "_stage_{table}" '
+                    f'ON CONFLICT ({keys}) DO ' + (f"UPDATE SET {updates}" if updates else "NOTHING")
+                )
+        finally:
+            cursor.close()
+
+    def _get_watermark(self, table, symbol):
+        # Served by the (symbol, timestamp) primary key: one index probe
+        self.ensure_schema()
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text(f'SELECT MAX("timestamp") FROM {table} WHERE symbol = :symbol'), {"symbol": symbol}
+            ).scalar()
 
-    def save_predictions(self, pair, df):
-        df.to_sql(f"{pair.lower()}_predictions", self.engine, if_exists="replace", index=False)
+    def get_ohlcv_watermark(self, pair):
+        return self._get_watermark(PRICES_TABLE, pair.upper())
+
+    def load_ohlcv(self, pair, since=None):
+        return self._load_series(PRICES_TABLE, [pair], since).drop(columns="symbol")
+
+    def load_predictions(self, pairs, since=None):
+        """Predictions for several symbols in one indexed query (symbol, timestamp, price, predicted)."""
+        return self._load_series(PREDICTIONS_TABLE, pairs, since)
+
+    def _load_series(self, table, pairs, since=None):
+        self.ensure_schema()
+        cols = ", ".join(f'"{c}"' for c in SERIES_COLUMNS[table])
+        q = f"SELECT symbol, {cols} FROM {table} WHERE symbol = ANY(:symbols)"
+        params = {"symbols": [p.upper() for p in pairs]}
+        if since is not None:
+            q += ' AND "timestamp" >= :since'
+            params["since"] = since
+        q += ' ORDER BY symbol, "timestamp"'
+        return pd.read_sql(text(q), self.engine, params=params)
 
     def save_fundamentals(self, symbol, data):
         # Prepare a single-row DataFrame
-        df = pd.DataFrame([{
-            "symbol": symbol,
-            "timestamp": data.get("timestamp", datetime.utcnow()),
-            "market_cap": data.get("market_cap"),
-            "circulating_supply": data.get("circulating_supply"),
-            "max_supply": data.get("max_supply"),
-            "total_volume": data.get("total_volume"),
-            "commit_count_4w": data.get("commit_count_4w"),
-            "tx_count": data.get("tx_count"),
-            "avg_gas_fee": data.get("avg_gas_fee"),
-            "fundamentals_score": data.get("fundamentals_score")
-        }])
-
-        # Append to fundamentals_data table
-        df.to_sql("fundamentals_data", self.engine, if_exists="append", index=False)
+        row = _fundamentals_row(symbol, data)
+        df = pd.DataFrame([row])
+
+        # Append to fundamentals_data and fold the snapshot into today's
+        # live fundamentals_daily row, in one transaction
+        self.ensure_schema()
+        with self.engine.begin() as conn:
+            df.to_sql("fundamentals_data", conn, if_exists="append", index=False)
+            conn.execute(ROLLUP_SQL, rollup_params([row]))
+        get_metrics().incr("db_rows_written_total", len(df), table="fundamentals_data")
+        invalidate("fundamentals_data", "fundamentals_daily")
+
+    def save_fundamentals_batch(self, fundamentals):
+        # One COPY for the whole universe; `fundamentals` maps symbol -> data.
+        # The rollup still runs once per snapshot, oldest first, so the
+        # accumulators see the same sequence as with save_fundamentals.
+        rows = [_fundamentals_row(symbol, data) for symbol, data in fundamentals.items()]
+        df = pd.DataFrame(rows)
+        if df.empty:
+            return 0
+
+        self.ensure_schema()
+        with self.engine.begin() as conn:
+            df.head(0).to_sql("fundamentals_data", conn, if_exists="append", index=False)
+            self._copy(conn, "fundamentals_data", df)
+            conn.execute(ROLLUP_SQL, rollup_params(rows))
+        invalidate("fundamentals_data", "fundamentals_daily")
+        return len(df)
         
+    def load_model_states(self, pairs):
+        """symbol -> {"model", "state", "watermark"} for the pairs that have a stored model."""
+        self.ensure_schema()
+        q = text("SELECT symbol, model, state, watermark FROM model_state WHERE symbol = ANY(:symbols)")
+        with self.engine.connect() as conn:
+            rows = conn.execute(q, {"symbols": [p.upper() for p in pairs]}).mappings().all()
+        return {
+            row["symbol"]: {"model": row["model"], "state": row["state"], "watermark": pd.Timestamp(row["watermark"])}
+            for row in rows
+        }
+
+    def save_model_state(self, pair, model, state, watermark, refit=False):
+        self.ensure_schema()
+        q = text("""
+            INSERT INTO model_state (symbol, model, state, watermark, n_obs, refit_at, updated_at)
+            VALUES (:symbol, :model, CAST(:state AS JSONB), :watermark, :n_obs,
+                    CASE WHEN :refit THEN now() END, now())
+            ON CONFLICT (symbol) DO UPDATE SET
+                model      = EXCLUDED.model,
+                state      = EXCLUDED.state,
+                watermark  = EXCLUDED.watermark,
+                n_obs      = EXCLUDED.n_obs,
+                refit_at   = COALESCE(EXCLUDED.refit_at, model_state.refit_at),
+                updated_at = now()
+        """)
+        with self.engine.begin() as conn:
+            conn.execute(q, {
+                "symbol": pair.upper(),
+                "model": model,
+                "state": json.dumps(state),
+                "watermark": pd.Timestamp(watermark).to_pydatetime(),
+                "n_obs": int(state.get("n", 0)),
+                "refit": bool(refit),
+            })
+
     def get_supported_symbols(self):
         q = text("SELECT symbol, coingecko_id, symbol_type FROM supported_symbols WHERE active = true")
         return pd.read_sql(q, self.engine)
 
+
+
+def _fundamentals_row(symbol, data):
+    return {
+        "symbol": symbol,
+        "timestamp": data.get("timestamp", datetime.utcnow()),
+        "market_cap": data.get("market_cap"),
+        "circulating_supply": data.get("circulating_supply"),
+        "max_supply": data.get("max_supply"),
+        "total_volume": data.get("total_volume"),
+        "commit_count_4w": data.get("commit_count_4w"),
+        "tx_count": data.get("tx_count"),
+        "avg_gas_fee": data.get("avg_gas_fee"),
+        "fundamentals_score": data.get("fundamentals_score")
+    }
+
+def _copy_ready(df):
+    # Whole-number float columns (ints that picked up NaN) are written as
+    # integers so COPY accepts them into INTEGER/BIGINT columns.
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.kind == "f":
+            present = values.dropna()
+            if not present.empty and (present % 1 == 0).all() and (present.abs() < 2**53).all():
+                df[col] = values.astype("Int64")
+    return df
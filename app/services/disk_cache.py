@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
+
+
+class DiskCache:
+    """
+    Small persistent key/value store on SQLite, bounded by total size with
+    least-recently-used eviction. Safe to share between threads (one
+    connection per thread) and between processes (SQLite locking, WAL mode).
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key         TEXT PRIMARY KEY,
+                    value       BLOB,
+                    meta        TEXT,
+                    stored_at   REAL,
+                    accessed_at REAL,
+                    size        INTEGER
+                )
+            """)
+            # Covering index: eviction walks (accessed_at, size, key) without touching blob pages
+            conn.execute("DROP INDEX IF EXISTS entries_accessed")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at, size, key)")
+            # Running byte total, kept in step by triggers in the writer's transaction
+            conn.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 1), bytes INTEGER)")
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+                BEGIN UPDATE totals SET bytes = bytes + NEW.size WHERE id = 1; END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries
+                BEGIN UPDATE totals SET bytes = bytes + NEW.size - OLD.size WHERE id = 1; END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+                BEGIN UPDATE totals SET bytes = bytes - OLD.size WHERE id = 1; END
+            """)
+            # One-time scan for caches created before the totals table existed
+            conn.execute("INSERT OR IGNORE INTO totals (id, bytes) SELECT 1, COALESCE(SUM(size), 0) FROM entries")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Return (value, meta, stored_at) or None; a hit refreshes its LRU position."""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, meta, stored_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0], json.loads(row[1] or "{}"), row[2]
+
+    def get_many(self, keys):
+        """get() for many keys at once: {key: (value, meta, stored_at)} for the keys present."""
+        conn = self._conn()
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, value, meta, stored_at FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update({row[0]: (row[1], json.loads(row[2] or "{}"), row[3]) for row in rows})
+        if found:
+            with conn:
+                conn.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?",
+                                 [(time.time(), key) for key in found])
+        return found
+
+    def set(self, key, value, meta=None):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO entries (key, value, meta, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, meta = excluded.meta, "
+                "stored_at = excluded.stored_at, accessed_at = excluded.accessed_at, size = excluded.size",
+                (key, value, json.dumps(meta or {}), now, now, len(value)),
+            )
+        self._evict()
+
+    def set_many(self, items, meta=None):
+        """set() for many (key, value) pairs in one transaction."""
+        now = time.time()
+        meta = json.dumps(meta or {})
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO entries (key, value, meta, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, meta = excluded.meta, "
+                "stored_at = excluded.stored_at, accessed_at = excluded.accessed_at, size = excluded.size",
+                [(key, value, meta, now, now, len(value)) for key, value in items],
+            )
+        self._evict()
+
+    def touch(self, key):
+        # Mark an entry as fresh again (e.g. after a 304 Not Modified)
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def total_bytes(self):
+        return self._conn().execute("SELECT bytes FROM totals WHERE id = 1").fetchone()[0]
+
+    def _evict(self):
+        # O(1) check against the running total; only an over-budget cache walks the LRU index
+        conn = self._conn()
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        with conn:
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                victims.append((key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
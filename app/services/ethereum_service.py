@@ -1,18 +1,62 @@
 import os
+
+import requests
 from web3 import Web3
 from dotenv import load_dotenv
 
+from app.utils.metrics import get_metrics
+
 load_dotenv()
 
 class EthereumService:
-    def __init__(self):
-        self.infura_url = os.getenv("INFURA_URL")
+    def __init__(self, url=None, web3=None):
+        self.infura_url = url or os.getenv("INFURA_URL")
         self.private_key = os.getenv("PRIVATE_KEY")
         self.wallet_address = os.getenv("WALLET_ADDRESS")
-        self.web3 = Web3(Web3.HTTPProvider(self.infura_url))
+        # Pass `web3` to run against another provider (e.g. eth-tester's EthereumTesterProvider)
+        self.web3 = web3 or Web3(Web3.HTTPProvider(self.infura_url))
+        self.session = requests.Session()
 
-        if not self.web3.isConnected():
+        if not self.web3.is_connected():
             raise ConnectionError("❌ Failed to connect to Infura RPC")
 
-        self.account = self.web3.eth.account.from_key(self.private_key)
-        print(f"✅ Connected as: {self.account.address}")
+        # Read-only use (e.g. on-chain metrics) needs no key
+        self.account = None
+        if self.private_key:
+            self.account = self.web3.eth.account.from_key(self.private_key)
+            print(f"✅ Connected as: {self.account.address}")
+
+    def rpc_batch(self, calls, timeout=30):
+        """
+        Send [(method, params), ...] as one JSON-RPC batch and return the
+        raw responses ({"result": ...} or {"error": ...}) in call order.
+        web3 v6 has no batch API, so HTTP providers get a single POST of the
+        request array; other providers fall back to one request per call.
+        """
+        metrics = get_metrics()
+        metrics.incr("rpc_calls_total", len(calls))
+        if not isinstance(self.web3.provider, Web3.HTTPProvider):
+            return [self._request(method, params) for method, params in calls]
+
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        with metrics.stage("rpc_batch", calls=len(calls)):
+            res = self.session.post(self.infura_url, json=payload, timeout=timeout)
+        metrics.incr("rpc_requests_total", status=res.status_code)
+        res.raise_for_status()
+        responses = res.json()
+        if isinstance(responses, dict):
+            # The whole batch was rejected (e.g. batch size over the node's limit)
+            raise RuntimeError(f"JSON-RPC batch rejected: {responses.get('error')}")
+        by_id = {response.get("id"): response for response in responses}
+        return [by_id.get(i, {"error": {"message": "no response"}}) for i in range(len(calls))]
+
+    def _request(self, method, params):
+        # Through web3's middleware, so in-process providers see the params they expect
+        try:
+            return {"result": self.web3.manager.request_blocking(method, params)}
+        except Exception as e:
+            return {"error": {"message": str(e)}}
+
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from app.services.disk_cache import DATA_DIR, DiskCache
+from app.utils.config import get_int
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger("TradeSenseAI")
+
+DEFAULT_TTL = 60
+MAX_RETRIES = 2
+# Fetches are serialized per key through a fixed pool of locks
+LOCK_STRIPES = 64
+
+
+def default_ttls():
+    """
+    Freshness per endpoint (first match wins), in seconds. The CoinGecko
+    catch-all follows COINGECKO_API_URL, so a mirror gets the same TTLs.
+    """
+    from app.services.coingecko_service import COINGECKO_API_URL
+    coingecko = (os.getenv("COINGECKO_API_URL") or COINGECKO_API_URL).rstrip("/")
+    return [
+        ("/market_chart", 300),
+        ("/coins/markets", 300),
+        (coingecko, 3600),
+        ("newsapi.org", 1800),
+    ]
+
+
+class CachedResponse:
+    def __init__(self, status_code, content, headers=None, from_cache=False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error: {self.text[:200]}")
+
+
+class HttpCache:
+    """
+    Shared on-disk cache for GET requests to CoinGecko and NewsAPI.
+
+    Fresh entries are served without touching the network. Stale entries
+    are revalidated with If-None-Match / If-Modified-Since when the server
+    sent validators. If the request fails with a connection error, timeout,
+    429 or 5xx, the stale copy is returned.
+    Only successful (200) responses are stored.
+    """
+
+    def __init__(self, path=None, max_bytes=None, ttls=None):
+        path = path or os.getenv("HTTP_CACHE_PATH") or os.path.join(DATA_DIR, "http_cache.sqlite")
+        max_bytes = max_bytes or get_int("HTTP_CACHE_MAX_MB", 256) * 1024 * 1024
+        self.store = DiskCache(path, max_bytes)
+        self.ttls = ttls or default_ttls()
+        self.session = requests.Session()
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def ttl_for(self, url):
+        for pattern, ttl in self.ttls:
+            if pattern in url:
+                return ttl
+        return DEFAULT_TTL
+
+    def _key(self, url, params):
+        raw = url + "?" + json.dumps(params or {}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _lock_for(self, key):
+        # One in-flight request per key, so concurrent callers share a fetch.
+        # Keys are hex digests; unrelated keys may share a stripe.
+        return self._locks[int(key[:8], 16) % len(self._locks)]
+
+    def get(self, url, params=None, headers=None, ttl=None, rate_limiter=None, timeout=30):
+        ttl = self.ttl_for(url) if ttl is None else ttl
+        key = self._key(url, params)
+
+        with self._lock_for(key):
+            cached = self.store.get(key)
+            if cached is not None:
+                content, meta, stored_at = cached
+                if time.time() - stored_at < ttl:
+                    get_metrics().incr("http_cache_hits_total")
+                    return CachedResponse(200, content, meta.get("headers"), from_cache=True)
+
+            request_headers = dict(headers or {})
+            if cached is not None:
+                validators = cached[1].get("headers", {})
+                if validators.get("ETag"):
+                    request_headers["If-None-Match"] = validators["ETag"]
+                if validators.get("Last-Modified"):
+                    request_headers["If-Modified-Since"] = validators["Last-Modified"]
+
+            metrics = get_metrics()
+            try:
+                with metrics.stage("http_fetch", url=url) as info:
+                    res = self._fetch(url, params, request_headers, rate_limiter, timeout, info)
+                    info.update(status=res.status_code, bytes=len(res.content))
+                metrics.incr("http_requests_total", status=res.status_code)
+                metrics.incr("http_bytes_downloaded_total", len(res.content))
+            except requests.RequestException as e:
+                metrics.incr("http_errors_total")
+                if cached is None or not isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                    raise
+                logger.warning(f"Serving stale cache for {url}: {e}")
+                return CachedResponse(200, cached[0], cached[1].get("headers"), from_cache=True)
+
+            if res.status_code == 304 and cached is not None:
+                self.store.touch(key)
+                return CachedResponse(200, cached[0], cached[1].get("headers"), from_cache=True)
+
+            kept = {h: res.headers[h] for h in ("ETag", "Last-Modified", "Content-Type") if h in res.headers}
+            if res.status_code == 200:
+                self.store.set(key, res.content, {"url": url, "headers": kept})
+            elif cached is not None and (res.status_code == 429 or res.status_code >= 500):
+                # Upstream trouble only; a 4xx means the request itself is wrong now
+                logger.warning(f"Serving stale cache for {url}: HTTP {res.status_code}")
+                return CachedResponse(200, cached[0], cached[1].get("headers"), from_cache=True)
+            return CachedResponse(res.status_code, res.content, kept)
+
+    def _fetch(self, url, params, headers, rate_limiter, timeout, info=None):
+        # Retries 429/5xx with backoff, honouring Retry-After when present
+        for attempt in range(MAX_RETRIES + 1):
+            if info is not None:
+                info["retries"] = attempt
+            if rate_limiter:
+                rate_limiter.acquire()
+            res = self.session.get(url, params=params, headers=headers, timeout=timeout)
+            if res.status_code != 429 and res.status_code < 500:
+                return res
+            if attempt == MAX_RETRIES:
+                return res
+            retry_after = res.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+            logger.warning(f"HTTP {res.status_code} from {url}, retrying in {delay}s")
+            get_metrics().incr("http_retries_total", status=res.status_code)
+            time.sleep(delay)
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_http_cache():
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = HttpCache()
+        return _shared_cache
@@ -0,0 +1,227 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+# Columns appended by IndicatorEngine, named as pandas_ta names them
+INDICATOR_COLUMNS = ["EMA_fast", "EMA_slow", "RSI_14", "MACD_12_26_9", "MACDh_12_26_9", "MACDs_12_26_9"]
+
+
+class AdjustedEMA:
+    """Streaming equivalent of Series.ewm(alpha=..., adjust=True, min_periods=...).mean()."""
+
+    __slots__ = ("decay", "min_periods", "num", "den", "count")
+
+    def __init__(self, alpha, min_periods=0):
+        self.decay = 1.0 - alpha
+        self.min_periods = min_periods
+        self.num = 0.0
+        self.den = 0.0
+        self.count = 0
+
+    def update(self, x):
+        if math.isnan(x):
+            self.num *= self.decay
+            self.den *= self.decay
+        else:
+            self.num = x + self.decay * self.num
+            self.den = 1.0 + self.decay * self.den
+            self.count += 1
+        if self.count == 0 or self.count < self.min_periods:
+            return NAN
+        return self.num / self.den
+
+    def clone(self):
+        other = AdjustedEMA.__new__(AdjustedEMA)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+
+class SeededEMA:
+    """Streaming pandas_ta.ema: SMA of the first `length` values, then adjust=False recursion."""
+
+    __slots__ = ("length", "alpha", "seed_sum", "count", "value")
+
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.seed_sum = 0.0
+        self.count = 0
+        self.value = NAN
+
+    def update(self, x):
+        self.count += 1
+        if self.count < self.length:
+            self.seed_sum += x
+            return NAN
+        if self.count == self.length:
+            self.value = (self.seed_sum + x) / self.length
+        else:
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+    def clone(self):
+        other = SeededEMA.__new__(SeededEMA)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+
+class IndicatorState:
+    """
+    O(1)-per-bar state for the TradeSense view indicators: EMA 9/21
+    (pandas ewm(span=...)), RSI 14 and MACD 12/26/9 (pandas_ta defaults).
+    """
+
+    def __init__(self):
+        self.ema_fast = AdjustedEMA(2.0 / (9 + 1))
+        self.ema_slow = AdjustedEMA(2.0 / (21 + 1))
+        self.rsi_gain = AdjustedEMA(1.0 / 14, min_periods=14)
+        self.rsi_loss = AdjustedEMA(1.0 / 14, min_periods=14)
+        self.macd_fast = SeededEMA(12)
+        self.macd_slow = SeededEMA(26)
+        self.macd_signal = SeededEMA(9)
+        self.prev_close = None
+
+    def update(self, close):
+        row = {
+            "EMA_fast": self.ema_fast.update(close),
+            "EMA_slow": self.ema_slow.update(close),
+        }
+
+        if self.prev_close is None:
+            row["RSI_14"] = NAN
+        else:
+            change = close - self.prev_close
+            gain = self.rsi_gain.update(max(change, 0.0))
+            loss = self.rsi_loss.update(min(change, 0.0))
+            total = gain + abs(loss)
+            row["RSI_14"] = 100 * gain / total if total else NAN
+        self.prev_close = close
+
+        fast = self.macd_fast.update(close)
+        slow = self.macd_slow.update(close)
+        macd = fast - slow
+        # The signal line starts at the first valid MACD value
+        signal = NAN if math.isnan(macd) else self.macd_signal.update(macd)
+        row["MACD_12_26_9"] = macd
+        row["MACDh_12_26_9"] = macd - signal
+        row["MACDs_12_26_9"] = signal
+        return row
+
+    def clone(self):
+        other = IndicatorState.__new__(IndicatorState)
+        for name, value in self.__dict__.items():
+            setattr(other, name, value.clone() if hasattr(value, "clone") else value)
+        return other
+
+
+class _Series:
+    def __init__(self, frame, state, before_last):
+        self.frame = frame
+        self.state = state
+        # State before the last bar, so a still-forming bar can be revised
+        self.before_last = before_last
+
+
+class IndicatorEngine:
+    """
+    Keeps indicator state and the computed series per (pair, timeframe).
+
+    compute() returns the input frame with indicator columns, reusing the
+    cached series when the bars are unchanged and only processing bars
+    that are new or revised. update() applies one live bar in O(1).
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def compute(self, pair, timeframe, df):
+        key = (pair, timeframe)
+        with self._lock:
+            cached = self._series.get(key)
+            start = self._reusable_prefix(cached, df) if cached else 0
+
+            if cached and start == len(df) == len(cached.frame):
+                return cached.frame
+
+            if cached and start == len(cached.frame):
+                # Only new bars appended since the last call
+                state = cached.state.clone()
+            elif cached and start == len(cached.frame) - 1 and 0 < start < len(df):
+                # The cached last bar was still forming and has been revised.
+                # If it was dropped instead, before_last would have to be the
+                # state before the new last bar, which isn't kept: recompute.
+                state = cached.before_last.clone()
+            else:
+                start, state = 0, IndicatorState()
+            rows = cached.frame[INDICATOR_COLUMNS].iloc[:start].to_dict("records") if start else []
+
+            before_last = state.clone()
+            for close in df["close"].iloc[start:].astype(float):
+                before_last = state.clone()
+                rows.append(state.update(close))
+
+            frame = df.copy()
+            values = pd.DataFrame(rows, index=df.index, columns=INDICATOR_COLUMNS)
+            for col in INDICATOR_COLUMNS:
+                frame[col] = values[col]
+            self._series[key] = _Series(frame, state, before_last)
+            return frame
+
+    def update(self, pair, timeframe, timestamp, close, replace_last=False, **fields):
+        """
+        Apply one bar to a cached series. replace_last=True revises the
+        current (still-forming) bar instead of appending a new one. Extra
+        `fields` (open, high, ...) are stored on the bar's row.
+        Returns the indicator values for that bar.
+        """
+        key = (pair, timeframe)
+        with self._lock:
+            cached = self._series[key]
+            if replace_last:
+                state = cached.before_last.clone()
+                frame = cached.frame.iloc[:-1]
+            else:
+                state = cached.state
+                frame = cached.frame
+            before_last = state.clone()
+            row = state.update(float(close))
+
+            new_bar = pd.DataFrame([{**fields, "close": close, **row}],
+                                   index=pd.DatetimeIndex([timestamp], name=frame.index.name))
+            self._series[key] = _Series(pd.concat([frame, new_bar]), state, before_last)
+            return row
+
+    def latest(self, pair, timeframe):
+        cached = self._series.get((pair, timeframe))
+        return None if cached is None else cached.frame.iloc[-1]
+
+    def latest_frame(self, pair, timeframe):
+        cached = self._series.get((pair, timeframe))
+        return None if cached is None else cached.frame
+
+    def _reusable_prefix(self, cached, df):
+        # Number of leading bars whose timestamp and close match the cache;
+        # the comparison is vectorized, nothing is recomputed here.
+        old = cached.frame
+        n = min(len(old), len(df))
+        if n == 0:
+            return 0
+        same_index = old.index[:n] == df.index[:n]
+        same_close = np.isclose(old["close"].values[:n].astype(float), df["close"].values[:n].astype(float),
+                                rtol=0, atol=0, equal_nan=True)
+        mismatch = np.flatnonzero(~(same_index & same_close))
+        return n if mismatch.size == 0 else int(mismatch[0])
+
+
+_shared_engine = IndicatorEngine()
+
+
+def get_indicator_engine():
+    return _shared_engine
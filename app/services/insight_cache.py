@@ -0,0 +1,39 @@
+import hashlib
+import json
+import os
+import time
+
+from app.services.disk_cache import DATA_DIR, DiskCache
+from app.utils.config import get_int
+
+
+class InsightCache:
+    """
+    Persistent cache of AI insights keyed on a hash of the prompt inputs
+    (symbol, timeframe, data tail / indicator values). Entries expire after
+    INSIGHT_CACHE_TTL_HOURS; the store is size-bounded with LRU eviction.
+    """
+
+    def __init__(self, path=None, ttl_hours=None, max_bytes=None):
+        path = path or os.getenv("INSIGHT_CACHE_PATH") or os.path.join(DATA_DIR, "insight_cache.sqlite")
+        max_bytes = max_bytes or get_int("INSIGHT_CACHE_MAX_MB", 32) * 1024 * 1024
+        # ttl_hours=0 is valid (cache disabled), so only None falls back to the default
+        ttl_hours = get_int("INSIGHT_CACHE_TTL_HOURS", 12) if ttl_hours is None else ttl_hours
+        self.ttl = ttl_hours * 3600
+        self.store = DiskCache(path, max_bytes)
+
+    def key(self, *parts):
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        cached = self.store.get(key)
+        if cached is None:
+            return None
+        value, _, stored_at = cached
+        if time.time() - stored_at >= self.ttl:
+            return None
+        return value.decode("utf-8")
+
+    def set(self, key, insight):
+        self.store.set(key, insight.encode("utf-8"))
@@ -1,11 +1,137 @@
-
 from sklearn.linear_model import LinearRegression
+import numpy as np
 import pandas as pd
 
+from app.utils.config import get_int
+
+SECONDS_PER_DAY = 86400.0
+
+
+class OnlineLinearState:
+    """
+    Exponentially weighted least squares for price ~ time, kept as weighted
+    sufficient statistics so new observations fold in at O(1) each: RLS
+    with a forgetting factor, where an observation's weight halves every
+    `half_life` days (0 = never forget, i.e. plain least squares).
+
+    Sums are centred on the newest observation (t0 in days, y0) so epoch
+    times and large prices don't cost precision.
+    """
+
+    MODEL = "linear_ewls"
+    SUMS = ("w", "st", "sy", "stt", "sty", "syy")
+
+    def __init__(self, half_life=0.0, t0=None, y0=0.0, n=0, **sums):
+        self.half_life = half_life
+        self.t0 = t0
+        self.y0 = y0
+        self.n = n
+        for name in self.SUMS:
+            setattr(self, name, sums.get(name, 0.0))
+
+    def _decay(self, t):
+        if self.t0 is None or not self.half_life:
+            return
+        factor = 0.5 ** ((t - self.t0) / self.half_life)
+        for name in self.SUMS:
+            setattr(self, name, getattr(self, name) * factor)
+
+    def _move_anchor(self, t, y):
+        if self.t0 is not None:
+            dt, dy = t - self.t0, y - self.y0
+            self.stt += dt * dt * self.w - 2 * dt * self.st
+            self.sty += dt * dy * self.w - dy * self.st - dt * self.sy
+            self.syy += dy * dy * self.w - 2 * dy * self.sy
+            self.st -= dt * self.w
+            self.sy -= dy * self.w
+        self.t0, self.y0 = t, y
+
+    def update(self, times, prices):
+        """Fold in observations (days, price), oldest first, all newer than t0."""
+        times = np.asarray(times, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        keep = ~(np.isnan(times) | np.isnan(prices))
+        times, prices = times[keep], prices[keep]
+        if not len(times):
+            return self
+        t_last, y_last = times[-1], prices[-1]
+        self._decay(t_last)
+        self._move_anchor(t_last, y_last)
+
+        a, b = times - t_last, prices - y_last
+        w = 0.5 ** (-a / self.half_life) if self.half_life else np.ones_like(a)
+        self.w += w.sum()
+        self.st += (w * a).sum()
+        self.sy += (w * b).sum()
+        self.stt += (w * a * a).sum()
+        self.sty += (w * a * b).sum()
+        self.syy += (w * b * b).sum()
+        self.n += len(times)
+        return self
+
+    def _moments(self):
+        mt, my = self.st / self.w, self.sy / self.w
+        var_t = self.stt / self.w - mt * mt
+        cov = self.sty / self.w - mt * my
+        var_y = self.syy / self.w - my * my
+        return mt, my, var_t, cov, var_y
+
+    def coefficients(self):
+        """(level at t0, slope per day)."""
+        if not self.w:
+            return self.y0, 0.0
+        mt, my, var_t, cov, _ = self._moments()
+        slope = cov / var_t if var_t > 0 else 0.0
+        return self.y0 + my - slope * mt, slope
+
+    def predict(self, times):
+        level, slope = self.coefficients()
+        return level + slope * (np.asarray(times, dtype=float) - self.t0)
+
+    def residual_variance(self):
+        if not self.w:
+            return 0.0
+        _, _, var_t, cov, var_y = self._moments()
+        explained = cov * cov / var_t if var_t > 0 else 0.0
+        return max(var_y - explained, 0.0)
+
+    def to_dict(self):
+        return {"half_life": self.half_life, "t0": self.t0, "y0": self.y0, "n": self.n,
+                **{name: getattr(self, name) for name in self.SUMS}}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+TICKS_PER_SECOND = {"s": 1, "ms": 10**3, "us": 10**6, "ns": 10**9}
+
+
+def _epoch_seconds(timestamps):
+    # Unit-safe: frames come in as datetime64[ms] (CoinGecko), [us] (DB) or [ns]
+    index = pd.DatetimeIndex(timestamps)
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return index.asi8 / TICKS_PER_SECOND[index.unit]
+
+
+def _days(timestamps):
+    return _epoch_seconds(timestamps) / SECONDS_PER_DAY
+
+
 class PredictionModel:
+    def __init__(self, half_life_hours=None, drift_factor=None, drift_min_obs=None):
+        # Stateful mode settings: forgetting half-life (0 = none), and a refit
+        # when new points' mean squared error exceeds drift_factor x the
+        # model's residual variance (given at least drift_min_obs points)
+        hours = get_int("MODEL_HALF_LIFE_HOURS", 240) if half_life_hours is None else half_life_hours
+        self.half_life = hours / 24.0
+        self.drift_factor = get_int("MODEL_DRIFT_FACTOR", 4) if drift_factor is None else drift_factor
+        self.drift_min_obs = get_int("MODEL_DRIFT_MIN_OBS", 5) if drift_min_obs is None else drift_min_obs
+
     def train_and_predict(self, df):
         df = df.copy()
-        df["time"] = df["timestamp"].astype("int64") // 10**9
+        df["time"] = _epoch_seconds(df["timestamp"]).astype("int64")
         df["price"] = df["price"].astype(float)
 
         X = df["time"].values.reshape(-1, 1)
@@ -15,3 +141,114 @@ class PredictionModel:
         model.fit(X, y)
         df["predicted"] = model.predict(X)
         return df
+
+    def fit_many(self, times, prices):
+        """
+        Closed-form least squares for many independent price ~ time fits.
+
+        `times` and `prices` are aligned (n_symbols, n_obs) arrays padded with
+        NaN where a symbol has fewer observations. Returns (intercepts, slopes).
+        """
+        mask = ~(np.isnan(times) | np.isnan(prices))
+        n = mask.sum(axis=1)
+        safe_n = np.maximum(n, 1)
+
+        t_mean = np.where(mask, times, 0.0).sum(axis=1) / safe_n
+        y_mean = np.where(mask, prices, 0.0).sum(axis=1) / safe_n
+
+        # Centre before multiplying: epoch seconds squared would lose precision
+        dt = np.where(mask, times - t_mean[:, None], 0.0)
+        dy = np.where(mask, prices - y_mean[:, None], 0.0)
+        sxx = (dt * dt).sum(axis=1)
+        sxy = (dt * dy).sum(axis=1)
+
+        slopes = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+        intercepts = y_mean - slopes * t_mean
+        return intercepts, slopes
+
+    def train_and_predict_many(self, frames):
+        """
+        Vectorized train_and_predict for the whole universe.
+        `frames` maps label -> DataFrame(timestamp, price); returns
+        label -> DataFrame with the same columns train_and_predict adds.
+        """
+        frames = {label: df for label, df in frames.items() if not df.empty}
+        if not frames:
+            return {}
+
+        labels = list(frames)
+        width = max(len(df) for df in frames.values())
+        times = np.full((len(labels), width), np.nan)
+        prices = np.full((len(labels), width), np.nan)
+        for i, label in enumerate(labels):
+            df = frames[label]
+            times[i, :len(df)] = _epoch_seconds(df["timestamp"])
+            prices[i, :len(df)] = df["price"].astype(float).values
+
+        intercepts, slopes = self.fit_many(times, prices)
+        predicted = intercepts[:, None] + slopes[:, None] * times
+
+        results = {}
+        for i, label in enumerate(labels):
+            df = frames[label].copy()
+            n = len(df)
+            df["time"] = times[i, :n].astype("int64")
+            df["price"] = prices[i, :n]
+            df["predicted"] = predicted[i, :n]
+            results[label] = df
+        return results
+
+    def fit_state(self, window):
+        """Fresh OnlineLinearState fitted on `window` (timestamp, price)."""
+        window = window.sort_values("timestamp")
+        return OnlineLinearState(self.half_life).update(_days(window["timestamp"]), window["price"].astype(float))
+
+    def drifted(self, state, new_rows):
+        """True when `new_rows` are predicted much worse than the state's own fit explains."""
+        if len(new_rows) < max(self.drift_min_obs, 1):
+            return False
+        errors = new_rows["price"].astype(float).values - state.predict(_days(new_rows["timestamp"]))
+        # Floor the variance so a near-perfect fit doesn't flag rounding noise
+        floor = (1e-4 * abs(state.y0)) ** 2
+        return float(np.nanmean(errors ** 2)) > self.drift_factor * max(state.residual_variance(), floor)
+
+    def predict_online(self, df, stored=None, load_window=None, refit=False):
+        """
+        Stateful variant of train_and_predict for one symbol.
+
+        `stored` is the persisted {"model", "state", "watermark"} (or None);
+        only rows of `df` past its watermark are folded into the state. A
+        full refit on `load_window()` happens when there is no usable state,
+        when `refit` is set, or when the new rows show drift.
+        Returns (predictions like train_and_predict, state, refit reason or None).
+        """
+        df = df.sort_values("timestamp").reset_index(drop=True)
+        reason = None
+        state = None
+        if stored and stored.get("model") == OnlineLinearState.MODEL:
+            state = OnlineLinearState.from_dict(stored["state"])
+            if state.half_life != self.half_life:
+                state, reason = None, "config"
+        else:
+            reason = "new"
+        if refit:
+            reason = "requested"
+
+        new_rows = df
+        if state is not None and reason is None:
+            new_rows = df[df["timestamp"] > stored["watermark"]]
+            if self.drifted(state, new_rows):
+                reason = "drift"
+
+        if reason:
+            window = load_window() if load_window else df
+            state = self.fit_state(window)
+        else:
+            state.update(_days(new_rows["timestamp"]), new_rows["price"].astype(float))
+
+        out = df.copy()
+        out["time"] = _epoch_seconds(out["timestamp"]).astype("int64")
+        out["price"] = out["price"].astype(float)
+        out["predicted"] = state.predict(_days(out["timestamp"]))
+        return out, state, reason
+
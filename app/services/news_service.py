@@ -1,11 +1,13 @@
 import os
-import requests
 from datetime import datetime, timedelta
 
+from app.services.http_cache import get_http_cache
+
 class NewsService:
     def __init__(self):
         self.api_key = os.getenv("NEWS_API_KEY")
         self.base_url = "https://newsapi.org/v2/everything"
+        self.cache = get_http_cache()
 
     def get_news_for_coin(self, coin_name):
         today = datetime.utcnow().date()
@@ -18,6 +20,6 @@ class NewsService:
             "language": "en",
             "pageSize": 3
         }
-        response = requests.get(self.base_url, params=params)
+        response = self.cache.get(self.base_url, params=params)
         articles = response.json().get("articles", [])
         return [(a["title"], a["url"]) for a in articles]
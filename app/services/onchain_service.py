@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+
+from app.services.disk_cache import DATA_DIR, DiskCache
+from app.utils.config import get_int
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger("TradeSenseAI")
+
+GWEI = 10**9
+# eth_feeHistory covers at most 1024 blocks per call
+FEE_HISTORY_MAX_BLOCKS = 1024
+
+
+class OnchainMetrics:
+    """
+    Chain activity for fundamentals_data (tx_count, avg_gas_fee) over the
+    last ONCHAIN_WINDOW_BLOCKS blocks (default 7200, about a day on mainnet).
+
+    Headers (eth_getBlockByNumber) and priority fees (eth_feeHistory) are
+    fetched in JSON-RPC batches of ONCHAIN_BATCH_SIZE calls. Each block is
+    reduced to a small summary and kept in a local DiskCache, so
+    overlapping windows only fetch the blocks that are new. Blocks within
+    ONCHAIN_CONFIRMATIONS of the head may still be reorged and are not cached.
+
+    `transport` takes [(method, params), ...] and returns the JSON-RPC
+    responses in order; it defaults to EthereumService().rpc_batch.
+    """
+
+    def __init__(self, transport=None, cache=None, window_blocks=None, batch_size=None, confirmations=None):
+        if transport is None:
+            from app.services.ethereum_service import EthereumService
+            transport = EthereumService().rpc_batch
+        self.transport = transport
+        path = os.getenv("ONCHAIN_CACHE_PATH") or os.path.join(DATA_DIR, "onchain_blocks.sqlite")
+        self.cache = cache or DiskCache(path, get_int("ONCHAIN_CACHE_MAX_MB", 64) * 1024 * 1024)
+        self.window = window_blocks or get_int("ONCHAIN_WINDOW_BLOCKS", 7200)
+        self.batch_size = batch_size or get_int("ONCHAIN_BATCH_SIZE", 100)
+        self.confirmations = get_int("ONCHAIN_CONFIRMATIONS", 12) if confirmations is None else confirmations
+
+    def head(self):
+        """(chain id, latest block number) in one round trip."""
+        chain_id, latest = self.transport([("eth_chainId", []), ("eth_blockNumber", [])])
+        for response in (chain_id, latest):
+            if "error" in response:
+                raise RuntimeError(f"JSON-RPC error: {response['error']}")
+        return _quantity(chain_id["result"]), _quantity(latest["result"])
+
+    def blocks(self, first, last, chain_id, latest):
+        """Summaries of blocks first..last (inclusive), from the cache where possible."""
+        numbers = list(range(first, last + 1))
+        keys = {n: f"eth:{chain_id}:{n}" for n in numbers}
+        cached = self.cache.get_many(keys.values())
+        summaries = {n: json.loads(cached[keys[n]][0]) for n in numbers if keys[n] in cached}
+        missing = [n for n in numbers if n not in summaries]
+        get_metrics().incr("onchain_blocks_cached_total", len(summaries))
+
+        for start in range(0, len(missing), self.batch_size):
+            fetched = self._fetch(missing[start:start + self.batch_size])
+            summaries.update(fetched)
+            final = [(keys[n], json.dumps(s).encode()) for n, s in fetched.items() if n <= latest - self.confirmations]
+            if final:
+                self.cache.set_many(final)
+        get_metrics().incr("onchain_blocks_fetched_total", len(missing))
+        return [summaries[n] for n in numbers if n in summaries]
+
+    def _fetch(self, numbers):
+        # One batch: a header per block plus one fee history per contiguous run
+        runs, run = [], [numbers[0]]
+        for n in numbers[1:]:
+            if n == run[-1] + 1 and len(run) < FEE_HISTORY_MAX_BLOCKS:
+                run.append(n)
+            else:
+                runs.append(run)
+                run = [n]
+        runs.append(run)
+
+        calls = [("eth_getBlockByNumber", [hex(n), False]) for n in numbers]
+        calls += [("eth_feeHistory", [hex(len(run)), hex(run[-1]), [50]]) for run in runs]
+        responses = self.transport(calls)
+
+        tips = {}
+        for response in responses[len(numbers):]:
+            history = response.get("result") or {}
+            oldest = _quantity(history.get("oldestBlock", 0))
+            for i, reward in enumerate(history.get("reward") or []):
+                tips[oldest + i] = _quantity(reward[0]) if reward else None
+
+        summaries = {}
+        for n, response in zip(numbers, responses):
+            block = response.get("result")
+            if not block:
+                logger.warning(f"Block {n} not returned: {response.get('error')}")
+                continue
+            base_fee = block.get("baseFeePerGas")
+            summaries[n] = {
+                "timestamp": _quantity(block["timestamp"]),
+                "tx_count": len(block.get("transactions", [])),
+                "gas_used": _quantity(block["gasUsed"]),
+                "base_fee": _quantity(base_fee) if base_fee is not None else None,
+                "tip": tips.get(n),
+            }
+        return summaries
+
+    def collect(self):
+        """{"tx_count", "avg_gas_fee" (gwei, gas-weighted base fee + median tip), "blocks"} for the window."""
+        metrics = get_metrics()
+        with metrics.stage("onchain") as info:
+            chain_id, latest = self.head()
+            first = max(latest - self.window + 1, 0)
+            blocks = self.blocks(first, latest, chain_id, latest)
+            info.update(blocks=len(blocks), chain_id=chain_id)
+        return summarize_blocks(blocks)
+
+
+def _quantity(value):
+    # JSON-RPC quantities are hex strings; in-process providers (eth-tester) return ints
+    return value if isinstance(value, int) else int(value, 16)
+
+
+def summarize_blocks(blocks):
+    tx_count = sum(b["tx_count"] for b in blocks)
+    priced = [b for b in blocks if b["base_fee"] is not None or b["tip"] is not None]
+    gas = sum(b["gas_used"] for b in priced)
+    avg_gas_fee = None
+    if gas:
+        paid = sum(b["gas_used"] * ((b["base_fee"] or 0) + (b["tip"] or 0)) for b in priced)
+        avg_gas_fee = paid / gas / GWEI
+    return {"tx_count": tx_count, "avg_gas_fee": avg_gas_fee, "blocks": len(blocks)}
@@ -0,0 +1,42 @@
+class BarAggregator:
+    """
+    Turns a trade stream into fixed-interval OHLCV bars per symbol.
+    on_trade() returns (closed_bar_or_None, forming_bar); forming_bar is
+    None for a trade that belongs to an already closed bar.
+    """
+
+    def __init__(self, interval_seconds=60):
+        self.interval_ms = interval_seconds * 1000
+        self.current = {}
+        self.closed_until = {}  # symbol -> end of the last bar closed by close_stale()
+
+    def on_trade(self, symbol, ts_ms, price, qty):
+        bucket = ts_ms - ts_ms % self.interval_ms
+        bar = self.current.get(symbol)
+        closed = None
+
+        if bucket < self.closed_until.get(symbol, 0) or (bar is not None and bucket < bar["timestamp"]):
+            # Late trade for a bar that is already closed: ignore it
+            return None, None
+
+        if bar is None or bucket > bar["timestamp"]:
+            closed = bar
+            bar = {"timestamp": bucket, "open": price, "high": price, "low": price, "close": price, "volume": 0.0}
+            self.current[symbol] = bar
+
+        bar["high"] = max(bar["high"], price)
+        bar["low"] = min(bar["low"], price)
+        bar["close"] = price
+        bar["volume"] += qty
+        return closed, bar
+
+    def close_stale(self, now_ms):
+        """Close and return [(symbol, bar)] for bars whose interval ended before `now_ms` with no newer trade."""
+        closed = []
+        for symbol, bar in list(self.current.items()):
+            if bar["timestamp"] + self.interval_ms <= now_ms:
+                del self.current[symbol]
+                self.closed_until[symbol] = bar["timestamp"] + self.interval_ms
+                closed.append((symbol, bar))
+        return closed
+
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import logging
+
+import websockets
+
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger("TradeSenseAI")
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+
+
+def binance_trade_url(exchange_symbols, base_url=BINANCE_STREAM_URL):
+    # Combined stream: one connection carries the trades of every symbol
+    streams = "/".join(f"{s.lower()}@trade" for s in exchange_symbols)
+    return f"{base_url}?streams={streams}"
+
+
+def parse_binance_trade(message):
+    """
+    Binance trade event -> (exchange_symbol, ts_ms, price, qty), or None for
+    anything that isn't a trade. Accepts both raw and combined-stream frames.
+    """
+    data = json.loads(message)
+    data = data.get("data", data)
+    if data.get("e") != "trade":
+        return None
+    return data["s"], int(data["T"]), float(data["p"]), float(data["q"])
+
+
+class ExchangeFeed:
+    """
+    One WebSocket connection per exchange. Every parsed trade is passed to
+    `on_trade(label, ts_ms, price, qty)`; `symbols` maps the exchange's
+    symbol (e.g. BTCUSDT) to our label (e.g. BTC_USDT). Reconnects with
+    exponential backoff until stop() is called.
+    """
+
+    def __init__(self, name, url, symbols, on_trade, parser=parse_binance_trade):
+        self.name = name
+        self.url = url
+        self.symbols = symbols
+        self.on_trade = on_trade
+        self.parser = parser
+        self._stopped = asyncio.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    async def run(self):
+        backoff = 1
+        while not self._stopped.is_set():
+            try:
+                async with websockets.connect(self.url, ping_interval=20) as ws:
+                    logger.info(f"Connected to {self.name} feed")
+                    backoff = 1
+                    await self._consume(ws)
+            except (OSError, websockets.WebSocketException) as e:
+                if self._stopped.is_set():
+                    break
+                logger.warning(f"{self.name} feed disconnected ({e}); reconnecting in {backoff}s")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, 60)
+
+    async def _consume(self, ws):
+        stop = asyncio.ensure_future(self._stopped.wait())
+        try:
+            while True:
+                recv = asyncio.ensure_future(ws.recv())
+                done, _ = await asyncio.wait({recv, stop}, return_when=asyncio.FIRST_COMPLETED)
+                if stop in done:
+                    recv.cancel()
+                    return
+                message = recv.result()
+                try:
+                    trade = self.parser(message)
+                    if trade is None:
+                        continue
+                    exchange_symbol, ts_ms, price, qty = trade
+                except Exception as e:
+                    # One bad frame (control message, schema change) mustn't kill the feed
+                    logger.warning(f"Skipping unparseable {self.name} frame ({e!r}): {str(message)[:200]}")
+                    get_metrics().incr("stream_bad_frames_total", feed=self.name)
+                    continue
+                label = self.symbols.get(exchange_symbol)
+                if label:
+                    self.on_trade(label, ts_ms, price, qty)
+        finally:
+            stop.cancel()
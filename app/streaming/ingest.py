@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from app.streaming.bar_aggregator import BarAggregator
+from app.streaming.feed import ExchangeFeed, binance_trade_url
+from app.streaming.ring_buffer import BarRingBuffer
+from app.utils.config import get_int
+
+logger = logging.getLogger("TradeSenseAI")
+
+STREAM_TABLE = "stream_bars"
+# Exchange timestamps lag the trade a little; wait this long before closing a quiet bar
+CLOSE_GRACE_MS = 5000
+
+
+class StreamingIngest:
+    """
+    Streaming price ingest: exchange feeds -> per-symbol bars in ring
+    buffers -> batched DB flushes, with push updates to subscribers.
+
+    Subscribers are called as `callback(label, bar, closed)` on the ingest
+    thread for every trade (closed=False, forming bar) and once per
+    finished bar (closed=True). GUI code must hop to its own thread.
+
+    DB writes run on a single writer thread so COPY never blocks the feed's
+    event loop. A timer flushes every STREAM_FLUSH_SECONDS and closes bars
+    whose interval ended without a newer trade, so quiet symbols still get
+    their last bars written.
+    """
+
+    def __init__(self, db=None, interval_seconds=60, capacity=None, flush_rows=None, flush_seconds=None):
+        self.db = db
+        self.aggregator = BarAggregator(interval_seconds)
+        self.capacity = capacity or get_int("STREAM_BUFFER_BARS", 1440)
+        self.flush_rows = flush_rows or get_int("STREAM_FLUSH_ROWS", 500)
+        self.flush_seconds = flush_seconds or get_int("STREAM_FLUSH_SECONDS", 30)
+
+        self.buffers = {}
+        self.feeds = []
+        self._subscribers = []
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flush_queued = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-flush")
+        # Event-time clock: newest trade timestamp and when we saw it
+        self._last_trade_ms = None
+        self._last_trade_at = None
+        self._loop = None
+        self._thread = None
+
+    def add_feed(self, name, url, symbols, parser=None):
+        kwargs = {"parser": parser} if parser else {}
+        self.feeds.append(ExchangeFeed(name, url, symbols, self._on_trade, **kwargs))
+        for label in symbols.values():
+            self.buffers.setdefault(label, BarRingBuffer(self.capacity))
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def _on_trade(self, label, ts_ms, price, qty):
+        if self._last_trade_ms is None or ts_ms > self._last_trade_ms:
+            self._last_trade_ms, self._last_trade_at = ts_ms, time.monotonic()
+        closed, forming = self.aggregator.on_trade(label, ts_ms, price, qty)
+        if forming is None:
+            return  # late trade for a bar that was already closed
+        buffer = self.buffers.setdefault(label, BarRingBuffer(self.capacity))
+
+        if closed is not None:
+            self._close(label, closed)
+        if closed is not None or len(buffer) == 0 or buffer.last()["timestamp"] != forming["timestamp"]:
+            buffer.append(forming)
+        else:
+            buffer.update_last(forming)
+        self._notify(label, dict(forming), False)
+
+        if len(self._pending) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush_in_background()
+
+    def _close(self, label, bar):
+        with self._pending_lock:
+            self._pending.append({"symbol": label, **bar})
+        self._notify(label, bar, True)
+
+    def close_stale_bars(self):
+        """Close bars whose interval has passed on the feed's clock (newest trade + time since)."""
+        if self._last_trade_ms is None:
+            return 0
+        now_ms = self._last_trade_ms + (time.monotonic() - self._last_trade_at) * 1000 - CLOSE_GRACE_MS
+        stale = self.aggregator.close_stale(now_ms)
+        for label, bar in stale:
+            self._close(label, bar)
+        return len(stale)
+
+    def flush_in_background(self):
+        """Queue a flush on the writer thread (at most one queued at a time)."""
+        with self._pending_lock:
+            if self._flush_queued:
+                return
+            self._flush_queued = True
+        self._last_flush = time.monotonic()
+        self._writer.submit(self._background_flush)
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            with self._pending_lock:
+                self._flush_queued = False
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            self.close_stale_bars()
+            if self._pending:
+                self.flush_in_background()
+
+    def _notify(self, label, bar, closed):
+        for callback in list(self._subscribers):
+            try:
+                callback(label, bar, closed)
+            except Exception as e:
+                logger.warning(f"Stream subscriber failed: {e}")
+
+    def flush(self):
+        """Write closed bars collected since the last flush in one batch."""
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        if not rows or self.db is None:
+            return 0
+
+        df = pd.DataFrame(rows)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        try:
+            # stream_bars has a (symbol, timestamp) key; a retried batch merges instead of failing
+            self.db.ensure_schema()
+            return self.db.copy_frame(STREAM_TABLE, df, conflict_cols=["symbol", "timestamp"])
+        except Exception as e:
+            logger.error(f"Flushing {len(rows)} stream bars failed: {e}")
+            with self._pending_lock:
+                self._pending = rows + self._pending
+            return 0
+
+    async def run(self):
+        timer = asyncio.ensure_future(self._flush_periodically())
+        try:
+            await asyncio.gather(*(feed.run() for feed in self.feeds))
+        finally:
+            timer.cancel()
+
+    def start(self):
+        """Run all feeds on a background thread with its own event loop."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self.run(),),
+                                        name="stream-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        if self._loop is not None:
+            for feed in self.feeds:
+                self._loop.call_soon_threadsafe(feed.stop)
+            self._thread.join(timeout)
+        self._writer.shutdown(wait=True)
+        self.flush()
+
+
+def ingest_from_env(db=None):
+    """
+    Start a StreamingIngest for STREAM_SYMBOLS (EXCHANGE_SYMBOL=LABEL pairs,
+    comma-separated) on STREAM_URL, or the Binance trade stream. Returns
+    None when STREAM_SYMBOLS is not set. Without `db` the bars are only
+    pushed to subscribers.
+    """
+    pairs = [pair.strip() for pair in os.getenv("STREAM_SYMBOLS", "").split(",") if pair.strip()]
+    if not pairs:
+        return None
+    symbols = dict(pair.split("=", 1) for pair in pairs)
+    ingest = StreamingIngest(db=db, interval_seconds=get_int("STREAM_BAR_SECONDS", 60))
+    ingest.add_feed("binance", os.getenv("STREAM_URL") or binance_trade_url(symbols), symbols)
+    ingest.start()
+    logger.info(f"Streaming {', '.join(symbols.values())}")
+    return ingest
+
+
+if __name__ == "__main__":
+    from app.services.db_service import DatabaseService
+
+    parser = argparse.ArgumentParser(description="Stream exchange trades into bars")
+    parser.add_argument("--url", help="WebSocket URL (default: Binance combined trade stream)")
+    parser.add_argument("--symbols", nargs="+", required=True,
+                        help="EXCHANGE_SYMBOL=LABEL pairs, e.g. BTCUSDT=BTC_USDT")
+    parser.add_argument("--interval", type=int, default=60, help="bar length in seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    symbols = dict(pair.split("=", 1) for pair in args.symbols)
+    ingest = StreamingIngest(db=DatabaseService(), interval_seconds=args.interval)
+    ingest.add_feed("binance", args.url or binance_trade_url(symbols), symbols)
+    ingest.subscribe(lambda label, bar, closed: closed and logger.info(f"{label} bar closed: {bar}"))
+    try:
+        asyncio.run(ingest.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ingest.stop()
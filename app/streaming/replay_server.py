@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import logging
+
+import websockets
+
+logger = logging.getLogger("TradeSenseAI")
+
+
+def load_ticks(path):
+    # One recorded exchange frame (JSON) per line, in arrival order
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _tick_time_ms(frame):
+    # Frames without a timestamp (or not JSON at all) are replayed as-is, without a delay
+    try:
+        data = json.loads(frame)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    data = data.get("data", data)
+    return data.get("T") or data.get("E")
+
+
+class ReplayServer:
+    """
+    Local stand-in for an exchange WebSocket. Every client gets the
+    recorded frames replayed with their original spacing divided by `speed`
+    (speed=0 sends them back to back). Use it to exercise StreamingIngest
+    without touching a real exchange.
+    """
+
+    def __init__(self, frames, speed=1.0, host="127.0.0.1", port=8765, loop_forever=False):
+        self.frames = frames
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.loop_forever = loop_forever
+        self.server = None
+
+    async def _handler(self, websocket, path=None):
+        while True:
+            previous = None
+            for frame in self.frames:
+                ts = _tick_time_ms(frame)
+                if self.speed and previous is not None and ts is not None:
+                    await asyncio.sleep(max(ts - previous, 0) / 1000 / self.speed)
+                previous = ts if ts is not None else previous
+                await websocket.send(frame)
+            if not self.loop_forever:
+                break
+        await websocket.close()
+
+    async def start(self):
+        self.server = await websockets.serve(self._handler, self.host, self.port)
+        # Port 0 picks a free port; report the one actually bound
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def _serve(path, speed, host, port, loop_forever):
+    server = await ReplayServer(load_ticks(path), speed, host, port, loop_forever).start()
+    logger.info(f"Replaying {path} on {server.url} at {speed}x")
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded exchange ticks over WebSocket")
+    parser.add_argument("ticks", help="JSON-lines file of recorded frames")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (0 = no delay)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--loop", action="store_true", help="restart the recording when it ends")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve(args.ticks, args.speed, args.host, args.port, args.loop))
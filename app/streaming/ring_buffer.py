@@ -0,0 +1,57 @@
+import threading
+
+import numpy as np
+
+BAR_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+class BarRingBuffer:
+    """
+    Fixed-size in-memory history of bars for one symbol. Appends overwrite
+    the oldest bar once full; the forming bar can be updated in place.
+    """
+
+    def __init__(self, capacity=1440):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype="int64")  # bar open, ms since epoch
+        self.values = np.zeros((capacity, 5), dtype="float64")  # open, high, low, close, volume
+        self.count = 0
+        self.head = 0  # index of the next slot to write
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, bar):
+        with self.lock:
+            self._write(self.head, bar)
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def update_last(self, bar):
+        with self.lock:
+            if self.count == 0:
+                raise IndexError("update_last on an empty buffer")
+            self._write((self.head - 1) % self.capacity, bar)
+
+    def _write(self, i, bar):
+        self.timestamps[i] = bar["timestamp"]
+        self.values[i] = (bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"])
+
+    def last(self):
+        with self.lock:
+            if self.count == 0:
+                return None
+            i = (self.head - 1) % self.capacity
+            return dict(zip(BAR_FIELDS, (int(self.timestamps[i]), *self.values[i].tolist())))
+
+    def snapshot(self, n=None):
+        """Oldest-to-newest copy of the last `n` bars as {field: array}."""
+        with self.lock:
+            n = self.count if n is None else min(n, self.count)
+            idx = (np.arange(self.head - n, self.head)) % self.capacity
+            values = self.values[idx]
+            out = {"timestamp": self.timestamps[idx].copy()}
+            for j, field in enumerate(BAR_FIELDS[1:]):
+                out[field] = values[:, j].copy()
+            return out
@@ -0,0 +1,162 @@
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+UP_COLOR = "#26a69a"
+DOWN_COLOR = "#ef5350"
+
+
+def downsample_ohlcv(x, open_, high, low, close, volume, max_bars):
+    """
+    Min/max bucketing for candles: merge runs of bars so at most `max_bars`
+    remain (first open, max high, min low, last close, summed volume).
+    Returns (indices of each bucket's last bar, x, o, h, l, c, v).
+    """
+    n = len(x)
+    if n <= max_bars:
+        return np.arange(n), x, open_, high, low, close, volume
+
+    edges = np.linspace(0, n, max_bars + 1).astype(int)
+    starts, ends = edges[:-1], edges[1:] - 1
+    return (
+        ends,
+        x[starts],
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+        np.add.reduceat(volume, starts),
+    )
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the line's shape."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket is the triangle's third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _bar_segments(x, bottom, top):
+    return np.stack([np.column_stack([x, bottom]), np.column_stack([x, top])], axis=1)
+
+
+class CandleChart:
+    """
+    Reusable four-panel chart (candles + EMAs, RSI, MACD, volume) for the
+    TradeSense view. The figure, canvas and artists are created once;
+    update() swaps artist data in place and redraws, downsampling long
+    histories to roughly one candle per two horizontal pixels.
+    """
+
+    def __init__(self):
+        self.figure = Figure(figsize=(10, 8))
+        self.canvas = FigureCanvas(self.figure)
+        grid = self.figure.add_gridspec(4, 1, height_ratios=(3, 1, 1, 1), hspace=0.08)
+        self.ax_price = self.figure.add_subplot(grid[0])
+        self.ax_rsi = self.figure.add_subplot(grid[1], sharex=self.ax_price)
+        self.ax_macd = self.figure.add_subplot(grid[2], sharex=self.ax_price)
+        self.ax_volume = self.figure.add_subplot(grid[3], sharex=self.ax_price)
+
+        self.wicks = self.ax_price.add_collection(LineCollection([], linewidths=1))
+        self.bodies = self.ax_price.add_collection(LineCollection([], linewidths=4))
+        self.ema_fast, = self.ax_price.plot([], [], color="green", linewidth=1)
+        self.ema_slow, = self.ax_price.plot([], [], color="red", linewidth=1)
+        self.rsi, = self.ax_rsi.plot([], [], color="blue", linewidth=1)
+        self.macd_hist = self.ax_macd.add_collection(LineCollection([], colors="dimgray", linewidths=3))
+        self.macd, = self.ax_macd.plot([], [], linewidth=1)
+        self.macd_signal, = self.ax_macd.plot([], [], linewidth=1)
+        self.volume = self.ax_volume.add_collection(LineCollection([], colors="gray", linewidths=3))
+
+        self.ax_price.set_ylabel("Price (USD)")
+        self.ax_rsi.set_ylabel("RSI")
+        self.ax_macd.set_ylabel("MACD Hist")
+        self.ax_volume.set_ylabel("Volume")
+        locator = mdates.AutoDateLocator()
+        self.ax_volume.xaxis.set_major_locator(locator)
+        self.ax_volume.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        for ax in (self.ax_price, self.ax_rsi, self.ax_macd):
+            ax.tick_params(labelbottom=False)
+
+    def max_bars(self):
+        return max(50, self.canvas.width() // 2)
+
+    def update(self, df, title):
+        x = mdates.date2num(df.index.to_pydatetime())
+        idx, xs, o, h, l, c, v = downsample_ohlcv(
+            x, df["open"].values, df["high"].values, df["low"].values,
+            df["close"].values, df["volume"].values, self.max_bars(),
+        )
+        colors = np.where(c >= o, UP_COLOR, DOWN_COLOR)
+        # Indicators are sampled at each bucket's last bar, so they go at that bar's x
+        xi = x[idx]
+
+        self.wicks.set_segments(_bar_segments(xs, l, h))
+        self.wicks.set_colors(colors)
+        self.bodies.set_segments(_bar_segments(xs, o, c))
+        self.bodies.set_colors(colors)
+        self.ema_fast.set_data(xi, df["EMA_fast"].values[idx])
+        self.ema_slow.set_data(xi, df["EMA_slow"].values[idx])
+        self.rsi.set_data(xi, df["RSI_14"].values[idx])
+        hist = df["MACDh_12_26_9"].values[idx]
+        self.macd_hist.set_segments(_bar_segments(xi, np.zeros_like(hist), hist))
+        self.macd.set_data(xi, df["MACD_12_26_9"].values[idx])
+        self.macd_signal.set_data(xi, df["MACDs_12_26_9"].values[idx])
+        self.volume.set_segments(_bar_segments(xs, np.zeros_like(v), v))
+
+        # Body width follows candle spacing so zoomed-out charts don't overlap
+        spacing = self.canvas.width() / max(len(xs), 1)
+        self.bodies.set_linewidth(max(1.0, min(8.0, spacing * 0.6)))
+
+        # relim() only sees Line2D artists; add the collections' extents by hand
+        axes = (self.ax_price, self.ax_rsi, self.ax_macd, self.ax_volume)
+        for ax in axes:
+            ax.relim()
+        self.ax_price.update_datalim(np.column_stack([np.r_[xs, xs], np.r_[l, h]]))
+        self.ax_macd.update_datalim(np.column_stack([np.r_[xi, xi], np.r_[hist, np.zeros_like(hist)]]))
+        self.ax_volume.update_datalim(np.column_stack([np.r_[xs, xs], np.r_[v, np.zeros_like(v)]]))
+        for ax in axes:
+            ax.autoscale_view()
+        self.ax_price.set_title(title)
+        self.canvas.draw_idle()
+
+
+class LineChart:
+    """Small reusable line chart; series are LTTB-downsampled to the canvas width."""
+
+    def __init__(self, labels, title="", figsize=(5, 2.5)):
+        self.figure = Figure(figsize=figsize)
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.lines = {label: self.ax.plot([], [], label=label)[0] for label in labels}
+        self.ax.set_title(title)
+        self.ax.legend()
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+    def update(self, timestamps, series):
+        x = mdates.date2num(timestamps.to_pydatetime()) if hasattr(timestamps, "to_pydatetime") else np.asarray(timestamps)
+        n_out = max(100, self.canvas.width())
+        for label, values in series.items():
+            y = np.asarray(values, dtype=float)
+            keep = lttb(x, y, n_out)
+            self.lines[label].set_data(x[keep], y[keep])
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
@@ -1,51 +1,113 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QScrollArea, QFrame, QPushButton, QDialog, QDialogButtonBox
-from PyQt5.QtCore import Qt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from sqlalchemy import create_engine
-from sqlalchemy.sql import text
+from PyQt5.QtCore import Qt, QThreadPool
 import pandas as pd
 import os
+from functools import partial
 
 from app.services.ai_interpreter_service import AIInterpreterService
+from app.services.columnar_store import get_columnar_store
+from app.services.data_access import get_data_access
 from app.services.news_service import NewsService
-from app.services.text_to_speech_service import TextToSpeechService
-from app.ui.tradesense_view_widget import TradeSenseViewWidget
+from app.ui.workers import Worker
+from app.utils.config import get_int
 
 from dotenv import load_dotenv
 load_dotenv()
 
+
+def _clear_layout(layout):
+    while layout.count():
+        item = layout.takeAt(0)
+        if item.widget():
+            item.widget().deleteLater()
+
 class DashboardWidget(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.engine = create_engine(os.getenv("POSTGRES_URL"))
+        self.data = get_data_access()
         self.ai = AIInterpreterService()
         self.news_service = NewsService()
-        self.tts = TextToSpeechService()
-        self.coins = self._load_supported_symbols()
+        self._tts = None  # speech engine starts on the first "Listen" click
+
+        # Card data, AI insight and news load on a background pool; every
+        # running worker is tracked so cancel_loads() can stop late results,
+        # and dropped once it has reported back.
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(get_int("DASHBOARD_WORKERS", 8))
+        self._workers = set()
+        self._cancelled = False
 
         self.init_ui()
+        self._run_in_background(self._load_supported_symbols, self._add_coin_cards)
 
     def init_ui(self):
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         container = QWidget()
-        layout = QVBoxLayout(container)
+        self.cards_layout = QVBoxLayout(container)
 
         title = QLabel("Crypto Dashboard")
         title.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title)
-
-        for symbol, coin_name in self.coins.items():
-            card = self._create_coin_card(symbol, coin_name)
-            layout.addWidget(card)
+        self.cards_layout.addWidget(title)
 
         scroll.setWidget(container)
         main_layout = QVBoxLayout()
         main_layout.addWidget(scroll)
         self.setLayout(main_layout)
 
+    def _add_coin_cards(self, coins):
+        self.coins = coins
+        self._card_handlers = {}
+        for symbol, coin_name in self.coins.items():
+            card = self._create_coin_card(symbol, coin_name)
+            self.cards_layout.addWidget(card)
+        # Every card's series comes from one query rather than one per card
+        self._run_in_background(self._load_cards_data, self._on_cards_data, self._on_cards_error, list(coins))
+
+    def _on_cards_data(self, frames):
+        for symbol, (on_data, on_error) in self._card_handlers.items():
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                on_error("no predictions stored")
+            else:
+                on_data(df)
+
+    def _on_cards_error(self, error):
+        for _, on_error in self._card_handlers.values():
+            on_error(error)
+
+    @property
+    def tts(self):
+        if self._tts is None:
+            from app.services.text_to_speech_service import TextToSpeechService
+            self._tts = TextToSpeechService()
+        return self._tts
+
+    def _run_in_background(self, fn, on_result, on_error=None, *args):
+        if self._cancelled:
+            return None
+        worker = Worker(fn, *args)
+        worker.signals.result.connect(on_result)
+        if on_error:
+            worker.signals.error.connect(on_error)
+        worker.signals.finished.connect(partial(self._workers.discard, worker))
+        self._workers.add(worker)
+        self.pool.start(worker)
+        return worker
+
+    def cancel_loads(self):
+        """Drop queued loads and silence running ones (e.g. on window close)."""
+        self._cancelled = True
+        self.pool.clear()
+        for worker in self._workers:
+            worker.cancel()
+        self._workers.clear()
+
+    def closeEvent(self, event):
+        self.cancel_loads()
+        super().closeEvent(event)
+
     def _create_coin_card(self, symbol, name):
         frame = QFrame()
         frame.setStyleSheet("""
@@ -62,68 +124,111 @@ class DashboardWidget(QWidget):
         """)
         layout = QVBoxLayout()
 
-        try:
-            query = f'SELECT * FROM "{symbol}_predictions"'
-            df = pd.read_sql(text(query), self.engine)
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-
-            fig = Figure(figsize=(5, 2.5))
-            ax = fig.add_subplot(111)
-            ax.plot(df["timestamp"], df["price"], label="Actual")
-            ax.plot(df["timestamp"], df["predicted"], label="Predicted")
-            ax.set_title(f"{name} Price vs Prediction")
-            ax.legend()
-            canvas = FigureCanvas(fig)
-            layout.addWidget(canvas)
-
-            insight = self.ai.interpret_chart(name, df)
-            insight_label = QLabel(insight)
-            insight_label.setWordWrap(True)
-            insight_label.setStyleSheet("""
-                font-size: 16px;
+        # Placeholders, replaced section by section as the loads finish
+        chart_placeholder = QLabel(f"Loading {name} chart…")
+        layout.addWidget(chart_placeholder)
+
+        insight_label = QLabel("Generating insight…")
+        insight_label.setWordWrap(True)
+        insight_label.setStyleSheet("""
+            font-size: 16px;
+            font-weight: bold;
+            color: #333;
+            margin-top: 10px;
+            margin-bottom: 20px;
+        """)
+        layout.addWidget(insight_label)
+
+        news_title = QLabel(f"<b>📰 Recent News on {name}</b>")
+        layout.addWidget(news_title)
+        news_layout = QVBoxLayout()
+        news_layout.addWidget(QLabel("Loading news…"))
+        layout.addLayout(news_layout)
+
+        card = {"df": None, "insight": None}
+
+        listen_btn = QPushButton("🔊 Listen to Insight")
+        listen_btn.setEnabled(False)
+        listen_btn.clicked.connect(lambda _: self.tts.speak(card["insight"]))
+        layout.addWidget(listen_btn)
+
+        expand_btn = QPushButton("View Fullscreen")
+        expand_btn.setEnabled(False)
+        expand_btn.clicked.connect(lambda: self._open_detail_view(symbol, name, card["df"], card["insight"]))
+        layout.addWidget(expand_btn)
+        expand_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #4a90e2;
+                color: white;
+                padding: 6px 12px;
+                border-radius: 6px;
                 font-weight: bold;
-                color: #333;
-                margin-top: 10px;
-                margin-bottom: 20px;
-            """)
-            layout.addWidget(insight_label)
-
-            news = self.news_service.get_news_for_coin(symbol.split("_")[0])
-            news_title = QLabel(f"<b>📰 Recent News on {name}</b>")
-            layout.addWidget(news_title)
+            }
+            QPushButton:hover {
+                background-color: #357ab8;
+            }
+        """)
 
+        def on_data(df):
+            card["df"] = df
+            if card.get("chart") is None:
+                # matplotlib is imported with the first chart, not at startup
+                from app.ui.chart_renderer import LineChart
+                card["chart"] = LineChart(["Actual", "Predicted"], f"{name} Price vs Prediction")
+                layout.replaceWidget(chart_placeholder, card["chart"].canvas)
+                chart_placeholder.deleteLater()
+            card["chart"].update(
+                pd.DatetimeIndex(df["timestamp"]),
+                {"Actual": df["price"], "Predicted": df["predicted"]},
+            )
+            expand_btn.setEnabled(True)
+            self._run_in_background(self.ai.interpret_chart, on_insight, on_insight_error, name, df)
+
+        def on_data_error(error):
+            chart_placeholder.setText(f"Failed to load {name}: {error}")
+            insight_label.setText("")
+
+        def on_insight(insight):
+            card["insight"] = insight
+            insight_label.setText(insight)
+            listen_btn.setEnabled(True)
+
+        def on_insight_error(error):
+            insight_label.setText(f"Error interpreting chart: {error}")
+
+        def on_news(news):
+            _clear_layout(news_layout)
             for title, url in news:
                 label = QLabel(f'<a href="{url}">• {title}</a>')
                 label.setOpenExternalLinks(True)
                 label.setStyleSheet("color: #0066cc; margin-left: 10px;")
-                layout.addWidget(label)
-
-            listen_btn = QPushButton("🔊 Listen to Insight")
-            listen_btn.clicked.connect(lambda _, text=insight: self.tts.speak(text))
-            layout.addWidget(listen_btn)
-
-            expand_btn = QPushButton("View Fullscreen")
-            expand_btn.clicked.connect(lambda: self._open_detail_view(symbol, name, df, insight))
-            layout.addWidget(expand_btn)
-            expand_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #4a90e2;
-                    color: white;
-                    padding: 6px 12px;
-                    border-radius: 6px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #357ab8;
-                }
-            """)
+                news_layout.addWidget(label)
 
-        except Exception as e:
-            layout.addWidget(QLabel(f"Failed to load {name}: {str(e)}"))
+        def on_news_error(error):
+            _clear_layout(news_layout)
+            news_layout.addWidget(QLabel(f"Failed to load news: {error}"))
+
+        self._card_handlers[symbol] = (on_data, on_data_error)
+        self._run_in_background(self.news_service.get_news_for_coin, on_news, on_news_error, symbol.split("_")[0])
 
         frame.setLayout(layout)
         return frame
 
+    def _load_cards_data(self, symbols):
+        # Local columnar store first (no SQL round trip); everything else in
+        # one query on the predictions table's (symbol, timestamp) key
+        store = get_columnar_store()
+        frames = {}
+        for symbol in symbols:
+            if store.exists(f"{symbol}_predictions"):
+                frames[symbol] = store.read_frame(f"{symbol}_predictions", columns=["price", "predicted"])
+
+        missing = [symbol for symbol in symbols if symbol not in frames]
+        if missing:
+            for symbol, df in self.data.predictions(missing).items():
+                frames[symbol.lower()] = df
+        return frames
+
     def _open_detail_view(self, symbol, name, df, insight):
         dialog = QDialog(self)
         dialog.setWindowTitle(f"{name} - Full View")
@@ -159,6 +264,9 @@ class DashboardWidget(QWidget):
                 trend_df[col] = pd.to_numeric(trend_df[col], errors="coerce")
             trend_df.dropna(inplace=True)
             
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+            from matplotlib.figure import Figure
+
             trend_fig = Figure(figsize=(9, 3.5))
             trend_ax = trend_fig.add_subplot(111)
             trend_ax.plot(trend_df["day"], trend_df["avg_market_cap"], label="Market Cap Avg", color="blue")
@@ -191,6 +299,8 @@ class DashboardWidget(QWidget):
         dialog.exec_()
 
     def _open_tradesense_view(self):
+        from app.ui.tradesense_view_widget import TradeSenseViewWidget
+
         ts_dialog = QDialog(self)
         ts_dialog.setWindowTitle("TradeSense View")
         ts_dialog.setMinimumSize(1200, 800)
@@ -201,48 +311,23 @@ class DashboardWidget(QWidget):
 
     def _get_latest_fundamentals(self, symbol):
         try:
-            query = """
-                SELECT *
-                FROM fundamentals_data
-                WHERE symbol = :symbol
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """
-            df = pd.read_sql(text(query), self.engine, params={"symbol": symbol})
-            return df.iloc[0].to_dict() if not df.empty else None
+            return self.data.latest_fundamentals(symbol)
         except Exception as e:
             return {"error": str(e)}
 
     def _get_fundamentals_trend(self, symbol):
         try:
-            query = """
-                SELECT 
-                    day, avg_market_cap, pct_change_mcap,
-                    avg_total_volume, pct_change_vol,
-                    stddev_mcap, stddev_volume
-                FROM fundamentals_daily
-                WHERE symbol = :symbol
-                ORDER BY day ASC
-            """
-            df = pd.read_sql(text(query), self.engine, params={"symbol": symbol})
-            return df if not df.empty else None
+            return self.data.fundamentals_trend(symbol)
         except Exception as e:
             return {"error": str(e)}
 
     def _load_supported_symbols(self):
         try:
-            query = """
-                SELECT symbol, coingecko_id
-                FROM supported_symbols
-                WHERE active = true AND symbol_type = 'spot'
-            """
-            df = pd.read_sql(text(query), self.engine)
-
-            existing_tables = {"btc_usd", "eth_usd", "xrp_usd", "sol_usd"}  # Tables you know exist
+            # Only symbols with stored predictions
+            df = self.data.supported_symbols("spot", with_predictions=True)
             return {
                 row["symbol"].lower(): row["coingecko_id"].capitalize()
                 for _, row in df.iterrows()
-                if row["symbol"].lower() in existing_tables
             }
         except Exception as e:
             print(f"Error loading supported symbols: {e}")
@@ -1,53 +1,62 @@
-from PyQt5.QtWidgets import QMainWindow, QMenuBar, QAction, QStackedWidget
-from PyQt5.QtCore import Qt
-from app.ui.dashboard_widget import DashboardWidget
-from app.ui.tradesense_view_widget import TradeSenseViewWidget
+import os
+
+from PyQt5.QtWidgets import QMainWindow, QMenuBar, QAction, QStackedWidget, QLabel
+from PyQt5.QtCore import Qt, QTimer
 # from app.ui.wallet_tracker_widget import WalletTrackerWidget
 # from app.ui.ai_assistant_widget import AIAssistantWidget
 # from app.ui.trade_planner_widget import TradePlannerWidget
 
+
+def _build_dashboard():
+    from app.ui.dashboard_widget import DashboardWidget
+    return DashboardWidget()
+
+
+def _build_tradesense_view():
+    from app.ui.tradesense_view_widget import TradeSenseViewWidget
+    return TradeSenseViewWidget()
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("TradeSense AI")
-        self.showMaximized()  # Fullscreen on launch
 
         # Stack to hold view widgets
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
 
-        # Initialize views
-        self.dashboard = DashboardWidget()
-        self.tradesense_view = TradeSenseViewWidget()
-
-        # self.wallet_tracker = WalletTrackerWidget()
-        # self.ai_assistant = AIAssistantWidget()
-        # self.trade_planner = TradePlannerWidget()
-
-        # Dictionary of views
-        self.views = {
-            "Dashboard": self.dashboard,
-            "TradeSense View": self.tradesense_view,
-            # "Wallet Tracker": self.wallet_tracker,
-            # "AI Assistant": self.ai_assistant,
-            # "Trade Planner": self.trade_planner,
+        # Views are built (and their modules imported) on first navigation
+        self.view_factories = {
+            "Dashboard": _build_dashboard,
+            "TradeSense View": _build_tradesense_view,
+            # "Wallet Tracker": WalletTrackerWidget,
+            # "AI Assistant": AIAssistantWidget,
+            # "Trade Planner": TradePlannerWidget,
         }
+        self.views = {}
 
+        # Live bars for the TradeSense view when STREAM_SYMBOLS is set (display only)
+        self.stream = None
+        if os.getenv("STREAM_SYMBOLS"):
+            from app.streaming.ingest import ingest_from_env
+            self.stream = ingest_from_env()
 
+        # Shell shown until the first view is ready
+        self.placeholder = QLabel("Loading…")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.stack.addWidget(self.placeholder)
 
-        # Add views to stack
-        for view in self.views.values():
-            self.stack.addWidget(view)
+        self._create_menu_bar()
+        self.showMaximized()  # Fullscreen on launch
 
-        # Set default view
-        self.stack.setCurrentWidget(self.dashboard)
+        # Build the default view once the shell has painted
+        QTimer.singleShot(0, lambda: self._switch_view("Dashboard"))
+
+    @property
+    def dashboard(self):
+        return self.views.get("Dashboard")
 
-        # Create menu after initializing views
-        self._create_menu_bar()
-        self.adjustSize()
-        self.show()
-        self.showMaximized()
-        
     def _create_menu_bar(self):
         menubar = self.menuBar()
 
@@ -60,11 +69,26 @@ class MainWindow(QMainWindow):
 
         # View menu
         view_menu = menubar.addMenu("View")
-        for view_name in self.views:
+        for view_name in self.view_factories:
             action = QAction(view_name, self)
             action.triggered.connect(lambda checked, name=view_name: self._switch_view(name))
             view_menu.addAction(action)
 
+    def closeEvent(self, event):
+        # Stop background dashboard loads so they don't outlive the window
+        if self.dashboard is not None:
+            self.dashboard.cancel_loads()
+        if self.stream is not None:
+            self.stream.stop()
+        super().closeEvent(event)
+
     def _switch_view(self, view_name):
-        if view_name in self.views:
-            self.stack.setCurrentWidget(self.views[view_name])
+        if view_name not in self.view_factories:
+            return
+        if view_name not in self.views:
+            view = self.view_factories[view_name]()
+            self.views[view_name] = view
+            if self.stream is not None and hasattr(view, "attach_stream"):
+                view.attach_stream(self.stream)
+            self.stack.addWidget(view)
+        self.stack.setCurrentWidget(self.views[view_name])
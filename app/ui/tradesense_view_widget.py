@@ -1,25 +1,34 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QFrame, QHBoxLayout, QFormLayout, QPushButton, QTextEdit
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from PyQt5.QtCore import QTimer, pyqtSignal
+import numpy as np
 import pandas as pd
-import requests
-import mplfinance as mpf
-import pandas_ta as ta
 import os
-import json
-from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
+from app.services.ai_interpreter_service import AIInterpreterService
+from app.services.coingecko_service import COINGECKO_API_URL
+from app.services.columnar_store import get_columnar_store
+from app.services.data_access import get_data_access
+from app.services.http_cache import get_http_cache
+from app.services.indicator_engine import get_indicator_engine
+
 
 class TradeSenseViewWidget(QWidget):
+    # (label, bar) from the streaming ingest thread, delivered on the GUI thread
+    stream_bar = pyqtSignal(str, object)
+
     def __init__(self):
         super().__init__()
         load_dotenv()
-        self.engine = create_engine(os.getenv("POSTGRES_URL"))
+        self.data = get_data_access()
+        self.ai = AIInterpreterService()
+        self.indicators = get_indicator_engine()
+        self.stream_bar.connect(self._on_stream_bar)
 
         self.setWindowTitle("TradeSense View")
         self.resize(1200, 900)
 
-        self.symbol_map = self.symbol_map = self._load_supported_symbols()
+        self.symbol_map = {}
         '''{
                     "BTC_USDC": "bitcoin",
                     "ETH_USDC": "ethereum",
@@ -28,7 +37,15 @@ class TradeSenseViewWidget(QWidget):
                 }'''
 
         self.init_ui()
-        self.load_chart()  # Load initial view
+        # Symbols and the first chart load after the view has painted
+        QTimer.singleShot(0, self._load_initial_view)
+
+    def _load_initial_view(self):
+        self.symbol_map = self._load_supported_symbols()
+        self.pair_selector.blockSignals(True)
+        self.pair_selector.addItems(self.symbol_map.keys())
+        self.pair_selector.blockSignals(False)
+        self.load_chart()
 
     def init_ui(self):
         main_layout = QHBoxLayout()
@@ -38,7 +55,6 @@ class TradeSenseViewWidget(QWidget):
         
         self.pair_selector = QComboBox()
         #self.pair_selector.addItems(self.symbol_map.keys())
-        self.pair_selector.addItems(self.symbol_map.keys())
         self.pair_selector.currentTextChanged.connect(self.load_chart)
         form_layout.addRow("Select Trading Pair:", self.pair_selector)
 
@@ -62,6 +78,10 @@ class TradeSenseViewWidget(QWidget):
         # Chart area
         self.chart_frame = QFrame()
         self.chart_layout = QVBoxLayout(self.chart_frame)
+        self.chart = None
+        self.chart_error = QLabel()
+        self.chart_error.hide()
+        self.chart_layout.addWidget(self.chart_error)
         main_layout.addWidget(self.chart_frame, 4)
 
         self.setLayout(main_layout)
@@ -76,72 +96,103 @@ class TradeSenseViewWidget(QWidget):
         if not coingecko_id:
             return
 
-        url = f"https://api.coingecko.com/api/v3/coins/{coingecko_id}/market_chart"
-        params = {
-            "vs_currency": "usd",
-            "days": "365" if timeframe == "weekly" else "90",
-            "interval": "daily"
-        }
+        days = 365 if timeframe == "weekly" else 90
 
         try:
-            response = requests.get(url, params=params)
-            data = response.json()
-            prices = data.get("prices", [])
-
-            df = pd.DataFrame(prices, columns=["timestamp", "close"])
-            df["Date"] = pd.to_datetime(df["timestamp"], unit="ms")
-            df.set_index("Date", inplace=True)
-
-            df["open"] = df["close"].shift(1)
-            df["high"] = df[["open", "close"]].max(axis=1) * 1.01
-            df["low"] = df[["open", "close"]].min(axis=1) * 0.99
-            df["volume"] = df["close"] * 0.03  # simple synthetic volume
-
-            if timeframe == "weekly":
-                df = df.resample("W").agg({
-                    "open": "first",
-                    "high": "max",
-                    "low": "min",
-                    "close": "last",
-                    "volume": "sum"
-                }).dropna()
-
-            df["EMA_fast"] = df["close"].ewm(span=9).mean()
-            df["EMA_slow"] = df["close"].ewm(span=21).mean()
-            df.ta.rsi(length=14, append=True)
-            df.ta.macd(append=True)
-            df.dropna(inplace=True)
+            # Prefer the local columnar store written by the batch job; fall
+            # back to CoinGecko when it doesn't cover the requested range yet.
+            df = self._load_prices_from_store(pair_key, days)
+            if df is None:
+                df = self._fetch_prices(coingecko_id, days)
 
-            self.df = df  # save for insight use
+            df = build_chart_frame(self.indicators, pair_key, timeframe, df)
 
-            for i in reversed(range(self.chart_layout.count())):
-                self.chart_layout.itemAt(i).widget().setParent(None)
-
-            apds = [
-                mpf.make_addplot(df["EMA_fast"], color='green'),
-                mpf.make_addplot(df["EMA_slow"], color='red'),
-                mpf.make_addplot(df["RSI_14"], panel=1, color='blue', ylabel='RSI'),
-                mpf.make_addplot(df[["MACDh_12_26_9"]], panel=2, type='bar', color='dimgray', ylabel='MACD Hist'),
-                mpf.make_addplot(df[["MACD_12_26_9", "MACDs_12_26_9"]], panel=2),
-                mpf.make_addplot(df["volume"], panel=3, type='bar', color='gray', ylabel='Volume')
-            ]
-
-            fig, _ = mpf.plot(
-                df,
-                type='candle',
-                style='charles',
-                addplot=apds,
-                returnfig=True,
-                title=f"{pair_key} - {timeframe.capitalize()} Chart",
-                ylabel="Price (USD)",
-                panel_ratios=(3, 1, 1, 1)
-            )
-
-            canvas = FigureCanvas(fig)
-            self.chart_layout.addWidget(canvas)
+            self.df = df  # save for insight use
+            self._render_chart(df, pair_key, timeframe)
 
         except Exception as e:
-            self.chart_layout.addWidget(QLabel(f"Error loading chart: {str(e)}"))
+            if self.chart is not None:
+                self.chart.canvas.hide()
+            self.chart_error.setText(f"Error loading chart: {str(e)}")
+            self.chart_error.show()
+
+    def _render_chart(self, df, pair_key, timeframe):
+        # One chart per view: created on first use, then updated in place
+        if self.chart is None:
+            from app.ui.chart_renderer import CandleChart  # matplotlib on first render
+            self.chart = CandleChart()
+            self.chart_layout.addWidget(self.chart.canvas)
+        self.chart_error.hide()
+        self.chart.canvas.show()
+        self.chart.update(df, f"{pair_key} - {timeframe.capitalize()} Chart")
+
+    def attach_stream(self, ingest):
+        """
+        Subscribe to a StreamingIngest so closed bars update the chart and
+        indicators of the selected pair instead of re-polling CoinGecko.
+        """
+        return ingest.subscribe(lambda label, bar, closed: closed and self.stream_bar.emit(label, bar))
+
+    def _on_stream_bar(self, label, bar):
+        # Runs on the GUI thread (queued signal from the ingest thread)
+        pair, timeframe = getattr(self, "current_pair", None), getattr(self, "current_timeframe", None)
+        if label != pair or not hasattr(self, "df"):
+            return
+
+        cached = self.indicators.latest(pair, timeframe)
+        if cached is None:
+            return
+
+        ts = pd.Timestamp(bar["timestamp"], unit="ms")
+        period = ts.normalize() if timeframe == "daily" else ts.to_period("W").end_time.normalize()
+        if period < cached.name:
+            return
+        replace_last = period == cached.name
+        frame_before = self.df.iloc[:-1] if replace_last and period == self.df.index[-1] else self.df
+
+        close = bar["close"]
+        open_ = frame_before["close"].iloc[-1] if len(frame_before) else close
+        fields = {
+            "open": open_,
+            "high": max(open_, close) * 1.01,
+            "low": min(open_, close) * 0.99,
+            "volume": close * 0.03,
+        }
+        self.indicators.update(pair, timeframe, period, close, replace_last=replace_last, **fields)
+        self.df = self.indicators.latest_frame(pair, timeframe).dropna()
+        self._render_chart(self.df, pair, timeframe)
+
+    def _load_prices_from_store(self, pair_key, days):
+        store = get_columnar_store()
+        if not store.exists(pair_key):
+            return None
+
+        start = pd.Timestamp.now("UTC").tz_localize(None).normalize() - pd.Timedelta(days=days)
+        data = store.read(pair_key, start=start, columns=["price"])
+        if len(data["timestamp"]) == 0 or data["timestamp"][0] > (start + pd.Timedelta(days=1)).value:
+            return None
+
+        prices = pd.Series(
+            np.asarray(data["price"]),
+            index=pd.DatetimeIndex(np.asarray(data["timestamp"]).astype("datetime64[ns]"), name="Date"),
+        )
+        return prices.resample("D").last().dropna().to_frame("close")
+
+    def _fetch_prices(self, coingecko_id, days):
+        url = f"{os.getenv('COINGECKO_API_URL') or COINGECKO_API_URL}/coins/{coingecko_id}/market_chart"
+        params = {
+            "vs_currency": "usd",
+            "days": str(days),
+            "interval": "daily"
+        }
+        response = get_http_cache().get(url, params=params)
+        data = response.json()
+        prices = data.get("prices", [])
+
+        df = pd.DataFrame(prices, columns=["timestamp", "close"])
+        df["Date"] = pd.to_datetime(df["timestamp"], unit="ms")
+        df.set_index("Date", inplace=True)
+        return df
 
     def provide_insight(self):
         if not hasattr(self, "df") or self.df.empty:
@@ -173,36 +224,39 @@ class TradeSenseViewWidget(QWidget):
         """
 
         try:
-            headers = {
-                "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-                "Content-Type": "application/json"
-            }
-
-            body = {
-                "model": "gpt-3.5-turbo",
-                "messages": [
-                    {"role": "user", "content": prompt.strip()}
-                ],
-                "max_tokens": 500
-            }
-
-            res = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, data=json.dumps(body))
-            res.raise_for_status()
-            result = res.json()["choices"][0]["message"]["content"]
-            self.insight_text.setPlainText(result.strip())
+            result = self.ai.advise(pair, tf, prompt.strip())
+            self.insight_text.setPlainText(result)
 
         except Exception as e:
             self.insight_text.setPlainText(f"Error calling OpenAI API: {str(e)}")
 
     def _load_supported_symbols(self):
         try:
-            query = """
-                SELECT symbol, coingecko_id
-                FROM supported_symbols
-                WHERE active = true AND symbol_type = 'spot'
-            """
-            df = pd.read_sql(text(query), self.engine)
+            df = self.data.supported_symbols("spot")
             return dict(zip(df["symbol"], df["coingecko_id"]))
         except Exception as e:
             print(f"Error loading supported symbols: {e}")
             return {}
+
+
+def build_chart_frame(indicators, pair_key, timeframe, df):
+    """
+    Close prices -> synthetic OHLCV (weekly bars resampled) with EMA 9/21,
+    RSI 14 and MACD from the per-(pair, timeframe) indicator engine;
+    unchanged bars are served from its cache, new bars are O(1) each.
+    """
+    df["open"] = df["close"].shift(1)
+    df["high"] = df[["open", "close"]].max(axis=1) * 1.01
+    df["low"] = df[["open", "close"]].min(axis=1) * 0.99
+    df["volume"] = df["close"] * 0.03  # simple synthetic volume
+
+    if timeframe == "weekly":
+        df = df.resample("W").agg({
+            "open": "first",
+            "high": "max",
+            "low": "min",
+            "close": "last",
+            "volume": "sum"
+        }).dropna()
+
+    return indicators.compute(pair_key, timeframe, df).dropna()
@@ -0,0 +1,41 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+
+class WorkerSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()  # after result or error
+
+
+class Worker(QRunnable):
+    """
+    Runs `fn(*args, **kwargs)` on a QThreadPool and reports back through
+    Qt signals, which are delivered on the GUI thread. A cancelled worker
+    never emits, so late results can't touch widgets that are going away.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    @pyqtSlot()
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+                self.signals.finished.emit()
+            return
+        if not self.cancelled:
+            self.signals.result.emit(result)
+            self.signals.finished.emit()
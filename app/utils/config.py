@@ -1,4 +1,11 @@
-
+import os
 from dotenv import load_dotenv
 def load_env():
     load_dotenv()
+
+def get_int(name, default):
+    value = os.getenv(name)
+    try:
+        return int(value) if value not in (None, "") else default
+    except ValueError:
+        return default
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+from app.utils.config import get_int
+
+logger = logging.getLogger("TradeSenseAI")
+
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "logs")
+PROM_PREFIX = "tradesense_"
+
+
+class Metrics:
+    """
+    Per-run pipeline instrumentation.
+
+    stage() times a block and appends one JSON line per stage to
+    metrics.jsonl, tagged with the run id and the current symbol (set with
+    symbol() on the thread doing the work). Like RotatingFileHandler, the
+    file is rolled over to metrics.jsonl.1 .. .N once it would exceed
+    METRICS_JSONL_MAX_MB (default 50, 0 = never) and the oldest backup past
+    METRICS_JSONL_BACKUPS (default 5) is dropped. incr() bumps labelled counters.
+    write_prometheus() dumps stage totals and counters as a Prometheus
+    textfile for node_exporter's textfile collector.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.getenv("METRICS_DIR") or LOGS_DIR
+        self.jsonl_path = os.path.join(self.directory, "metrics.jsonl")
+        self.prom_path = os.path.join(self.directory, "tradesense.prom")
+        self.max_bytes = get_int("METRICS_JSONL_MAX_MB", 50) * 1024 * 1024
+        self.backups = get_int("METRICS_JSONL_BACKUPS", 5)
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = defaultdict(float)
+        self._stages = defaultdict(lambda: [0, 0.0])  # (stage, symbol) -> [count, seconds]
+
+    @contextmanager
+    def symbol(self, label):
+        previous = getattr(self._local, "symbol", None)
+        self._local.symbol = label
+        try:
+            yield
+        finally:
+            self._local.symbol = previous
+
+    @property
+    def current_symbol(self):
+        return getattr(self._local, "symbol", None)
+
+    @contextmanager
+    def stage(self, name, symbol=None, **fields):
+        """Time a block; the yielded dict is merged into the stage's JSON line."""
+        symbol = symbol or self.current_symbol
+        info = dict(fields)
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield info
+        except Exception:
+            ok = False
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                totals = self._stages[(name, symbol or "")]
+                totals[0] += 1
+                totals[1] += seconds
+            self.emit("stage", stage=name, symbol=symbol, seconds=round(seconds, 6), ok=ok, **info)
+
+    def incr(self, name, value=1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def emit(self, event, **fields):
+        record = {"ts": round(time.time(), 3), "run_id": self.run_id, "event": event, **fields}
+        line = json.dumps(record, default=str)
+        try:
+            with self._lock:
+                os.makedirs(self.directory, exist_ok=True)
+                f = open(self.jsonl_path, "a")
+                if self.max_bytes and 0 < f.tell() and f.tell() + len(line) + 1 > self.max_bytes:
+                    f.close()
+                    self._rotate()
+                    f = open(self.jsonl_path, "a")
+                with f:
+                    f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write metrics: {e}")
+
+    def _rotate(self):
+        # metrics.jsonl -> .1 -> .2 ... -> .N (dropped), as RotatingFileHandler does
+        path = self.jsonl_path
+        if self.backups <= 0:
+            os.remove(path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        os.replace(path, f"{path}.1")
+
+    def slowest(self, n=5):
+        with self._lock:
+            items = [(stage, symbol, secs) for (stage, symbol), (_, secs) in self._stages.items()]
+        return sorted(items, key=lambda item: item[2], reverse=True)[:n]
+
+    def write_prometheus(self, path=None):
+        """Write the process's totals as a Prometheus textfile (atomically replaced)."""
+        path = path or self.prom_path
+        # Totals accumulate for the life of the process (one batch run, or the
+        # whole daemon), so they are exported as counters; use rate()/increase()
+        lines = [
+            f"# HELP {PROM_PREFIX}stage_seconds_total Seconds spent per pipeline stage and symbol since the process started",
+            f"# TYPE {PROM_PREFIX}stage_seconds_total counter",
+        ]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            counters = sorted(self._counters.items())
+        for (stage, symbol), (count, seconds) in stages:
+            labels = _labels({"stage": stage, "symbol": symbol})
+            lines.append(f"{PROM_PREFIX}stage_seconds_total{labels} {seconds:.6f}")
+        lines.append(f"# HELP {PROM_PREFIX}stage_runs_total Completed pipeline stages per symbol since the process started")
+        lines.append(f"# TYPE {PROM_PREFIX}stage_runs_total counter")
+        for (stage, symbol), (count, seconds) in stages:
+            lines.append(f"{PROM_PREFIX}stage_runs_total{_labels({'stage': stage, 'symbol': symbol})} {count}")
+
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE {PROM_PREFIX}{name} counter")
+                declared.add(name)
+            lines.append(f"{PROM_PREFIX}{name}{_labels(dict(labels))} {value:g}")
+
+        lines.append(f"# HELP {PROM_PREFIX}process_start_timestamp_seconds When the run (or daemon) started")
+        lines.append(f"# TYPE {PROM_PREFIX}process_start_timestamp_seconds gauge")
+        lines.append(f"{PROM_PREFIX}process_start_timestamp_seconds {self.started:.0f}")
+        lines.append(f"# HELP {PROM_PREFIX}process_uptime_seconds Seconds since the run (or daemon) started")
+        lines.append(f"# TYPE {PROM_PREFIX}process_uptime_seconds gauge")
+        lines.append(f"{PROM_PREFIX}process_uptime_seconds {time.time() - self.started:.3f}")
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write Prometheus textfile: {e}")
+
+    def log_summary(self, n=5):
+        for stage, symbol, seconds in self.slowest(n):
+            logger.info(f"⏱️ {stage}{f' [{symbol}]' if symbol else ''}: {seconds:.2f}s")
+
+
+def _labels(labels):
+    labels = {k: v for k, v in labels.items() if v not in (None, "")}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_shared_metrics = None
+_shared_lock = threading.Lock()
+
+
+def get_metrics():
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics()
+        return _shared_metrics
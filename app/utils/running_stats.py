@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """
+    Count, mean, sample variance, min and max of a stream of numbers, in
+    O(1) memory. push() is Welford's single-value update; update() merges a
+    whole batch (Chan et al.'s parallel combination), so chunked scans give
+    the same result as one pass over all values.
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, minimum=math.inf, maximum=-math.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+
+    def push(self, value):
+        if value is None or value != value:
+            return
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self.merge(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    def merge(self, count, mean, m2, minimum, maximum):
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def std(self):
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "std": self.std,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+
+class GroupedStats:
+    """RunningStats per (group key, column), fed with DataFrame batches."""
+
+    def __init__(self, key, columns):
+        self.key = key
+        self.columns = list(columns)
+        self.stats = {}
+
+    def update(self, batch):
+        if batch.empty:
+            return
+        for column in self.columns:
+            values = pd.to_numeric(batch[column], errors="coerce")
+            grouped = values.groupby(batch[self.key])
+            squares = (values - grouped.transform("mean")) ** 2
+            summary = pd.DataFrame({
+                "count": grouped.count(),
+                "mean": grouped.mean(),
+                "m2": squares.groupby(batch[self.key]).sum(),
+                "min": grouped.min(),
+                "max": grouped.max(),
+            })
+            for group, row in summary[summary["count"] > 0].iterrows():
+                stats = self.stats.setdefault((group, column), RunningStats())
+                stats.merge(int(row["count"]), row["mean"], row["m2"], row["min"], row["max"])
+
+    def to_frame(self):
+        rows = [{self.key: group, "column": column, **stats.as_dict()}
+                for (group, column), stats in sorted(self.stats.items())]
+        return pd.DataFrame(rows)
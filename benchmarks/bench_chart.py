@@ -0,0 +1,43 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.fixtures import price_series
+from benchmarks.harness import benchmark
+from app.services.indicator_engine import IndicatorEngine
+from app.ui.chart_renderer import CandleChart
+from app.ui.tradesense_view_widget import build_chart_frame
+
+_app = None
+
+
+def _frame(bars):
+    df = price_series(bars, freq="D").set_index("timestamp").rename(columns={"price": "close"})
+    df.index.name = None
+    return df
+
+
+@benchmark("chart_indicators_cold", sizes=[365, 2000, 8760], unit="bars")
+def indicators_cold(size, ctx):
+    # Fresh engine each time: full indicator computation, as on first open
+    df = _frame(size)
+    return lambda: build_chart_frame(IndicatorEngine(), "BENCH", "daily", df.copy())
+
+
+@benchmark("chart_load_and_render", sizes=[365, 2000, 8760], unit="bars")
+def load_and_render(size, ctx):
+    # The load_chart path: indicators (warm engine) + in-place chart update + draw
+    global _app
+    _app = QApplication.instance() or QApplication([])
+    df = _frame(size)
+    engine = IndicatorEngine()
+    chart = CandleChart()
+    chart.canvas.resize(1200, 800)
+
+    def run():
+        frame = build_chart_frame(engine, "BENCH", "daily", df.copy())
+        chart.update(frame, "BENCH - Daily Chart")
+        chart.canvas.draw()
+    return run
@@ -0,0 +1,35 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from benchmarks.fixtures import fundamentals_snapshots, universe
+from benchmarks.harness import benchmark
+
+
+@benchmark("db_save_ohlcv", sizes=[10, 100, 1000], needs_db=True)
+def save_ohlcv(size, ctx):
+    frames = universe(size)
+
+    def run():
+        for label, df in frames.items():
+            ctx.db.save_ohlcv(label, df)
+    return run
+
+
+@benchmark("db_save_fundamentals_batch", sizes=[10, 100, 1000], needs_db=True)
+def save_fundamentals_batch(size, ctx):
+    rows = fundamentals_snapshots(size, per_day=1)
+    batch = {row["symbol"]: row for row in rows.to_dict("records")}
+    return lambda: ctx.db.save_fundamentals_batch(batch)
+
+
+@benchmark("run_daily_aggregation", sizes=[10, 100, 1000], needs_db=True)
+def daily_aggregation(size, ctx):
+    from app.core_data_extract.aggregator import run_daily_aggregation
+
+    day = date(2030, 1, size % 28 + 1)  # one day per size so runs don't overlap
+    snapshots = fundamentals_snapshots(size, day=day.isoformat())
+    ctx.db.copy_frame("fundamentals_data", snapshots)
+    with ctx.db.engine.begin() as conn:
+        conn.execute(text("ANALYZE fundamentals_data"))
+    return lambda: run_daily_aggregation(day)
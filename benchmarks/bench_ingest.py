@@ -0,0 +1,19 @@
+import os
+
+from benchmarks.fixtures import coin_ids
+from benchmarks.harness import benchmark
+from app.services.coingecko_service import CoinGeckoService
+from app.services.http_cache import HttpCache
+
+
+@benchmark("coingecko_fetch_ohlcv", sizes=[10, 100, 1000])
+def fetch_ohlcv(size, ctx):
+    # TTL 0: every call goes to the (local) server, as on a cold nightly run
+    cache = HttpCache(path=os.path.join(ctx.tmpdir, f"http_{size}.sqlite"), ttls=[("", 0)])
+    service = CoinGeckoService(cache=cache, base_url=ctx.coingecko.url)
+    ids = coin_ids(size)
+
+    def run():
+        for coin_id in ids:
+            service.fetch_ohlcv(coin_id, "usd")
+    return run
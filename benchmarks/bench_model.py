@@ -0,0 +1,21 @@
+from benchmarks.fixtures import universe
+from benchmarks.harness import benchmark
+from app.services.model_service import PredictionModel
+
+
+@benchmark("model_train_and_predict", sizes=[10, 100, 1000])
+def train_and_predict(size, ctx):
+    frames = universe(size)
+    model = PredictionModel()
+
+    def run():
+        for df in frames.values():
+            model.train_and_predict(df.copy())
+    return run
+
+
+@benchmark("model_train_and_predict_many", sizes=[10, 100, 1000])
+def train_and_predict_many(size, ctx):
+    frames = universe(size)
+    model = PredictionModel()
+    return lambda: model.train_and_predict_many(frames)
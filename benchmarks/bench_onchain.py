@@ -0,0 +1,27 @@
+import os
+
+from benchmarks.harness import benchmark
+from app.services.disk_cache import DiskCache
+from app.services.ethereum_service import EthereumService
+from app.services.onchain_service import OnchainMetrics
+
+
+def _collector(ctx, name, size, confirmations):
+    cache = DiskCache(os.path.join(ctx.tmpdir, f"{name}_{size}.sqlite"))
+    return OnchainMetrics(EthereumService(url=ctx.eth.url).rpc_batch, cache=cache,
+                          window_blocks=size, confirmations=confirmations)
+
+
+@benchmark("onchain_collect_cold", sizes=[100, 1000, 7200], unit="blocks")
+def collect_cold(size, ctx):
+    # Every block fetched over batched JSON-RPC, as on a first run
+    # (nothing counts as confirmed, so nothing is cached)
+    return _collector(ctx, "cold", size, confirmations=10**9).collect
+
+
+@benchmark("onchain_collect_warm", sizes=[100, 1000, 7200], unit="blocks")
+def collect_warm(size, ctx):
+    # Overlapping window: only the head check goes to the node
+    collector = _collector(ctx, "warm", size, confirmations=0)
+    collector.collect()
+    return collector.collect
@@ -0,0 +1,294 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+HOURS = 24 * 30  # market_chart?days=30 returns hourly points
+
+
+def coin_ids(n_symbols):
+    return [f"coin-{i:04d}" for i in range(n_symbols)]
+
+
+def labels(n_symbols):
+    return [f"C{i:04d}_USD" for i in range(n_symbols)]
+
+
+def price_series(n_points, seed=0, start="2025-01-01", freq="h"):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_points)))
+    return pd.DataFrame({"timestamp": pd.date_range(start, periods=n_points, freq=freq), "price": prices})
+
+
+def universe(n_symbols, n_points=HOURS):
+    """label -> DataFrame(timestamp, price) of synthetic hourly prices."""
+    return {label: price_series(n_points, seed=i) for i, label in enumerate(labels(n_symbols))}
+
+
+def market_chart_payload(df):
+    ms = df["timestamp"].astype("int64") // 10**6
+    return json.dumps({
+        "prices": [[int(t), float(p)] for t, p in zip(ms, df["price"])],
+        "market_caps": [[int(t), float(p) * 1e7] for t, p in zip(ms, df["price"])],
+        "total_volumes": [[int(t), float(p) * 1e5] for t, p in zip(ms, df["price"])],
+    }).encode()
+
+
+def fundamentals_snapshots(n_symbols, day="2025-01-01", per_day=96, integer=False):
+    """
+    fundamentals_data-shaped rows: `per_day` snapshots per symbol over one day.
+    integer=True gives whole-number market cap / volume (int64), as CoinGecko
+    often returns them, so to_sql creates BIGINT columns.
+    """
+    rng = np.random.default_rng(1)
+    ts = pd.date_range(day, periods=per_day, freq=pd.Timedelta(days=1) / per_day)
+    frames = []
+    for label in labels(n_symbols):
+        frames.append(pd.DataFrame({
+            "symbol": label,
+            "timestamp": ts,
+            "market_cap": rng.uniform(1e8, 1e9, per_day),
+            "total_volume": rng.uniform(1e6, 1e7, per_day),
+            "circulating_supply": 1e9,
+            "commit_count_4w": rng.integers(0, 200, per_day).astype(float),
+            "fundamentals_score": rng.uniform(0, 1, per_day),
+        }))
+    snapshots = pd.concat(frames, ignore_index=True)
+    if integer:
+        snapshots[["market_cap", "total_volume"]] = snapshots[["market_cap", "total_volume"]].round().astype("int64")
+    return snapshots
+
+
+class FakeCoinGecko:
+    """
+    Local stand-in for the CoinGecko API: serves /coins/<id>/market_chart
+    from pre-rendered synthetic responses. Point CoinGeckoService at `url`.
+    """
+
+    def __init__(self, n_symbols=1000, n_points=HOURS):
+        self.payloads = {
+            coin_id: market_chart_payload(price_series(n_points, seed=i))
+            for i, coin_id in enumerate(coin_ids(n_symbols))
+        }
+        payloads = self.payloads
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = re.match(r"/api/v3/coins/([^/]+)/market_chart", self.path)
+                body = payloads.get(match.group(1)) if match else None
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/api/v3"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeEthNode:
+    """
+    Local stand-in for an Ethereum JSON-RPC node (batches included) over a
+    synthetic chain of `n_blocks` blocks. Answers eth_chainId,
+    eth_blockNumber, eth_getBlockByNumber and eth_feeHistory (plus
+    web3_clientVersion for connection checks); counts HTTP
+    requests and calls so benchmarks can check what the cache saved.
+    """
+
+    def __init__(self, n_blocks=10_000, chain_id=1):
+        rng = np.random.default_rng(0)
+        self.chain_id = chain_id
+        self.tx_counts = rng.integers(50, 300, n_blocks)
+        self.base_fees = rng.integers(5, 50, n_blocks) * 10**9
+        self.tips = rng.integers(1, 3, n_blocks) * 10**9
+        self.requests = 0
+        self.calls = 0
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                batch = payload if isinstance(payload, list) else [payload]
+                node.requests += 1
+                node.calls += len(batch)
+                responses = [node.answer(call) for call in batch]
+                body = json.dumps(responses if isinstance(payload, list) else responses[0]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def answer(self, call):
+        method, params = call["method"], call.get("params", [])
+        latest = len(self.tx_counts) - 1
+        if method == "web3_clientVersion":
+            result = "FakeEthNode/v1"
+        elif method == "eth_chainId":
+            result = hex(self.chain_id)
+        elif method == "eth_blockNumber":
+            result = hex(latest)
+        elif method == "eth_getBlockByNumber":
+            n = int(params[0], 16)
+            result = None if n > latest else {
+                "number": hex(n),
+                "timestamp": hex(1_700_000_000 + 12 * n),
+                "gasUsed": hex(21_000 * int(self.tx_counts[n])),
+                "baseFeePerGas": hex(int(self.base_fees[n])),
+                "transactions": [f"0x{n:032x}{i:032x}" for i in range(int(self.tx_counts[n]))],
+            }
+        elif method == "eth_feeHistory":
+            count, newest = int(params[0], 16), min(int(params[1], 16), latest)
+            oldest = max(newest - count + 1, 0)
+            result = {
+                "oldestBlock": hex(oldest),
+                "reward": [[hex(int(self.tips[n]))] for n in range(oldest, newest + 1)],
+            }
+        else:
+            return {"jsonrpc": "2.0", "id": call.get("id"), "error": {"code": -32601, "message": "method not found"}}
+        return {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+FUNDAMENTALS_DAILY_DDL = """
+    CREATE TABLE IF NOT EXISTS fundamentals_daily (
+        id SERIAL PRIMARY KEY,
+        symbol TEXT, day DATE, samples INT,
+        avg_market_cap NUMERIC, pct_change_mcap NUMERIC,
+        avg_total_volume NUMERIC, pct_change_vol NUMERIC,
+        stddev_mcap NUMERIC, stddev_volume NUMERIC,
+        avg_circ_supply NUMERIC, fundamentals_score_mean NUMERIC, commit_count_4w_mean NUMERIC,
+        created_at TIMESTAMP DEFAULT now(),
+        UNIQUE(symbol, day)
+    )
+"""
+
+
+class ThrowawayDatabase:
+    """
+    A PostgreSQL schema that exists for one benchmark run. Uses
+    POSTGRES_BENCH_URL when set, otherwise starts a private server with
+    the optional `pgserver` package. Never touches POSTGRES_URL's data:
+    everything lives in a fresh schema that is dropped afterwards.
+    """
+
+    def __init__(self):
+        self.url = None
+        self.schema = f"bench_{uuid.uuid4().hex[:8]}"
+        self._server = None
+        self._server_dir = None
+
+    def start(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.engine import make_url
+
+        base_url = os.getenv("POSTGRES_BENCH_URL")
+        if not base_url:
+            import pgserver  # optional; only needed without POSTGRES_BENCH_URL
+            self._server_dir = tempfile.mkdtemp(prefix="tradesense-bench-pg-")
+            self._server = pgserver.get_server(self._server_dir, cleanup_mode="stop")
+            base_url = self._server.get_uri().replace("postgresql://", "postgresql+psycopg2://", 1)
+
+        with create_engine(base_url).begin() as conn:
+            conn.execute(text(f'CREATE SCHEMA "{self.schema}"'))
+        self.base_url = base_url
+        self.url = make_url(base_url).update_query_dict(
+            {"options": f"-csearch_path={self.schema}"}
+        ).render_as_string(hide_password=False)
+        with create_engine(self.url).begin() as conn:
+            conn.execute(text(FUNDAMENTALS_DAILY_DDL))
+        return self
+
+    def stop(self):
+        from sqlalchemy import create_engine, text
+
+        if self.url:
+            with create_engine(self.base_url).begin() as conn:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS "{self.schema}" CASCADE'))
+        if self._server is not None:
+            self._server.cleanup()
+        if self._server_dir:
+            shutil.rmtree(self._server_dir, ignore_errors=True)
+
+
+class BenchContext:
+    """Shared fixtures for one run: temp dir, fake CoinGecko and Ethereum node, optional throwaway DB."""
+
+    def __init__(self, use_db=True):
+        self.use_db = use_db
+        self.tmpdir = None
+        self.coingecko = None
+        self.eth = None
+        self.database = None
+        self.db = None
+
+    def __enter__(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="tradesense-bench-")
+        os.environ["OHLCV_STORE_PATH"] = os.path.join(self.tmpdir, "ohlcv_store")
+        self.coingecko = FakeCoinGecko().start()
+        self.eth = FakeEthNode().start()
+
+        if self.use_db:
+            try:
+                self.database = ThrowawayDatabase().start()
+            except Exception as e:
+                print(f"⚠️ No throwaway database ({e}); set POSTGRES_BENCH_URL or install pgserver")
+                self.database = None
+        if self.database:
+            # DatabaseService and the aggregator read POSTGRES_URL at construction/import
+            os.environ["POSTGRES_URL"] = self.database.url
+            from app.services.db_service import DatabaseService
+            self.db = DatabaseService()
+        return self
+
+    def __exit__(self, *exc):
+        if self.db is not None:
+            self.db.engine.dispose()
+        if self.database:
+            self.database.stop()
+        self.coingecko.stop()
+        self.eth.stop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+BENCHMARKS = []
+
+
+class Benchmark:
+    def __init__(self, name, setup, sizes, needs_db=False, unit="symbols"):
+        self.name = name
+        self.setup = setup
+        self.sizes = sizes
+        self.needs_db = needs_db
+        self.unit = unit
+
+    def key(self, size):
+        return f"{self.name}[{size}]"
+
+
+def benchmark(name, sizes, needs_db=False, unit="symbols"):
+    """
+    Register a benchmark. The decorated function is called as setup(size, ctx)
+    outside the timed region and returns the zero-argument callable to time.
+    """
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, sizes, needs_db, unit))
+        return setup
+    return register
+
+
+def measure(fn, repeats, warmup=1):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return {"median": statistics.median(times), "min": min(times), "repeats": repeats}
+
+
+def load_baselines(path=BASELINES_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baselines(results, path=BASELINES_PATH):
+    with open(path, "w") as f:
+        json.dump({
+            "machine": f"{platform.node()} / {platform.processor() or platform.machine()}",
+            "python": platform.python_version(),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def run(ctx, selected=None, max_size=None, repeats=5, tolerance=0.25, update=False, baselines_path=BASELINES_PATH):
+    """
+    Time every registered benchmark (optionally filtered by name substring
+    and size) and compare medians with the stored baselines. Returns the
+    list of regressions; a result regresses when its median is more than
+    `tolerance` slower than the baseline median.
+    """
+    baselines = load_baselines(baselines_path)
+    results, regressions = dict(baselines), []
+
+    for bench in BENCHMARKS:
+        if selected and not any(s in bench.name for s in selected):
+            continue
+        if bench.needs_db and ctx.db is None:
+            print(f"⏭️  {bench.name}: skipped (no database)")
+            continue
+        for size in bench.sizes:
+            if max_size and size > max_size:
+                continue
+            key = bench.key(size)
+            fn = bench.setup(size, ctx)
+            result = measure(fn, repeats)
+            results[key] = result
+
+            base = baselines.get(key)
+            line = f"{key:<40} median {result['median'] * 1000:10.1f} ms  min {result['min'] * 1000:10.1f} ms"
+            if base:
+                ratio = result["median"] / base["median"]
+                line += f"  ({ratio:5.2f}x baseline)"
+                if ratio > 1 + tolerance:
+                    regressions.append((key, ratio))
+                    line = "❌ " + line
+            print(line)
+
+    if update:
+        save_baselines(results, baselines_path)
+        print(f"✅ Baselines written to {baselines_path}")
+    return regressions
+
+
+def main(argv=None):
+    from benchmarks.fixtures import BenchContext
+
+    parser = argparse.ArgumentParser(description="TradeSense AI benchmark suite")
+    parser.add_argument("names", nargs="*", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-size", type=int, help="skip sizes above this (e.g. 100 for a quick run)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown vs. baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--update-baselines", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--no-db", action="store_true", help="skip benchmarks that need PostgreSQL")
+    args = parser.parse_args(argv)
+
+    # Registers the benchmarks
+    from benchmarks import bench_chart, bench_db, bench_ingest, bench_model, bench_onchain  # noqa: F401
+
+    with BenchContext(use_db=not args.no_db) as ctx:
+        regressions = run(ctx, args.names, args.max_size, args.repeats, args.tolerance,
+                          args.update_baselines, args.baselines)
+
+    if regressions and not args.update_baselines:
+        print(f"❌ {len(regressions)} benchmark(s) regressed:")
+        for key, ratio in regressions:
+            print(f"   {key}: {ratio:.2f}x slower")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+-- One price table and one prediction table for every symbol, replacing the
+-- per-pair {pair}_ohlcv / {pair}_predictions tables.
+-- Range-partitioned by month on "timestamp"; the (symbol, "timestamp")
+-- primary key doubles as the index for per-symbol range scans.
+
+CREATE TABLE IF NOT EXISTS prices (
+    symbol      TEXT             NOT NULL,   -- e.g. 'BTC_USD'
+    "timestamp" TIMESTAMP        NOT NULL,
+    price       DOUBLE PRECISION,
+    PRIMARY KEY (symbol, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+CREATE TABLE IF NOT EXISTS predictions (
+    symbol      TEXT             NOT NULL,
+    "timestamp" TIMESTAMP        NOT NULL,
+    price       DOUBLE PRECISION,
+    predicted   DOUBLE PRECISION,
+    PRIMARY KEY (symbol, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+-- Catch-all for rows outside any monthly partition. Writers create the
+-- month's partition first, so this should stay empty.
+CREATE TABLE IF NOT EXISTS prices_default PARTITION OF prices DEFAULT;
+CREATE TABLE IF NOT EXISTS predictions_default PARTITION OF predictions DEFAULT;
+
+-- Create <parent>_YYYY_MM for the month containing `day` if it is missing.
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent TEXT, day TIMESTAMP)
+RETURNS VOID AS $$
+DECLARE
+    month_start DATE := date_trunc('month', day)::DATE;
+    partition   TEXT := format('%s_%s', parent, to_char(month_start, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(partition) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            partition, parent, month_start, (month_start + INTERVAL '1 month')::DATE
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,61 @@
+-- Running per-symbol, per-day accumulators maintained by
+-- DatabaseService.save_fundamentals, so today's fundamentals_daily row is
+-- live instead of waiting for the nightly rescan.
+
+CREATE TABLE IF NOT EXISTS fundamentals_daily (
+    id               SERIAL PRIMARY KEY,
+    symbol           TEXT,
+    day              DATE,
+    samples          INT,
+    avg_market_cap   NUMERIC,
+    pct_change_mcap  NUMERIC,
+    avg_total_volume NUMERIC,
+    pct_change_vol   NUMERIC,
+    stddev_mcap      NUMERIC,
+    stddev_volume    NUMERIC,
+    avg_circ_supply  NUMERIC,
+    fundamentals_score_mean NUMERIC,
+    commit_count_4w_mean     NUMERIC,
+    created_at       TIMESTAMP DEFAULT now(),
+    UNIQUE(symbol, day)
+);
+
+-- Set by the nightly job once a day is closed
+ALTER TABLE fundamentals_daily ADD COLUMN IF NOT EXISTS is_final BOOLEAN NOT NULL DEFAULT false;
+
+CREATE TABLE IF NOT EXISTS fundamentals_intraday (
+    symbol        TEXT      NOT NULL,
+    day           DATE      NOT NULL,
+    samples       INT       NOT NULL,
+    last_ts       TIMESTAMP NOT NULL,
+    -- true when the running values can't be trusted (snapshot out of
+    -- timestamp order, or the day was already rolled up another way);
+    -- the nightly job then rebuilds the day from fundamentals_data
+    needs_rescan  BOOLEAN   NOT NULL DEFAULT false,
+
+    -- Welford count / mean / sum of squared deviations
+    n_mcap        INT              NOT NULL,
+    mean_mcap     DOUBLE PRECISION NOT NULL,
+    m2_mcap       DOUBLE PRECISION NOT NULL,
+    n_vol         INT              NOT NULL,
+    mean_vol      DOUBLE PRECISION NOT NULL,
+    m2_vol        DOUBLE PRECISION NOT NULL,
+
+    -- Previous snapshot's values and the running pct-change terms
+    last_mcap     DOUBLE PRECISION,
+    last_vol      DOUBLE PRECISION,
+    n_pct_mcap    INT              NOT NULL,
+    sum_pct_mcap  DOUBLE PRECISION NOT NULL,
+    n_pct_vol     INT              NOT NULL,
+    sum_pct_vol   DOUBLE PRECISION NOT NULL,
+
+    -- Plain running means
+    n_circ        INT              NOT NULL,
+    sum_circ      DOUBLE PRECISION NOT NULL,
+    n_score       INT              NOT NULL,
+    sum_score     DOUBLE PRECISION NOT NULL,
+    n_commit      INT              NOT NULL,
+    sum_commit    DOUBLE PRECISION NOT NULL,
+
+    PRIMARY KEY (symbol, day)
+);
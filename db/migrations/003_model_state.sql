@@ -0,0 +1,13 @@
+-- Per-symbol prediction model state for the stateful (online) mode.
+-- `state` is the model's serialized form (for linear_ewls: weighted
+-- sufficient statistics); `watermark` is the newest observation folded in.
+
+CREATE TABLE IF NOT EXISTS model_state (
+    symbol     TEXT PRIMARY KEY,
+    model      TEXT NOT NULL,
+    state      JSONB NOT NULL,
+    watermark  TIMESTAMP NOT NULL,
+    n_obs      BIGINT NOT NULL DEFAULT 0,
+    refit_at   TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
@@ -0,0 +1,29 @@
+-- Closed bars from the streaming ingest (app/streaming/ingest.py).
+-- One row per (symbol, bar start); flushes merge on the key, so a batch
+-- retried after a failed COPY doesn't duplicate bars.
+
+CREATE TABLE IF NOT EXISTS stream_bars (
+    symbol      TEXT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    open        DOUBLE PRECISION,
+    high        DOUBLE PRECISION,
+    low         DOUBLE PRECISION,
+    close       DOUBLE PRECISION,
+    volume      DOUBLE PRECISION,
+    PRIMARY KEY (symbol, "timestamp")
+);
+
+-- Earlier ingests created the table from the frame's dtypes, without a key
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'stream_bars'::regclass AND contype = 'p'
+    ) THEN
+        DELETE FROM stream_bars a USING stream_bars b
+        WHERE a.symbol = b.symbol AND a."timestamp" = b."timestamp" AND a.ctid < b.ctid;
+        ALTER TABLE stream_bars ALTER COLUMN symbol SET NOT NULL;
+        ALTER TABLE stream_bars ALTER COLUMN "timestamp" SET NOT NULL;
+        ALTER TABLE stream_bars ADD PRIMARY KEY (symbol, "timestamp");
+    END IF;
+END $$;
@@ -0,0 +1,27 @@
+-- ensure_monthly_partition checked for the partition and then created it,
+-- so two writers starting the same month at once could both see it missing
+-- and one failed with "relation already exists". Creators of a partition
+-- now take a transaction-scoped advisory lock on its name. A writer that
+-- waited on the lock finds the table committed and skips it.
+
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent TEXT, day TIMESTAMP)
+RETURNS VOID AS $$
+DECLARE
+    month_start DATE := date_trunc('month', day)::DATE;
+    partition   TEXT := format('%s_%s', parent, to_char(month_start, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(partition) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext(partition));
+    BEGIN
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            partition, parent, month_start, (month_start + INTERVAL '1 month')::DATE
+        );
+    EXCEPTION WHEN duplicate_table THEN
+        NULL;  -- created outside this function in the meantime
+    END;
+END;
+$$ LANGUAGE plpgsql;
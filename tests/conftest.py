@@ -0,0 +1,16 @@
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks.fixtures import ThrowawayDatabase
+
+
+@pytest.fixture
+def engine():
+    try:
+        database = ThrowawayDatabase().start()
+    except Exception as e:
+        pytest.skip(f"no throwaway database ({e}); set POSTGRES_BENCH_URL or install pgserver")
+    engine = create_engine(database.url)
+    yield engine
+    engine.dispose()
+    database.stop()
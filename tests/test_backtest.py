@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtest.engine import backtest_strategy, infer_periods_per_year, run_backtest
+from app.backtest.sweep import run_sweep
+
+
+def hourly_closes(n=500):
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2030-01-01", periods=n, freq="h")
+    return pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, n)), index=index)
+
+
+def test_sharpe_is_annualized_from_the_bar_spacing():
+    close = hourly_closes()
+    assert infer_periods_per_year(close.index) == 8760
+
+    inferred = backtest_strategy(close, "ema_crossover", {"fast": 5, "slow": 21})
+    explicit = backtest_strategy(close.to_numpy(), "ema_crossover", {"fast": 5, "slow": 21}, periods_per_year=8760)
+    assert inferred["sharpe"] == explicit["sharpe"]
+
+    with pytest.raises(ValueError):
+        run_backtest(close.to_numpy(), np.ones(len(close)))
+
+
+def test_sweep_reports_failed_runs():
+    closes = {"BTC_USD": hourly_closes()}
+    grid = [{"fast": 5, "slow": 21}, {"fast": 5, "slow": 21, "bogus": 1}]
+
+    results, _ = run_sweep(closes, "ema_crossover", grid, workers=1)
+
+    assert len(results) == 2
+    assert results["error"].notna().sum() == 1
+    assert "TypeError" in results.loc[results["bogus"].notna(), "error"].iloc[0]
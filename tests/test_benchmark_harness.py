@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from benchmarks import harness
+
+
+def test_run_compares_medians_with_baselines(monkeypatch, tmp_path):
+    path = str(tmp_path / "baselines.json")
+    harness.save_baselines({"fast[10]": {"median": 1.0}, "slow[10]": {"median": 1.0},
+                            "slow[1000]": {"median": 5.0}}, path)
+    medians = {"fast": 1.2, "slow": 1.3, "db": 9.0}
+    benchmarks = []
+    monkeypatch.setattr(harness, "BENCHMARKS", benchmarks)
+    monkeypatch.setattr(harness, "measure", lambda fn, repeats: {"median": fn(), "min": fn(), "repeats": repeats})
+    for name, needs_db in (("fast", False), ("slow", False), ("db", True)):
+        harness.benchmark(name, sizes=[10, 1000], needs_db=needs_db)(lambda size, ctx, name=name: lambda: medians[name])
+
+    ctx = SimpleNamespace(db=None)
+    # 1.2x is within the 25% tolerance, 1.3x is not; sizes over max_size and DB benchmarks are skipped
+    assert harness.run(ctx, max_size=100, baselines_path=path) == [("slow[10]", 1.3)]
+    assert harness.run(ctx, selected=["fast"], max_size=100, baselines_path=path) == []
+    assert harness.load_baselines(path)["fast[10]"]["median"] == 1.0
+
+    # --update-baselines keeps entries that weren't re-run
+    harness.run(ctx, max_size=100, update=True, baselines_path=path)
+    stored = harness.load_baselines(path)
+    assert {key: result["median"] for key, result in stored.items()} == {
+        "fast[10]": 1.2, "slow[10]": 1.3, "slow[1000]": 5.0}
+    assert harness.run(ctx, max_size=100, baselines_path=path) == []
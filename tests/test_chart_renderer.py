@@ -0,0 +1,31 @@
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtWidgets import QApplication
+
+from app.ui.chart_renderer import CandleChart
+
+
+def test_indicators_line_up_with_the_bars_they_were_sampled_from(monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    index = pd.date_range("2030-01-01", periods=1000, freq="h")
+    close = np.linspace(100, 200, 1000)
+    df = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0}, index=index)
+    for column in ("EMA_fast", "EMA_slow", "RSI_14", "MACD_12_26_9", "MACDs_12_26_9", "MACDh_12_26_9"):
+        df[column] = close  # indicator value == the bar's own close
+
+    chart = CandleChart()
+    monkeypatch.setattr(chart, "max_bars", lambda: 50)
+    chart.update(df, "BTC_USD")
+
+    xs, ys = chart.ema_fast.get_data()
+    assert len(xs) == 50
+    x_of_close = dict(zip(close, pd.to_datetime(index)))
+    plotted_at = mdates.num2date(xs)
+    assert all(abs(pd.Timestamp(p).tz_localize(None) - x_of_close[y]) < pd.Timedelta(seconds=1) for p, y in zip(plotted_at, ys))
+    assert app is not None
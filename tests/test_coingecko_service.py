@@ -0,0 +1,37 @@
+import json
+
+import pandas as pd
+
+from app.services.coingecko_service import CoinGeckoService
+
+
+class MarketChart:
+    """market_chart stand-in: hourly points up to `now`, then the live price at `now`."""
+
+    def __init__(self, now):
+        self.now = pd.Timestamp(now)
+
+    def get(self, url, params=None, rate_limiter=None):
+        start = (self.now - pd.Timedelta(days=int(params["days"]))).ceil("h")
+        hourly = pd.date_range(start, self.now.floor("h"), freq="h")
+        points = [[int(ts.value // 10**6), float(i)] for i, ts in enumerate(hourly)]
+        points.append([int(self.now.value // 10**6), -1.0])
+        return type("Response", (), {"json": lambda _: json.loads(json.dumps({"prices": points}))})()
+
+
+def test_incremental_fetch_stays_on_the_hourly_grid(monkeypatch):
+    api = MarketChart("2030-01-02 10:37")
+    cg = CoinGeckoService(cache=api, base_url="http://coingecko.test")
+    monkeypatch.setattr("app.services.coingecko_service.datetime",
+                        type("Clock", (), {"utcnow": staticmethod(lambda: api.now.to_pydatetime())}))
+
+    first = cg.fetch_ohlcv_since("bitcoin", since=pd.Timestamp("2030-01-02 06:00"))
+    assert first["timestamp"].tolist() == list(pd.date_range("2030-01-02 07:00", "2030-01-02 10:00", freq="h"))
+
+    # Daemon refreshes a few minutes apart, then the 11:00 point appears
+    watermark = first["timestamp"].max()
+    for now in ("2030-01-02 10:42", "2030-01-02 10:57"):
+        api.now = pd.Timestamp(now)
+        assert cg.fetch_ohlcv_since("bitcoin", since=watermark).empty
+    api.now = pd.Timestamp("2030-01-02 11:03")
+    assert cg.fetch_ohlcv_since("bitcoin", since=watermark)["timestamp"].tolist() == [pd.Timestamp("2030-01-02 11:00")]
@@ -0,0 +1,76 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from app.services import columnar_store
+from app.services.columnar_store import ColumnarStore
+
+
+def frame(start, n, price=1.0):
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq="D"),
+        "price": np.arange(n, dtype=float) + price,
+    })
+
+
+def test_replace_leaves_mapped_generation_intact(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    store.replace("btc_usd", frame("2030-01-01", 5), ["price"])
+    held = store.read("btc_usd")  # e.g. the UI still has the chart's arrays mapped
+
+    store.replace("btc_usd", frame("2030-02-01", 3, price=100.0), ["price"])
+
+    assert held["price"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert store.read("btc_usd")["price"].tolist() == [100.0, 101.0, 102.0]
+    assert store.append("btc_usd", frame("2030-02-04", 2, price=200.0), ["price"]) == 2
+    assert store.read_frame("btc_usd")["price"].tolist() == [100.0, 101.0, 102.0, 200.0, 201.0]
+
+
+def test_old_generation_is_collected_once_no_longer_mapped(tmp_path, monkeypatch):
+    store = ColumnarStore(str(tmp_path))
+    store.replace("btc_usd", frame("2030-01-01", 5), ["price"])
+
+    # Windows refuses to delete a mapped file; the generation must survive the write
+    rmtree = shutil.rmtree
+
+    def refuse_first_generation(path, **kwargs):
+        if path.endswith("g000001"):
+            raise PermissionError(path)
+        rmtree(path, **kwargs)
+
+    monkeypatch.setattr(shutil, "rmtree", refuse_first_generation)
+    store.replace("btc_usd", frame("2030-01-01", 6), ["price"])
+    assert sorted(os.listdir(tmp_path / "btc_usd")) == ["g000001", "g000002", "manifest.json"]
+
+    monkeypatch.setattr(shutil, "rmtree", rmtree)
+    store.replace("btc_usd", frame("2030-01-01", 7), ["price"])
+    assert sorted(os.listdir(tmp_path / "btc_usd")) == ["g000003", "manifest.json"]
+    assert len(store.read("btc_usd")["price"]) == 7
+
+
+def test_append_overwrites_tail_of_interrupted_write(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    store.append("eth_usd", frame("2030-01-01", 3), ["price"])
+    with open(tmp_path / "eth_usd" / "g000001" / "price.f8", "ab") as f:
+        f.write(np.array([999.0, 999.0]).tobytes())  # crashed before the manifest switch
+
+    assert len(store.read("eth_usd")["price"]) == 3
+    store.append("eth_usd", frame("2030-01-04", 1, price=4.0), ["price"])
+    assert store.read("eth_usd")["price"].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_reads_and_upgrades_pre_generation_layout(tmp_path):
+    folder = tmp_path / "sol_usd"
+    folder.mkdir()
+    old = frame("2030-01-01", 2)
+    old["price"].to_numpy(dtype="<f8").tofile(folder / "price.f8")
+    columnar_store._to_ns(old["timestamp"]).tofile(folder / "timestamp.i8")
+
+    store = ColumnarStore(str(tmp_path))
+    assert store.exists("sol_usd") and store.read("sol_usd")["price"].tolist() == [1.0, 2.0]
+
+    store.replace("sol_usd", frame("2030-01-01", 3), ["price"])
+    assert sorted(os.listdir(folder)) == ["g000001", "manifest.json"]
+    assert store.read("sol_usd")["price"].tolist() == [1.0, 2.0, 3.0]
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+
+from app.ui.dashboard_widget import DashboardWidget
+
+
+class TrackedSet(set):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def discard(self, item):
+        self.threads.append(threading.current_thread())
+        super().discard(item)
+
+
+class Host:
+    """Just the state DashboardWidget._run_in_background uses, without building the UI."""
+
+    _run_in_background = DashboardWidget._run_in_background
+
+    def __init__(self):
+        self.pool = QThreadPool()
+        self._workers = TrackedSet()
+        self._cancelled = False
+
+
+def test_finished_workers_are_dropped_on_the_gui_thread():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    host = Host()
+    results = []
+
+    for i in range(20):
+        host._run_in_background(lambda i=i: i * 2, results.append)
+    host._run_in_background(lambda: 1 / 0, results.append, results.append)
+    host.pool.waitForDone()
+    for _ in range(50):
+        app.processEvents()
+
+    assert len(results) == 21
+    assert host._workers == set()
+    assert len(host._workers.threads) == 21
+    assert all(t is threading.main_thread() for t in host._workers.threads)
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from app.services.data_access import DataAccess
+
+
+def test_readers_create_the_migrated_tables_on_first_use(engine):
+    pd.DataFrame({"symbol": ["BTC_USD"], "coingecko_id": ["bitcoin"], "quote": ["usd"],
+                  "symbol_type": ["spot"], "active": [True]}).to_sql("supported_symbols", engine, index=False)
+    data = DataAccess(engine, ttl_seconds=0)
+
+    # predictions doesn't exist before the first migration run
+    assert data.supported_symbols(with_predictions=True).empty
+    assert data.supported_symbols()["symbol"].tolist() == ["BTC_USD"]
+    assert data.predictions(["btc_usd"]) == {}
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from app.services import data_access
+from app.services.db_service import DatabaseService
+
+
+@pytest.fixture
+def db(engine, monkeypatch):
+    monkeypatch.setattr(data_access, "_engine", engine)
+    return DatabaseService()
+
+
+def prices(start, n, price=1.0):
+    return pd.DataFrame({"timestamp": pd.date_range(start, periods=n, freq="h"),
+                         "price": [price + i for i in range(n)]})
+
+
+def test_incremental_save_appends_only_rows_past_the_watermark(db):
+    db.save_ohlcv("btc_usd", prices("2030-01-01", 3))
+    db.save_ohlcv("eth_usd", prices("2030-01-01", 3, price=50.0))
+    assert db.get_ohlcv_watermark("btc_usd") == pd.Timestamp("2030-01-01 02:00")
+
+    # Overlaps the stored rows by two; the stored values are kept as they are
+    assert db.save_ohlcv("btc_usd", prices("2030-01-01 01:00", 4, price=100.0), incremental=True) == 2
+    assert db.load_ohlcv("btc_usd")["price"].tolist() == [1.0, 2.0, 3.0, 102.0, 103.0]
+    assert db.load_ohlcv("eth_usd")["price"].tolist() == [50.0, 51.0, 52.0]
+
+    # Nothing new: no write at all
+    assert db.save_ohlcv("btc_usd", prices("2030-01-01", 2), incremental=True) == 0
+
+    # A symbol with no watermark yet takes every row
+    assert db.save_ohlcv("sol_usd", prices("2030-01-01", 2), incremental=True) == 2
+
+    # A full save still replaces the symbol's rows
+    db.save_ohlcv("btc_usd", prices("2030-02-01", 1, price=7.0))
+    assert db.load_ohlcv("btc_usd")["price"].tolist() == [7.0]
+
+
+def test_copy_frame_creates_upserts_and_replaces(db, engine):
+    rows = pd.DataFrame({"symbol": ["BTC", "ETH"], "note": ['a, "quoted"\nline', None],
+                         "rank": [1.0, float("nan")]})
+    # Missing table: created from the dtypes, NaN-holding whole floats land as integers
+    assert db.copy_frame("notes", rows) == 2
+    stored = pd.read_sql("SELECT * FROM notes ORDER BY symbol", engine)
+    assert stored["note"].iloc[0] == 'a, "quoted"\nline'
+    assert pd.read_sql("SELECT count(*) AS n FROM notes WHERE note IS NULL", engine)["n"].item() == 1
+    assert stored["rank"].iloc[0] == 1 and pd.isna(stored["rank"].iloc[1])
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql('ALTER TABLE notes ADD PRIMARY KEY (symbol)')
+    update = pd.DataFrame({"symbol": ["ETH", "SOL"], "note": ["eth", "sol"], "rank": [2.0, 3.0]})
+    assert db.copy_frame("notes", update, conflict_cols=["symbol"]) == 2
+    stored = pd.read_sql("SELECT * FROM notes ORDER BY symbol", engine)
+    assert stored[["symbol", "rank"]].values.tolist() == [["BTC", 1], ["ETH", 2], ["SOL", 3]]
+
+    db.copy_frame("notes", update.head(1), replace=True)
+    assert pd.read_sql("SELECT symbol FROM notes", engine)["symbol"].tolist() == ["ETH"]
@@ -0,0 +1,31 @@
+from app.services.disk_cache import DiskCache
+
+
+def _stored_bytes(cache):
+    return cache._conn().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+def test_running_total_tracks_writes_and_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=10_000)
+    for i in range(8):
+        cache.set(f"k{i}", b"x" * 1000)
+    cache.set("k1", b"y" * 10)          # overwrite shrinks
+    cache.delete("k2")
+    cache.set_many([("k3", b"z"), ("k8", b"w" * 500)])
+    assert cache.total_bytes() == _stored_bytes(cache)
+
+    for i in range(20):                 # push over budget: oldest go first
+        cache.set(f"big{i}", b"b" * 1000)
+    assert cache.total_bytes() == _stored_bytes(cache) <= 10_000
+    assert cache.get("k0") is None
+    assert cache.get("big19") is not None
+
+
+def test_total_initialised_for_existing_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path)
+    cache.set("a", b"1234")
+    conn = cache._conn()
+    with conn:
+        conn.execute("DROP TABLE totals")  # as written before the totals table existed
+    assert DiskCache(path).total_bytes() == 4
@@ -0,0 +1,45 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+
+from app.core_data_extract.export import SUMMARY_COLUMNS, export_fundamentals, summarize_fundamentals
+from app.services.data_access import DataAccess
+from app.utils.running_stats import GroupedStats
+from benchmarks.fixtures import fundamentals_snapshots
+
+
+def test_grouped_stats_over_chunks_match_one_pass():
+    snapshots = fundamentals_snapshots(3, per_day=50)
+    snapshots.loc[::7, "market_cap"] = np.nan
+    stats = GroupedStats("symbol", SUMMARY_COLUMNS)
+    for start in range(0, len(snapshots), 17):  # chunks straddle symbol boundaries
+        stats.update(snapshots.iloc[start:start + 17])
+
+    summary = stats.to_frame().set_index(["symbol", "column"])
+    expected = snapshots.groupby("symbol")[SUMMARY_COLUMNS].agg(["count", "mean", "std", "min", "max"])
+    for symbol in expected.index:
+        for column in SUMMARY_COLUMNS:
+            row = summary.loc[(symbol, column)]
+            for name in ("count", "mean", "std", "min", "max"):
+                assert np.isclose(row[name], expected.loc[symbol, (column, name)], rtol=1e-9, equal_nan=True)
+
+
+def test_export_and_summary_stream_in_chunks(engine, tmp_path):
+    snapshots = fundamentals_snapshots(3, day="2030-01-01", per_day=40)
+    snapshots.to_sql("fundamentals_data", engine, index=False)
+    data = DataAccess(engine, ttl_seconds=0)
+
+    chunks = list(data.stream_frames("SELECT * FROM fundamentals_data ORDER BY symbol, timestamp", chunk_rows=25))
+    assert [len(chunk) for chunk in chunks] == [25, 25, 25, 25, 20]
+
+    path = str(tmp_path / "fundamentals.csv.gz")
+    assert export_fundamentals(path, symbols=["c0000_usd", "c0001_usd"], chunk_rows=25, data=data) == 80
+    with gzip.open(path, "rt") as f:
+        exported = pd.read_csv(f, parse_dates=["timestamp"])
+    expected = snapshots[snapshots["symbol"].isin(["C0000_USD", "C0001_USD"])].sort_values(["symbol", "timestamp"])
+    pd.testing.assert_frame_equal(exported.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+
+    summary = summarize_fundamentals(chunk_rows=25, data=data).set_index(["symbol", "column"])
+    assert np.isclose(summary.loc[("C0000_USD", "market_cap"), "mean"],
+                      snapshots.loc[snapshots["symbol"] == "C0000_USD", "market_cap"].mean())
@@ -0,0 +1,86 @@
+import json
+
+import requests
+
+from app.core_data_extract import fundamentals
+from app.core_data_extract.fundamentals import FundamentalsFetcher
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+    def json(self):
+        return self.payload
+
+
+class FakeCoinGecko:
+    """Answers /coins/markets for `listed` ids and /coins/{id} for every id."""
+
+    def __init__(self, listed, markets_status=200):
+        self.listed = listed
+        self.markets_status = markets_status
+        self.paths = []
+
+    def get(self, url, params=None, rate_limiter=None):
+        path = url.split("/api", 1)[-1]
+        self.paths.append(path)
+        if path == "/coins/markets":
+            if self.markets_status != 200:
+                return FakeResponse({"error": "rate limited"}, self.markets_status)
+            ids = params["ids"].split(",")
+            return FakeResponse([{"id": i, "market_cap": 1e9, "total_volume": 1e6} for i in ids if i in self.listed])
+        coin_id = path.rsplit("/", 1)[-1]
+        return FakeResponse({
+            "market_data": {"market_cap": {"usd": 2e9}, "total_volume": {"usd": 2e6}},
+            "developer_data": {"commit_count_4_weeks": len(coin_id)},
+        })
+
+
+def fetcher(tmp_path, monkeypatch, listed, markets_status=200):
+    monkeypatch.setattr(fundamentals, "DEV_DATA_CACHE", str(tmp_path / "developer_data.json"))
+    http = FakeCoinGecko(listed, markets_status)
+    return FundamentalsFetcher(cache=http, base_url="http://coingecko.test/api"), http
+
+
+def test_batch_reads_dev_cache_once_and_bounds_refreshes(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEV_DATA_MAX_REFRESH", "2")
+    coins = {f"C{i}": f"coin-{i}" for i in range(5)}
+    f, http = fetcher(tmp_path, monkeypatch, set(coins.values()))
+    loads = []
+    load = f._load_dev_cache
+    monkeypatch.setattr(f, "_load_dev_cache", lambda: loads.append(1) or load())
+
+    first = f.get_fundamentals_batch(coins)
+    assert len(loads) == 2  # once to read, once to merge before the single save
+    assert sum(p.startswith("/coins/coin-") for p in http.paths) == 2
+    assert sum(row["commit_count_4w"] is not None for row in first.values()) == 2
+
+    f.get_fundamentals_batch(coins)
+    cache = json.loads((tmp_path / "developer_data.json").read_text())
+    assert len(cache) == 4
+    expiries = {entry["expires_at"] for entry in cache.values()}
+    assert len(expiries) == 4  # jittered, not all due at the same moment
+
+
+def test_coin_missing_from_markets_falls_back_to_per_coin_fetch(tmp_path, monkeypatch):
+    f, http = fetcher(tmp_path, monkeypatch, {"bitcoin"})
+
+    results = f.get_fundamentals_batch({"BTC_USD": "bitcoin", "NEW_USD": "newcoin"})
+
+    assert set(results) == {"BTC_USD", "NEW_USD"}
+    assert results["NEW_USD"]["market_cap"] == 2e9
+    assert results["BTC_USD"]["market_cap"] == 1e9
+
+
+def test_failed_markets_page_is_skipped_not_fetched_per_coin(tmp_path, monkeypatch):
+    coins = {f"C{i}": f"coin-{i}" for i in range(5)}
+    f, http = fetcher(tmp_path, monkeypatch, set(coins.values()), markets_status=429)
+
+    assert f.get_fundamentals_batch(coins) == {}
+    assert http.paths == ["/coins/markets"]
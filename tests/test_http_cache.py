@@ -0,0 +1,45 @@
+import threading
+import time
+
+from app.services.http_cache import LOCK_STRIPES, HttpCache
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+        self.headers = {}
+
+
+class SlowSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls += 1
+        time.sleep(0.1)
+        return FakeResponse(url.encode())
+
+
+def test_concurrent_callers_share_one_fetch_and_locks_stay_bounded(tmp_path):
+    cache = HttpCache(path=str(tmp_path / "http.sqlite"))
+    cache.session = SlowSession()
+    url = "https://api.coingecko.com/api/v3/coins/bitcoin"
+    threads = [threading.Thread(target=cache.get, args=(url,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.session.calls == 1
+
+    keys = [cache._key(f"https://example.com/{i}", None) for i in range(1000)]
+    assert len({id(cache._lock_for(key)) for key in keys}) == LOCK_STRIPES
+    assert cache._lock_for(keys[0]) is cache._lock_for(cache._key("https://example.com/0", {}))
+
+
+def test_coingecko_ttl_follows_the_configured_base_url(monkeypatch, tmp_path):
+    monkeypatch.setenv("COINGECKO_API_URL", "http://127.0.0.1:8123/api/v3/")
+    cache = HttpCache(path=str(tmp_path / "http.sqlite"))
+    assert cache.ttl_for("http://127.0.0.1:8123/api/v3/coins/bitcoin") == 3600
+    assert cache.ttl_for("http://127.0.0.1:8123/api/v3/coins/bitcoin/market_chart") == 300
+    assert cache.ttl_for("https://api.coingecko.com/api/v3/coins/bitcoin") == 60
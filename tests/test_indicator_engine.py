@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.indicator_engine import INDICATOR_COLUMNS, IndicatorEngine
+
+
+def bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({"close": close}, index=pd.date_range("2030-01-01", periods=n, freq="h", name="timestamp"))
+
+
+def full_recompute(df):
+    return IndicatorEngine().compute("BTC_USD", "1h", df)[INDICATOR_COLUMNS]
+
+
+def test_streaming_matches_full_recompute():
+    df = bars(300)
+    engine = IndicatorEngine()
+    engine.compute("BTC_USD", "1h", df.iloc[:200])
+    # New bars appended, then the forming bar revised a few times
+    for ts, close in df["close"].iloc[200:250].items():
+        engine.update("BTC_USD", "1h", ts, close)
+        engine.update("BTC_USD", "1h", ts, close + 5, replace_last=True)
+        engine.update("BTC_USD", "1h", ts, close, replace_last=True)
+    streamed = engine.latest_frame("BTC_USD", "1h")[INDICATOR_COLUMNS]
+    pd.testing.assert_frame_equal(streamed.astype(float), full_recompute(df.iloc[:250]), check_freq=False)
+
+    # A reload without the forming bar, then that bar revised live
+    engine.compute("BTC_USD", "1h", df.iloc[:249])
+    ts = df.index[248]
+    row = engine.update("BTC_USD", "1h", ts, df["close"].iloc[248] + 1, replace_last=True)
+    expected = df.iloc[:249].copy()
+    expected.iloc[-1, 0] += 1
+    assert row == pytest.approx(full_recompute(expected).iloc[-1].to_dict(), nan_ok=True)
+
+    # Revised last bar plus new bars from a reload
+    revised = df.copy()
+    revised.iloc[248, 0] -= 2
+    streamed = engine.compute("BTC_USD", "1h", revised)[INDICATOR_COLUMNS]
+    pd.testing.assert_frame_equal(streamed, full_recompute(revised))
+
+
+def test_full_recompute_matches_pandas_ta():
+    ta = pytest.importorskip("pandas_ta")
+    df = bars(300, seed=1)
+    ours = full_recompute(df)
+    close = df["close"]
+    macd = ta.macd(close)
+    np.testing.assert_allclose(ours["EMA_fast"], close.ewm(span=9).mean())
+    np.testing.assert_allclose(ours["EMA_slow"], close.ewm(span=21).mean())
+    np.testing.assert_allclose(ours["RSI_14"], ta.rsi(close, length=14))
+    for col in ("MACD_12_26_9", "MACDh_12_26_9", "MACDs_12_26_9"):
+        np.testing.assert_allclose(ours[col], macd[col])
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pandas as pd
+
+from app import main
+from app.services import columnar_store
+from app.services.columnar_store import ColumnarStore
+from app.services.rate_limiter import TokenBucket
+
+
+class FakeCoinGecko:
+    def __init__(self, workers):
+        # Every fetch waits for the others, so this only passes if they overlap
+        self.barrier = threading.Barrier(workers, timeout=10)
+
+    def fetch_ohlcv(self, coin_id, currency):
+        self.barrier.wait()
+        if coin_id == "broken":
+            raise RuntimeError("HTTP 500")
+        return pd.DataFrame({"timestamp": pd.date_range("2030-01-01", periods=3, freq="h"),
+                             "price": [1.0, 2.0, 3.0]})
+
+
+class RecordingDb:
+    def __init__(self):
+        self.saved = []
+
+    def save_ohlcv(self, label, df, incremental=False):
+        self.saved.append((label, threading.current_thread().name))
+        return len(df)
+
+
+def test_concurrent_ingest_fetches_in_parallel_and_writes_on_the_caller(monkeypatch, tmp_path):
+    monkeypatch.setattr(columnar_store, "_shared_store", ColumnarStore(str(tmp_path)))
+    coins = {"BTC_USD": ("bitcoin", "usd"), "ETH_USD": ("ethereum", "usd"), "BAD_USD": ("broken", "usd")}
+    db = RecordingDb()
+
+    results = main.run_concurrent(coins, FakeCoinGecko(3), None, db, workers=3)
+
+    # The failing symbol is logged and left out; the others are still stored
+    assert sorted(r["label"] for r in results) == ["BTC_USD", "ETH_USD"]
+    assert sorted(db.saved) == [("BTC_USD", threading.current_thread().name),
+                                ("ETH_USD", threading.current_thread().name)]
+    assert columnar_store.get_columnar_store().read_frame("BTC_USD")["price"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_token_bucket_spaces_calls_past_its_capacity():
+    bucket = TokenBucket(600, capacity=2)  # 10 calls/s
+    started = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    # Two calls come out of the initial burst, the next two wait ~0.1s each
+    assert 0.15 < time.monotonic() - started < 1.0
@@ -0,0 +1,18 @@
+from app.services.insight_cache import InsightCache
+
+
+def test_zero_ttl_disables_the_cache(tmp_path):
+    cache = InsightCache(path=str(tmp_path / "insights.sqlite"), ttl_hours=0)
+    key = cache.key("BTC_USD", "daily", [1.0, 2.0])
+    cache.set(key, "Uptrend")
+    assert cache.ttl == 0
+    assert cache.get(key) is None
+
+
+def test_default_ttl_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("INSIGHT_CACHE_TTL_HOURS", "3")
+    cache = InsightCache(path=str(tmp_path / "insights.sqlite"))
+    key = cache.key("ETH_USD", "weekly", [])
+    cache.set(key, "Range-bound")
+    assert cache.ttl == 3 * 3600
+    assert cache.get(key) == "Range-bound"
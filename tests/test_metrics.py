@@ -0,0 +1,31 @@
+import os
+
+from app.utils.metrics import Metrics
+
+
+def test_jsonl_rolls_over_and_keeps_a_bounded_number_of_backups(tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_JSONL_BACKUPS", "2")
+    metrics = Metrics(directory=str(tmp_path))
+    metrics.max_bytes = 1000
+
+    for i in range(200):
+        metrics.emit("stage", stage="http_fetch", symbol=f"S{i}", seconds=0.1)
+
+    assert sorted(os.listdir(tmp_path)) == ["metrics.jsonl", "metrics.jsonl.1", "metrics.jsonl.2"]
+    for name in os.listdir(tmp_path):
+        assert os.path.getsize(tmp_path / name) <= 1000
+    last = (tmp_path / "metrics.jsonl").read_text().splitlines()[-1]
+    assert '"symbol": "S199"' in last
+
+
+def test_prometheus_stage_totals_are_counters(tmp_path):
+    metrics = Metrics(directory=str(tmp_path))
+    for _ in range(3):
+        with metrics.stage("job", symbol="BTC_USD"):
+            pass
+    metrics.write_prometheus()
+
+    text = (tmp_path / "tradesense.prom").read_text()
+    assert "# TYPE tradesense_stage_seconds_total counter" in text
+    assert 'tradesense_stage_runs_total{stage="job",symbol="BTC_USD"} 3' in text
+    assert "last run" not in text
@@ -0,0 +1,33 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.migrate import apply_migrations
+
+
+def test_concurrent_writers_create_the_same_partition(engine):
+    apply_migrations(engine)
+    create = text("SELECT ensure_monthly_partition('prices', :day)")
+    day = datetime(2031, 3, 15)
+    errors = []
+
+    def second_writer():
+        try:
+            with engine.begin() as conn:
+                conn.execute(create, {"day": day})
+        except Exception as e:
+            errors.append(e)
+
+    with engine.begin() as conn:
+        # First writer creates the partition but hasn't committed yet
+        conn.execute(create, {"day": day})
+        thread = threading.Thread(target=second_writer)
+        thread.start()
+        time.sleep(0.5)
+    thread.join(10)
+
+    assert not thread.is_alive() and errors == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT to_regclass('prices_2031_03') IS NOT NULL")).scalar()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from app.services.model_service import PredictionModel, _days
+
+
+def _frame(start, periods, unit, slope_per_day=0.5, level=100.0):
+    timestamps = pd.date_range(start, periods=periods, freq="h").as_unit(unit)
+    days = np.arange(periods) / 24.0
+    return pd.DataFrame({"timestamp": timestamps, "price": level + slope_per_day * days})
+
+
+def test_days_is_unit_independent():
+    ts = pd.Series(pd.to_datetime(["2023-11-14 22:13:20"]))
+    for unit in ("s", "ms", "us", "ns"):
+        assert np.isclose(_days(ts.astype(f"datetime64[{unit}]"))[0], 19675.925925925927)
+
+
+def test_refit_on_us_window_then_predict_and_update_on_ms_frame():
+    model = PredictionModel(half_life_hours=240)
+    window = _frame("2023-11-01", 24 * 14, "us")          # DB / pd.concat frames
+    fresh = _frame("2023-11-01", 24 * 14 + 6, "ms").tail(6)  # CoinGecko frames
+
+    # No stored state: refit on the µs window, predict on the ms rows
+    out, state, reason = model.predict_online(fresh, None, load_window=lambda: window)
+    assert reason == "new"
+    np.testing.assert_allclose(out["predicted"], out["price"], rtol=1e-9)
+    assert out["predicted"].nunique() == len(out)
+
+    # Stored state from the µs fit, then an incremental ms update
+    stored = {"model": state.MODEL, "state": model.fit_state(window).to_dict(),
+              "watermark": window["timestamp"].max()}
+    out, state, reason = model.predict_online(fresh, stored)
+    assert reason is None
+    assert state.n == len(window) + len(fresh)
+    np.testing.assert_allclose(out["predicted"], out["price"], rtol=1e-9)
+    assert np.isclose(state.coefficients()[1], 0.5)
+    assert np.isclose(state.t0, _days(fresh["timestamp"])[-1])
+
+
+def test_train_and_predict_many_matches_per_symbol_fits():
+    rng = np.random.default_rng(0)
+    frames = {
+        "BTC_USD": _frame("2030-01-01", 500, "ms", slope_per_day=3.0, level=40000.0),
+        "ETH_USD": _frame("2030-01-05", 120, "us", slope_per_day=-1.0, level=2000.0),  # shorter: NaN-padded
+        "ONE_USD": _frame("2030-01-01", 1, "ns"),
+        "NIL_USD": _frame("2030-01-01", 0, "ns"),
+    }
+    for df in frames.values():
+        df["price"] += rng.normal(0, 5, len(df))
+    model = PredictionModel()
+
+    batched = model.train_and_predict_many(frames)
+
+    assert sorted(batched) == ["BTC_USD", "ETH_USD", "ONE_USD"]
+    for label, out in batched.items():
+        expected = model.train_and_predict(frames[label])
+        assert out["time"].tolist() == expected["time"].tolist()
+        np.testing.assert_allclose(out["predicted"], expected["predicted"], rtol=1e-9)
@@ -0,0 +1,31 @@
+from app.services.disk_cache import DiskCache
+from app.services.ethereum_service import EthereumService
+from app.services.onchain_service import GWEI, OnchainMetrics
+from benchmarks.fixtures import FakeEthNode
+
+
+def test_collect_batches_calls_and_fetches_only_new_blocks(tmp_path):
+    node = FakeEthNode(n_blocks=300).start()
+    try:
+        cache = DiskCache(str(tmp_path / "blocks.sqlite"))
+        collector = OnchainMetrics(EthereumService(url=node.url).rpc_batch, cache=cache,
+                                   window_blocks=250, batch_size=100, confirmations=10)
+        node.requests = node.calls = 0
+
+        metrics = collector.collect()
+
+        window = range(50, 300)
+        gas = sum(21_000 * int(node.tx_counts[n]) for n in window)
+        paid = sum(21_000 * int(node.tx_counts[n]) * int(node.base_fees[n] + node.tips[n]) for n in window)
+        assert metrics["blocks"] == 250
+        assert metrics["tx_count"] == sum(int(node.tx_counts[n]) for n in window)
+        assert abs(metrics["avg_gas_fee"] - paid / gas / GWEI) < 1e-9
+        # Head check, then 250 headers in batches of 100 (one fee history each)
+        assert (node.requests, node.calls) == (1 + 3, 2 + 250 + 3)
+
+        # Same window again: confirmed blocks come from the cache, the last 10 are refetched
+        node.requests = node.calls = 0
+        assert collector.collect() == metrics
+        assert (node.requests, node.calls) == (2, 2 + 10 + 1)
+    finally:
+        node.stop()
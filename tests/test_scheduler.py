@@ -0,0 +1,53 @@
+import threading
+from datetime import date
+
+import pytest
+
+from app.scheduler import Daily, Scheduler
+
+
+def test_jobs_snapshot_is_safe_while_jobs_change():
+    scheduler = Scheduler(max_concurrency=1)
+    stop = threading.Event()
+
+    def churn():
+        i = 0
+        while not stop.is_set():
+            scheduler.add(f"ohlcv:{i % 50}", 60, lambda: None)
+            scheduler.remove(f"ohlcv:{(i + 25) % 50}")
+            i += 1
+
+    thread = threading.Thread(target=churn)
+    thread.start()
+    try:
+        for _ in range(2000):
+            snapshot = scheduler.jobs_snapshot()
+            for name in snapshot:  # would raise if it were the live dict
+                assert name.startswith("ohlcv:")
+    finally:
+        stop.set()
+        thread.join()
+
+    scheduler.add("aggregation", 3600, lambda: None)
+    assert scheduler.has_job("aggregation") and not scheduler.has_job("export")
+
+
+def test_daily_runs_once_per_day_and_retries_failures():
+    today = [date(2030, 1, 1)]
+    calls = []
+
+    def export():
+        calls.append(today[0])
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+
+    daily = Daily(export, today=lambda: today[0])
+    assert daily() and not daily() and daily.done_today
+
+    today[0] = date(2030, 1, 2)
+    assert not daily.done_today
+    with pytest.raises(RuntimeError):
+        daily()
+    assert daily()  # retried on the next check
+    assert not daily()
+    assert calls == [date(2030, 1, 1), date(2030, 1, 2), date(2030, 1, 2)]
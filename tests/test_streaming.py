@@ -0,0 +1,94 @@
+import asyncio
+import json
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.migrate import apply_migrations
+from app.streaming import ingest as ingest_module
+from app.streaming.feed import ExchangeFeed
+from app.streaming.ingest import StreamingIngest
+from app.streaming.replay_server import ReplayServer
+
+
+class RecordingDb:
+    def __init__(self):
+        self.writes = []
+
+    def ensure_schema(self):
+        pass
+
+    def copy_frame(self, table, df, conflict_cols=None):
+        self.writes.append((threading.current_thread().name, table, df, conflict_cols))
+        return len(df)
+
+
+def test_timer_closes_quiet_bar_and_flushes_off_the_loop(monkeypatch):
+    monkeypatch.setattr(ingest_module, "CLOSE_GRACE_MS", 0)
+    db = RecordingDb()
+    ingest = StreamingIngest(db=db, interval_seconds=1, flush_seconds=1)
+    start = int(time.time() * 1000) // 1000 * 1000 - 3000
+    ingest._on_trade("BTC_USDT", start + 100, 100.0, 1.0)
+    ingest._on_trade("BTC_USDT", start + 200, 101.0, 2.0)
+
+    async def quiet_period():
+        timer = asyncio.ensure_future(ingest._flush_periodically())
+        await asyncio.sleep(1.5)
+        timer.cancel()
+
+    asyncio.run(quiet_period())
+    ingest._writer.shutdown(wait=True)
+
+    # No trade after the bar ended, yet it was closed and written by the writer thread
+    assert len(db.writes) == 1
+    thread, table, df, conflict_cols = db.writes[0]
+    assert thread.startswith("stream-flush")
+    assert (table, conflict_cols) == ("stream_bars", ["symbol", "timestamp"])
+    assert df[["open", "high", "close", "volume"]].iloc[0].tolist() == [100.0, 101.0, 101.0, 3.0]
+
+    # A late trade for the closed bar is dropped rather than reopening it
+    ingest._on_trade("BTC_USDT", start + 300, 50.0, 1.0)
+    assert ingest._pending == [] and "BTC_USDT" not in ingest.aggregator.current
+    assert ingest.buffers["BTC_USDT"].last()["low"] == 100.0
+
+
+def test_feed_skips_bad_frames_and_keeps_going():
+    def trade(ts, price):
+        return json.dumps({"stream": "btcusdt@trade", "data": {"e": "trade", "s": "BTCUSDT", "T": ts, "p": price, "q": "1"}})
+
+    frames = [
+        trade(1000, "100"),
+        "not json",
+        json.dumps({"result": None, "id": 1}),       # subscription ack
+        json.dumps({"data": {"e": "trade", "s": "BTCUSDT"}}),  # missing fields
+        trade(2000, "101"),
+    ]
+    trades = []
+
+    async def replay():
+        server = await ReplayServer(frames, speed=0, port=0).start()
+        feed = ExchangeFeed("replay", server.url, {"BTCUSDT": "BTC_USDT"},
+                            lambda *t: trades.append(t) or (len(trades) == 2 and feed.stop()))
+        await asyncio.wait_for(feed.run(), 10)
+        await server.stop()
+
+    asyncio.run(replay())
+    assert trades == [("BTC_USDT", 1000, 100.0, 1.0), ("BTC_USDT", 2000, 101.0, 1.0)]
+
+
+def test_stream_bars_migration_adds_key_to_existing_table(engine):
+    bar = {"symbol": "BTC_USDT", "timestamp": pd.Timestamp("2030-01-01"), "open": 1.0,
+           "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0}
+    # What the ingest used to create via to_sql: no key, duplicate rows from a retried flush
+    pd.DataFrame([bar, bar]).to_sql("stream_bars", engine, index=False)
+
+    apply_migrations(engine)
+
+    with engine.connect() as conn:
+        key = conn.execute(text(
+            "SELECT count(*) FROM pg_constraint WHERE conrelid = 'stream_bars'::regclass AND contype = 'p'"
+        )).scalar()
+        rows = conn.execute(text("SELECT count(*) FROM stream_bars")).scalar()
+    assert (key, rows) == (1, 1)